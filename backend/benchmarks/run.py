@@ -0,0 +1,240 @@
+"""Benchmarks reproducibles (sin red) de las rutas críticas del backend.
+
+Genera series sintéticas con semilla fija y mide:
+- `evaluate_methods`, `_ensure_series`, `_mape`/`_rmse` y el parseo de uploads
+  (`read_upload`) para cada tamaño de `--sizes`;
+- la serialización de un resultado con `horizon=365` en cada formato de
+  respuesta instalado (`backend/formats.py`);
+- `/api/upload` y `/api/online` (Yahoo y EIA) de extremo a extremo con
+  `TestClient`, sustituyendo Yahoo y EIA por fuentes locales.
+
+Uso desde la raíz del repositorio:
+
+    python -m backend.benchmarks.run --output bench.json
+    python -m backend.benchmarks.run --full --output bench.json    # 100 .. 10M puntos
+    python -m backend.benchmarks.run --output bench.json --baseline baseline.json --threshold 0.25
+
+Con `--baseline` se comparan las medianas y el proceso termina con código 1
+si algún caso es más lento que la línea base en más de `--threshold` (25 %).
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000, 1_000_000]
+# `--full`: hasta 10M puntos (los casos de CSV/HTTP siguen limitados por `--max-io-size`).
+FULL_SIZES = DEFAULT_SIZES + [10_000_000]
+# Tamaño máximo para los casos que serializan CSV o pasan por HTTP.
+DEFAULT_MAX_IO_SIZE = 1_000_000
+
+
+def synthetic_series(n: int, seed: int = 42) -> pd.Series:
+    """Paseo aleatorio positivo de `n` puntos diarios (determinista por `seed`)."""
+    rng = np.random.default_rng(seed)
+    values = 60 + np.abs(rng.normal(0, 1, n).cumsum()) * 0.1
+    return pd.Series(values, index=pd.date_range('1990-01-01', periods=n, freq='D' if n < 50_000 else 'min'))
+
+
+def time_case(fn: Callable[[], object], repeat: int, setup: Callable[[], None] | None = None) -> Dict:
+    """Ejecuta `fn` `repeat` veces y devuelve min/mediana/máximo en segundos."""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {'min': min(samples), 'median': statistics.median(samples), 'max': max(samples), 'repeat': repeat}
+
+
+class _FakeTicker:
+    """Sustituto de `yf.Ticker` que devuelve una serie sintética."""
+
+    series = synthetic_series(365)
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+
+    def history(self, **kwargs) -> pd.DataFrame:
+        df = self.series.rename('Close').to_frame()
+        df.index.name = 'Date'
+        return df
+
+
+class _FakeEIAResponse:
+    status_code = 200
+
+    def __init__(self, payload: Dict):
+        self._payload = payload
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> Dict:
+        return self._payload
+
+
+class _FakeEIAClient:
+    """Sustituto del cliente HTTP de EIA que sirve páginas de una serie sintética."""
+
+    def __init__(self, n: int, page_size: int = 5000):
+        s = synthetic_series(n)
+        self.rows = [{'period': d, 'value': v} for d, v in zip(s.index.strftime('%Y-%m-%d'), s.values)]
+        self.page_size = page_size
+
+    def get(self, url, params=None, timeout=None):
+        offset = int((params or {}).get('offset', 0))
+        page = self.rows[offset:offset + self.page_size]
+        return _FakeEIAResponse({'response': {'total': len(self.rows), 'data': page}})
+
+
+@contextmanager
+def offline_sources(eia_points: int = 2_000):
+    """Sustituye Yahoo y EIA por fuentes locales y restaura todo al salir."""
+    from backend import data_sources, main
+
+    saved = (main.yf.Ticker, data_sources._http, main._series_store, os.environ.get('EIA_API_KEY'))
+    main.yf.Ticker = _FakeTicker
+    data_sources._http = _FakeEIAClient(eia_points)
+    main._series_store = None
+    os.environ['EIA_API_KEY'] = 'offline-benchmark'
+    try:
+        yield main
+    finally:
+        main.yf.Ticker, data_sources._http, main._series_store, key = saved
+        if key is None:
+            os.environ.pop('EIA_API_KEY', None)
+        else:
+            os.environ['EIA_API_KEY'] = key
+
+
+def run(sizes: List[int], repeat: int = 5, max_io_size: int = DEFAULT_MAX_IO_SIZE) -> Dict:
+    """Ejecuta todos los casos y devuelve el documento de resultados."""
+    from fastapi.testclient import TestClient
+
+    from backend import formats
+    from backend.ingest import read_upload
+    from backend.main import _ensure_series, _mape, _rmse, evaluate_methods
+
+    results: Dict[str, Dict] = {}
+    for n in sizes:
+        s = synthetic_series(n)
+        df = pd.DataFrame({'date': s.index, 'price': s.values})
+        pred = s.shift(1).bfill()
+        results[f'evaluate_methods[n={n}]'] = time_case(lambda: evaluate_methods(s, horizon=30), repeat)
+        results[f'evaluate_methods_tuned[n={n}]'] = time_case(lambda: evaluate_methods(s, horizon=30, tune=True), repeat)
+        results[f'ensure_series[n={n}]'] = time_case(lambda: _ensure_series(df.copy()), repeat)
+        results[f'mape_rmse[n={n}]'] = time_case(lambda: (_mape(s, pred), _rmse(s, pred)), repeat)
+        if n <= max_io_size:
+            csv = df.to_csv(index=False).encode()
+            results[f'read_upload_csv[n={n}]'] = time_case(
+                lambda: read_upload(io.BytesIO(csv), 'bench.csv', 'text/csv'), repeat)
+
+    s = synthetic_series(1_000)
+    for fmt in [f for f in formats.FORMATS if formats.available(f)]:
+        results[f'serialize_{fmt}[h=365]'] = time_case(
+            lambda: formats.encode(evaluate_methods(s, horizon=365, layout=formats.layout(fmt)), fmt), repeat)
+
+    with offline_sources() as main:
+        client = TestClient(main.app)
+
+        def clear_caches():
+            main._series_cache.clear()
+            main._result_cache.clear()
+
+        for n in [n for n in sizes if n <= max_io_size]:
+            s = synthetic_series(n)
+            csv = pd.DataFrame({'date': s.index, 'price': s.values}).to_csv(index=False).encode()
+
+            def upload():
+                r = client.post('/api/upload?horizon=30', files={'file': ('b.csv', io.BytesIO(csv), 'text/csv')})
+                assert r.status_code == 200, r.text
+
+            results[f'api_upload[n={n}]'] = time_case(upload, repeat, setup=clear_caches)
+
+        for source, symbol in (('yahoo', 'CL=F'), ('eia', 'PET.RWTC.D')):
+            def online():
+                r = client.get(f'/api/online?source={source}&symbol={symbol}&horizon=30')
+                assert r.status_code == 200, r.text
+
+            results[f'api_online_{source}[cold]'] = time_case(online, repeat, setup=clear_caches)
+            results[f'api_online_{source}[warm]'] = time_case(online, repeat)
+
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': sys.version.split()[0],
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'sizes': sizes,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[Dict]:
+    """Compara medianas con la línea base; devuelve los casos comunes con su ratio."""
+    rows = []
+    for name, cur in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if not base or base['median'] <= 0:
+            continue
+        ratio = cur['median'] / base['median']
+        rows.append({'case': name, 'baseline': base['median'], 'current': cur['median'],
+                     'ratio': ratio, 'regression': ratio > 1 + threshold})
+    return rows
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', help='comma separated series lengths, e.g. 100,1000,10000000 '
+                                         f'(default {",".join(map(str, DEFAULT_SIZES))})')
+    parser.add_argument('--full', action='store_true',
+                        help=f'use the full size preset {",".join(map(str, FULL_SIZES))} unless --sizes is given')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-io-size', type=int, default=DEFAULT_MAX_IO_SIZE,
+                        help='largest size used for CSV parsing and HTTP cases')
+    parser.add_argument('--output', default='bench.json')
+    parser.add_argument('--baseline', help='previous results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed slowdown before a case counts as a regression (0.25 = 25%%)')
+    args = parser.parse_args(argv)
+
+    if args.sizes:
+        sizes = [int(x) for x in args.sizes.split(',') if x.strip()]
+    else:
+        sizes = FULL_SIZES if args.full else DEFAULT_SIZES
+    doc = run(sizes, repeat=args.repeat, max_io_size=args.max_io_size)
+    with open(args.output, 'w') as fh:
+        json.dump(doc, fh, indent=2)
+    for name, r in doc['results'].items():
+        print(f'{name:45s} median {r["median"] * 1000:10.3f} ms')
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as fh:
+        baseline = json.load(fh)
+    rows = compare(doc, baseline, args.threshold)
+    regressions = [r for r in rows if r['regression']]
+    for r in regressions:
+        print(f'REGRESSION {r["case"]}: {r["baseline"] * 1000:.3f} ms -> {r["current"] * 1000:.3f} ms (x{r["ratio"]:.2f})')
+    print(f'{len(rows)} cases compared, {len(regressions)} regressions (threshold {args.threshold:.0%})')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""Caché en memoria (TTL + LRU) para las series descargadas por `/api/online`.
+
+Cada entrada se indexa por `(source, symbol, period)` y guarda la `Series` ya
+normalizada por `_ensure_series`. Cuando una entrada expira no se vuelve a
+descargar toda la historia: se piden las filas desde la última fecha cacheada
+(incluida) y sustituyen a las cacheadas desde esa fecha (refresco incremental).
+Así la última barra, que puede ser un cierre parcial de la sesión en curso, se
+corrige en el siguiente refresco.
+
+Configuración por entorno:
+- `SERIES_CACHE_TTL`: segundos de validez de una entrada (por defecto 300).
+- `SERIES_CACHE_MAX_ENTRIES`: número máximo de series antes de expulsar la
+  menos usada recientemente (por defecto 128).
+
+Con un backend compartido (`STATE_BACKEND=sqlite`, ver `backend/shared.py`)
+cada serie descargada o refrescada se publica también allí, y un fallo o una
+entrada caducada en memoria consulta primero la copia de los otros workers.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+
+import pandas as pd
+
+from . import shared as shared_state
+
+
+class SeriesCache:
+    """Caché LRU con expiración por TTL y refresco incremental.
+
+    `get_or_fetch` recibe dos callables: `fetch_full()` descarga la serie
+    completa y `fetch_since(last_date)` devuelve las observaciones desde
+    `last_date` inclusive (puede devolver una serie vacía). Los contadores `hits`, `misses`,
+    `refreshes`, `shared_hits` y `evictions` se exponen con `stats()`.
+
+    `shared` (opcional) es un backend de `backend/shared.py` donde se publican
+    las series con la hora de descarga para que otros procesos las reutilicen.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 128, clock: Callable[[], float] = time.monotonic,
+                 shared=None):
+        self.ttl = float(ttl)
+        self.max_entries = max(1, int(max_entries))
+        self._clock = clock
+        self.shared = shared
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple[float, pd.Series]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.shared_hits = 0
+        self.evictions = 0
+
+    def get_or_fetch(
+        self,
+        key: Hashable,
+        fetch_full: Callable[[], pd.Series],
+        fetch_since: Callable[[pd.Timestamp], pd.Series],
+        trim: Optional[Callable[[pd.Series], pd.Series]] = None,
+        refresh: bool = False,
+    ) -> pd.Series:
+        """Devuelve la serie para `key`, descargándola o refrescándola si hace falta.
+
+        `trim` (opcional) se aplica tras anexar filas nuevas, p. ej. para
+        mantener la ventana de un `period` de Yahoo como `1y`. Con
+        `refresh=True` una entrada vigente se refresca igualmente (pre-calentado).
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if not refresh and now - entry[0] < self.ttl:
+                    self.hits += 1
+                    return entry[1]
+
+        remote = self._shared_get(key)
+        if remote is not None:
+            age, s = remote
+            # another worker has a newer copy: use it, or refresh from it when stale
+            if entry is None or age < now - entry[0]:
+                entry = (now - age, s)
+                if not refresh and age < self.ttl:
+                    self._store(key, s, now - age)
+                    with self._lock:
+                        self.shared_hits += 1
+                    return s
+
+        if entry is None:
+            s = fetch_full()
+            with self._lock:
+                self.misses += 1
+        else:
+            cached = entry[1]
+            new = fetch_since(cached.index[-1])
+            if new is not None and len(new):
+                # the fresh rows win from their first date on, so a partial last
+                # bar (e.g. Yahoo's intraday close) is replaced by its final value
+                new = new.sort_index()
+                s = pd.concat([cached.iloc[:cached.index.searchsorted(new.index[0])], new])
+            else:
+                s = cached
+            if trim is not None:
+                s = trim(s)
+            with self._lock:
+                self.refreshes += 1
+
+        self._store(key, s, now)
+        self._shared_put(key, s)
+        return s
+
+    def _shared_get(self, key: Hashable) -> Optional[tuple[float, pd.Series]]:
+        """`(antigüedad en segundos, serie)` publicada por cualquier worker, o `None`."""
+        if self.shared is None:
+            return None
+        blob = self.shared.get('series', shared_state.key_str(key))
+        if blob is None:
+            return None
+        stamp, s = shared_state.loads_series(blob)
+        return max(0.0, time.time() - stamp), s
+
+    def _shared_put(self, key: Hashable, s: pd.Series) -> None:
+        if self.shared is not None:
+            self.shared.put('series', shared_state.key_str(key), shared_state.dumps_series(s, time.time()))
+
+    def _store(self, key: Hashable, s: pd.Series, now: float) -> None:
+        with self._lock:
+            self._entries[key] = (now, s)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Vacía la caché y reinicia los contadores."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.refreshes = self.shared_hits = self.evictions = 0
+
+    def stats(self) -> Dict:
+        """Contadores de uso y configuración actual de la caché."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'refreshes': self.refreshes,
+                'shared_hits': self.shared_hits,
+                'evictions': self.evictions,
+                'shared': self.shared is not None,
+            }
+
+
+def cache_from_env() -> SeriesCache:
+    """Crea una `SeriesCache` leyendo `SERIES_CACHE_TTL` y `SERIES_CACHE_MAX_ENTRIES`.
+
+    Si `STATE_BACKEND` es compartido (`sqlite`), la caché lo usa como segundo nivel.
+    """
+    backend = shared_state.default_backend()
+    return SeriesCache(
+        ttl=float(os.getenv('SERIES_CACHE_TTL', '300')),
+        max_entries=int(os.getenv('SERIES_CACHE_MAX_ENTRIES', '128')),
+        shared=backend if backend.shared else None,
+    )
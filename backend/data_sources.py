@@ -5,12 +5,51 @@ API de la EIA (v2). Las funciones devuelven `DataFrame` con columnas `date` y
 `price` ya convertidas y ordenadas.
 """
 
-import os, pandas as pd, numpy as np, requests, yfinance as yf
-from typing import Optional
+import os, pandas as pd, numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+from .http_client import PooledClient, SingleFlight, client_from_env
+from .lazy import lazy_module
+from .shared import Budget, eia_budget_from_env
+
+# Dependencias específicas de cada fuente: se importan en el primer uso
+yf = lazy_module("yfinance")
+requests = lazy_module("requests")
 
 # Soporta `EIA_API_KEY` como nombre de variable en entorno (o `EIA_TOKEN`)
 EIA_DEFAULT_TOKEN = os.getenv("EIA_API_KEY") or os.getenv("EIA_TOKEN", "")
 
+# URL base de la API v2 (configurable para apuntar a un servidor local en tests)
+EIA_BASE_URL = os.getenv("EIA_BASE_URL", "https://api.eia.gov/v2")
+
+# Cliente HTTP compartido (keep-alive, reintentos, límite por host), creado en
+# la primera petición, y coalescencia de peticiones simultáneas a la misma serie.
+_http: Optional[PooledClient] = None
+_eia_flight = SingleFlight()
+
+# Presupuesto de peticiones a EIA (`EIA_BUDGET`), común a todos los workers
+# cuando `STATE_BACKEND` es compartido; se crea en el primer uso.
+_budget: Optional[Budget] = None
+
+
+def _client() -> PooledClient:
+    global _http
+    if _http is None:
+        _http = client_from_env()
+    return _http
+
+
+def eia_budget() -> Budget:
+    global _budget
+    if _budget is None:
+        _budget = eia_budget_from_env()
+    return _budget
+
+# Tamaño de página de la API v2 (EIA limita el número de filas por respuesta)
+# y número de páginas que se piden en paralelo.
+EIA_PAGE_SIZE = int(os.getenv("EIA_PAGE_SIZE", "5000"))
+EIA_PAGE_WORKERS = int(os.getenv("EIA_PAGE_WORKERS", "4"))
+
 EIA_SERIES = {
     "wti_daily": "PET.RWTC.D",      # WTI spot diario (EIA)
     "brent_daily": "PET.RBRTE.D",   # Brent spot diario (EIA)
@@ -28,12 +67,20 @@ def load_from_yahoo(symbol: str, start: Optional[str], end: Optional[str], inter
     df.columns = ["date","price"]
     return df
 
-def load_from_eia(series_id: str, token: Optional[str] = None) -> pd.DataFrame:
+def load_from_eia(series_id: str, token: Optional[str] = None,
+                  start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
     """Carga datos desde la API v2 de EIA para `series_id`.
 
     Requiere `token` (o la variable de entorno `EIA_API_KEY`). Devuelve un
     `DataFrame` con `date` (convertida a datetime) y `price` (numérico). Lanza
     `ValueError` si la respuesta no contiene datos.
+
+    `start`/`end` (formato de periodo EIA, p. ej. `2025-01-31` o `2025-01`)
+    filtran el rango pedido; con filtros, un rango sin filas devuelve un
+    `DataFrame` vacío en lugar de error (útil para refrescos incrementales).
+
+    Las llamadas simultáneas para la misma serie comparten una única petición
+    HTTP; cada llamador recibe su propia copia del `DataFrame`.
     """
     token = token or EIA_DEFAULT_TOKEN
     if not (series_id and token):
@@ -41,10 +88,30 @@ def load_from_eia(series_id: str, token: Optional[str] = None) -> pd.DataFrame:
     # Detect common user mistakes: passing a Yahoo ticker (eg 'CL=F') to the EIA loader
     if '=' in series_id:
         raise ValueError(f"Invalid series_id: looks like a ticker '{series_id}'. EIA expects a series id like 'PET.RWTC.D'.")
-    # API v1 series endpoint
-    # Use EIA API v2 seriesid endpoint (backwards-compatible)
-    url = f"https://api.eia.gov/v2/seriesid/{series_id}"
-    resp = requests.get(url, params={'api_key': token}, timeout=30)
+    df = _eia_flight.do((series_id, token, start, end), lambda: _fetch_eia(series_id, token, start, end))
+    return df.copy()
+
+
+def eia_period(ts: pd.Timestamp, series_id: str) -> str:
+    """Formatea `ts` como periodo EIA según la frecuencia del sufijo de `series_id`."""
+    freq = series_id.rsplit('.', 1)[-1].upper()
+    if freq == 'M':
+        return ts.strftime('%Y-%m')
+    if freq == 'A':
+        return ts.strftime('%Y')
+    if freq == 'Q':
+        return f'{ts.year}-Q{ts.quarter}'
+    return ts.strftime('%Y-%m-%d')
+
+
+def _eia_page(url: str, params: dict) -> dict:
+    """Pide una página a EIA y devuelve el JSON (con errores HTTP detallados).
+
+    Cada página consume una petición de `eia_budget()`; sin presupuesto se
+    lanza `shared.BudgetExceeded` antes de contactar con EIA.
+    """
+    eia_budget().acquire()
+    resp = _client().get(url, params=params)
     try:
         resp.raise_for_status()
     except requests.HTTPError as e:
@@ -55,18 +122,75 @@ def load_from_eia(series_id: str, token: Optional[str] = None) -> pd.DataFrame:
         except Exception:
             txt = resp.text
         raise requests.HTTPError(f"EIA HTTP error: {e} - {txt}")
+    return resp.json()
+
 
-    js = resp.json()
+def _eia_rows(js: dict) -> list:
     # La API v2 suele incluir `response.data`; soportamos también otras formas
-    rows = js.get('response', {}).get('data', []) or js.get('data') or js.get('series')
+    return js.get('response', {}).get('data', []) or js.get('data') or js.get('series') or []
+
+
+def _parse_rows(rows: list) -> Tuple[np.ndarray, np.ndarray]:
+    """Convierte filas EIA (`period`/`value` o `date`/`price`) en arrays datetime64/float64."""
+    periods = [r.get('period', r.get('date')) if isinstance(r, dict) else r[0] for r in rows]
+    values = [r.get('value', r.get('price')) if isinstance(r, dict) else r[1] for r in rows]
+    dates = pd.to_datetime(pd.Series(periods, dtype=object), errors='coerce').to_numpy(dtype='datetime64[ns]')
+    prices = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+    return dates, prices
+
+
+def _fetch_eia(series_id: str, token: str, start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+    """Descarga todas las páginas de una serie EIA y normaliza la respuesta.
+
+    La primera página informa del total (`response.total`); el resto se piden
+    en paralelo y cada página se escribe directamente en su tramo de unos
+    arrays NumPy preasignados.
+    """
+    # Use EIA API v2 seriesid endpoint (backwards-compatible)
+    url = f"{EIA_BASE_URL}/seriesid/{series_id}"
+    params = {
+        'api_key': token,
+        'offset': 0,
+        'length': EIA_PAGE_SIZE,
+        'sort[0][column]': 'period',
+        'sort[0][direction]': 'asc',
+    }
+    if start:
+        params['start'] = start
+    if end:
+        params['end'] = end
+
+    js = _eia_page(url, params)
+    rows = _eia_rows(js)
     if not rows:
+        if (start or end) and not (js.get('error') or js.get('message')):
+            return pd.DataFrame({'date': pd.Series([], dtype='datetime64[ns]'), 'price': pd.Series([], dtype=float)})
         # intentar incluir cualquier mensaje de error que vuelva EIA
         err_msg = js.get('error') or js.get('message') or js
         raise ValueError(f"No data returned from EIA for series_id: {err_msg}")
-    df = pd.DataFrame(rows)
-    # v2 rows typically have 'period' and 'value' keys
-    if 'period' in df.columns and 'value' in df.columns:
-        df = df.rename(columns={'period': 'date', 'value': 'price'})
-    df['date'] = pd.to_datetime(df['date'], errors='coerce')
-    df['price'] = pd.to_numeric(df['price'], errors='coerce')
-    return df.dropna().sort_values('date').reset_index(drop=True)
\ No newline at end of file
+
+    try:
+        total = int(js.get('response', {}).get('total') or 0)
+    except (TypeError, ValueError):
+        total = 0
+    total = max(total, len(rows))
+    dates = np.full(total, np.datetime64('NaT'), dtype='datetime64[ns]')
+    prices = np.full(total, np.nan, dtype=np.float64)
+
+    def fill(offset: int, page_rows: list) -> None:
+        page_rows = page_rows[:max(0, total - offset)]
+        if page_rows:
+            dates[offset:offset + len(page_rows)], prices[offset:offset + len(page_rows)] = _parse_rows(page_rows)
+
+    def fetch(offset: int) -> None:
+        fill(offset, _eia_rows(_eia_page(url, {**params, 'offset': offset})))
+
+    fill(0, rows)
+    offsets = range(len(rows), total, len(rows))
+    if len(offsets):
+        with ThreadPoolExecutor(max_workers=max(1, EIA_PAGE_WORKERS)) as pool:
+            list(pool.map(fetch, offsets))
+
+    keep = ~(np.isnat(dates) | np.isnan(prices))
+    df = pd.DataFrame({'date': dates[keep], 'price': prices[keep]})
+    return df.sort_values('date', kind='stable').reset_index(drop=True)
@@ -0,0 +1,133 @@
+"""Agregación y reducción de la historia observada antes de enviarla al gráfico.
+
+- `resample_buckets`: agrega por semana (`W`, lunes a domingo, etiquetada con
+  el domingo) o por mes (`M`, etiquetada con el último día) con `mean`,
+  `last` u `ohlc`. Los cubos se obtienen de los días desde la época y se
+  reducen con `np.add.reduceat`/`np.maximum.reduceat` sobre la serie ya
+  ordenada; los periodos sin datos no aparecen.
+- `lttb`: *Largest-Triangle-Three-Buckets*, conserva `max_points` puntos
+  representativos de la forma de la serie. Los límites de los cubos y sus
+  medias se calculan vectorizados; el bucle restante recorre los cubos (no
+  los puntos) con un `argmax` vectorizado en cada uno.
+
+El coste depende solo del tamaño de la serie y de `max_points`, no de cómo
+se vaya a dibujar en el cliente.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+RULES = ('W', 'M')
+AGGREGATIONS = ('mean', 'last', 'ohlc')
+
+
+def _days(index: pd.DatetimeIndex) -> np.ndarray:
+    """Días (hora local de la serie) desde 1970-01-01 como `datetime64[D]`."""
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.to_numpy().astype('datetime64[D]')
+
+
+def _bucket_ids(days: np.ndarray, rule: str) -> np.ndarray:
+    if rule == 'W':
+        # 1970-01-01 was a Thursday: shifting by 3 days makes weeks start on Monday
+        return (days.astype(np.int64) + 3) // 7
+    return days.astype('datetime64[M]').astype(np.int64)
+
+
+def _bucket_labels(ids: np.ndarray, rule: str) -> np.ndarray:
+    if rule == 'W':
+        return (ids * 7 + 3).astype('datetime64[D]')  # Sunday closing each week
+    return (ids + 1).astype('datetime64[M]').astype('datetime64[D]') - np.timedelta64(1, 'D')
+
+
+def resample_buckets(index: pd.DatetimeIndex, values: np.ndarray, rule: str,
+                     how: str = 'mean') -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """Agrega `values` (ordenados por `index`) por `rule`; devuelve `(fechas, columnas)`.
+
+    Las columnas son `{'value': ...}` para `mean`/`last` y `open/high/low/close`
+    para `ohlc`.
+    """
+    if rule not in RULES:
+        raise ValueError(f'Unknown resample rule {rule}')
+    if how not in AGGREGATIONS:
+        raise ValueError(f'Unknown aggregation {how}')
+    ids = _bucket_ids(_days(index), rule)
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    ends = np.r_[starts[1:], len(ids)]
+    labels = _bucket_labels(ids[starts], rule)
+    if how == 'mean':
+        return labels, {'value': np.add.reduceat(values, starts) / (ends - starts)}
+    if how == 'last':
+        return labels, {'value': values[ends - 1]}
+    return labels, {
+        'open': values[starts],
+        'high': np.maximum.reduceat(values, starts),
+        'low': np.minimum.reduceat(values, starts),
+        'close': values[ends - 1],
+    }
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Índices de los `n_out` puntos elegidos por LTTB (siempre incluye el primero y el último)."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # interior points 1..n-2 split into n_out-2 non-empty buckets [edges[i], edges[i+1])
+    edges = np.floor(np.linspace(1, n - 1, n_out - 1)).astype(np.int64)
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+    # the third vertex for bucket i is the mean of bucket i+1 (the last point for the final bucket)
+    next_x = np.r_[avg_x[1:], x[-1]]
+    next_y = np.r_[avg_y[1:], y[-1]]
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - next_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def _date_strings(dates: np.ndarray) -> np.ndarray:
+    days = dates.astype('datetime64[D]')
+    unit = 'D' if (dates == days).all() else 's'
+    return np.datetime_as_string(dates, unit=unit)
+
+
+def history(s: pd.Series, resample: Optional[str] = None, agg: str = 'mean',
+            max_points: Optional[int] = None, layout: str = 'records') -> Dict | List[Dict]:
+    """Historia observada de `s`, agregada por `resample` y reducida a `max_points`.
+
+    Con `layout='records'` devuelve `[{date, value}]` (o `{date, open, high,
+    low, close}` con `agg='ohlc'`); con `layout='columnar'` un diccionario de
+    listas `{date: [...], value: [...]}`.
+    """
+    index = pd.DatetimeIndex(s.index)
+    values = s.to_numpy(dtype=np.float64)
+    if resample is not None:
+        dates, columns = resample_buckets(index, values, resample, agg)
+    else:
+        local = index.tz_localize(None) if index.tz is not None else index
+        dates, columns = local.to_numpy().astype('datetime64[s]'), {'value': values}
+    if max_points is not None and len(dates) > max_points:
+        shape = columns['close'] if 'close' in columns else columns['value']
+        keep = lttb(dates.astype('datetime64[s]').astype(np.int64), shape, max_points)
+        dates = dates[keep]
+        columns = {k: v[keep] for k, v in columns.items()}
+
+    labels = _date_strings(dates).tolist()
+    lists = {k: v.tolist() for k, v in columns.items()}
+    if layout == 'columnar':
+        return {'date': labels, **lists}
+    names = list(lists)
+    return [dict(zip(['date', *names], row)) for row in zip(labels, *lists.values())]
@@ -0,0 +1,136 @@
+"""Motor vectorizado (NumPy) para evaluar los métodos de forecasting.
+
+Todos los métodos implementados (`naive`, `moving_average`, `ewm`) producen un
+pronóstico plano: un único "nivel" calculado con los datos disponibles hasta
+un origen `t` y repetido durante el horizonte. Este módulo calcula esos
+niveles directamente sobre un array float64 contiguo para muchos orígenes y
+parámetros a la vez:
+
+- media móvil con sumas prefijas (`O(1)` por origen y ventana),
+- EWM (equivalente a `pandas.Series.ewm(alpha).mean()`, `adjust=True`) con
+  pesos `(1 - alpha) ** k` truncados cuando su contribución es menor que la
+  precisión de float64,
+- MAPE/RMSE por *broadcasting* sobre las matrices de errores.
+
+Las formas siguen la convención `(parámetros, orígenes)`.
+"""
+
+import numpy as np
+
+METHODS = ('naive', 'moving_average', 'ewm')
+DEFAULT_WINDOW = 7
+DEFAULT_ALPHA = 0.2
+
+# Rejillas de búsqueda para el modo de auto-ajuste (`tune=True`).
+WINDOW_GRID = np.arange(2, 61)
+ALPHA_GRID = np.round(np.linspace(0.01, 1.0, 100), 2)
+
+# Pesos EWM por debajo de esta fracción no cambian el resultado en float64.
+_EWM_TOL = 1e-17
+# Límite de elementos de la matriz (orígenes x retardos) que se materializa a la vez.
+_EWM_CHUNK = 1 << 22
+
+
+def as_array(values) -> np.ndarray:
+    """Devuelve `values` como array float64 contiguo (sin copia si ya lo es)."""
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def prefix_sums(y: np.ndarray) -> np.ndarray:
+    """Sumas prefijas `c` con `c[t] = y[:t].sum()` (longitud `len(y) + 1`)."""
+    c = np.empty(len(y) + 1, dtype=np.float64)
+    c[0] = 0.0
+    np.cumsum(y, out=c[1:])
+    return c
+
+
+def naive_levels(y: np.ndarray, ends) -> np.ndarray:
+    """Último valor observado antes de cada origen: forma `(E,)`."""
+    return y[np.asarray(ends) - 1]
+
+
+def ma_levels(y: np.ndarray, ends, windows, prefix: np.ndarray | None = None) -> np.ndarray:
+    """Media de las últimas `window` observaciones antes de cada origen: forma `(W, E)`.
+
+    Como en `_forecast_ma`, la ventana se recorta a la longitud disponible.
+    """
+    c = prefix_sums(y) if prefix is None else prefix
+    ends = np.atleast_1d(np.asarray(ends, dtype=np.int64))
+    w = np.minimum(np.atleast_1d(np.asarray(windows, dtype=np.int64))[:, None], ends[None, :])
+    return (c[ends][None, :] - c[ends[None, :] - w]) / w
+
+
+def ewm_levels(y: np.ndarray, ends, alphas) -> np.ndarray:
+    """Último valor de `ewm(alpha).mean()` antes de cada origen: forma `(A, E)`."""
+    ends = np.atleast_1d(np.asarray(ends, dtype=np.int64))
+    decay = 1.0 - np.atleast_1d(np.asarray(alphas, dtype=np.float64))
+    dmax = float(decay.max())
+    lags = int(ends.max())
+    if dmax <= 0.0:
+        lags = 1
+    elif dmax < 1.0:
+        lags = min(lags, int(np.ceil(np.log(_EWM_TOL) / np.log(dmax))) + 1)
+
+    k = np.arange(lags)
+    weights = decay[:, None] ** k[None, :]  # (A, K); lag 0 is the most recent point
+    out = np.empty((len(decay), len(ends)), dtype=np.float64)
+    step = max(1, _EWM_CHUNK // lags)
+    for i in range(0, len(ends), step):
+        pos = ends[i:i + step, None] - 1 - k[None, :]  # (E, K)
+        valid = pos >= 0
+        window = np.where(valid, y[np.maximum(pos, 0)], 0.0)
+        out[:, i:i + step] = (weights @ window.T) / (weights @ valid.T.astype(np.float64))
+    return out
+
+
+def rolling_origins(n: int, horizon: int, folds: int, min_train: int) -> np.ndarray:
+    """Orígenes de una validación *rolling-origin* con ventana expansiva.
+
+    Devuelve `folds` orígenes equiespaciados (enteros, crecientes) cuyo último
+    valor es `n - horizon`, de modo que el último fold coincide con el holdout
+    simple. Lanza `ValueError` si no caben `folds` orígenes distintos con al
+    menos `min_train` puntos de entrenamiento.
+    """
+    last = n - horizon
+    available = last - min_train + 1
+    if folds < 1 or available < folds:
+        raise ValueError(f'Not enough data for {folds} folds; at most {max(available, 0)} possible')
+    step = (last - min_train) // (folds - 1) if folds > 1 else 0
+    return last - step * np.arange(folds - 1, -1, -1, dtype=np.int64)
+
+
+def holdout_windows(y: np.ndarray, origins, horizon: int) -> np.ndarray:
+    """Valores reales de los `horizon` puntos posteriores a cada origen: forma `(E, h)`."""
+    return y[np.asarray(origins)[:, None] + np.arange(horizon)[None, :]]
+
+
+def error_metrics(actual: np.ndarray, levels: np.ndarray):
+    """MAPE (%) y RMSE de pronósticos planos.
+
+    `actual` tiene forma `(E, h)` (valores reales tras cada origen) y `levels`
+    forma `(..., E)`. Devuelve dos arrays de forma `(..., E)`. Igual que
+    `_mape`, los ceros reales se sustituyen por un epsilon en el denominador.
+    """
+    err = actual - levels[..., None]
+    denom = np.where(actual == 0, 1e-8, actual)
+    mape = np.mean(np.abs(err / denom), axis=-1) * 100
+    rmse = np.sqrt(np.mean(err ** 2, axis=-1))
+    return mape, rmse
+
+
+def score_levels(actual: np.ndarray, levels: np.ndarray):
+    """Métricas por fold y agregadas para una matriz de niveles `(P, E)`.
+
+    Devuelve `(mape, rmse, agg_mape, agg_rmse)`: las dos primeras con forma
+    `(P, E)` y las agregadas con forma `(P,)` (MAPE media y RMSE combinado; todos
+    los folds tienen la misma longitud).
+    """
+    mape, rmse = error_metrics(actual, levels)
+    if mape.shape[-1] == 1:
+        return mape, rmse, mape[:, 0], rmse[:, 0]
+    return mape, rmse, mape.mean(axis=1), np.sqrt(np.mean(rmse ** 2, axis=1))
+
+
+def best_index(agg_mape: np.ndarray, agg_rmse: np.ndarray) -> int:
+    """Índice del parámetro con menor MAPE (RMSE como desempate; el primero si hay empate)."""
+    return int(np.lexsort((np.arange(len(agg_mape)), agg_rmse, agg_mape))[0])
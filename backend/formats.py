@@ -0,0 +1,166 @@
+"""Negociación de formato y codificación de las respuestas de forecasting.
+
+Por defecto la respuesta mantiene la forma de siempre (JSON con `series` como
+lista de objetos `{date, forecast}`). Como alternativas opcionales, pedidas con
+`?format=` o con la cabecera `Accept`:
+
+- `columnar`: JSON con `series = {start, freq, forecast: [...]}`; evita un
+  objeto y un `strftime` por fila (`application/vnd.forecast.columnar+json`).
+- `msgpack`: el layout columnar en MessagePack (`application/x-msgpack`),
+  requiere el paquete `msgpack`.
+- `arrow`: stream IPC de Apache Arrow con columnas `date` y `forecast`; las
+  métricas viajan como JSON en los metadatos del esquema bajo la clave
+  `forecast` (`application/vnd.apache.arrow.stream`), requiere `pyarrow`.
+
+Con `JSON_ENCODER=orjson` (y `orjson` instalado) los formatos JSON se
+serializan con orjson en lugar del módulo `json` estándar.
+
+Si se pide explícitamente un formato cuya dependencia no está instalada se
+responde 406; en la negociación por `Accept` simplemente se descarta.
+"""
+
+import importlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from fastapi import HTTPException
+
+FORMATS = ('json', 'columnar', 'msgpack', 'arrow')
+
+MEDIA_TYPES = {
+    'json': 'application/json',
+    'columnar': 'application/vnd.forecast.columnar+json',
+    'msgpack': 'application/x-msgpack',
+    'arrow': 'application/vnd.apache.arrow.stream',
+}
+
+# tipos aceptados en `Accept` para cada formato (además del de `MEDIA_TYPES`)
+_ACCEPT_ALIASES = {
+    'application/msgpack': 'msgpack',
+    'application/vnd.msgpack': 'msgpack',
+    'application/vnd.apache.arrow.file': 'arrow',
+}
+
+# dependencia opcional de cada formato binario
+_REQUIRES = {'msgpack': 'msgpack', 'arrow': 'pyarrow'}
+
+
+def layout(fmt: str) -> str:
+    """Layout de `series` que necesita `fmt`: `records` (JSON clásico) o `columnar`."""
+    return 'records' if fmt == 'json' else 'columnar'
+
+
+def _optional(name: str):
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def available(fmt: str) -> bool:
+    """`True` si la dependencia opcional de `fmt` (si la tiene) está instalada."""
+    dep = _REQUIRES.get(fmt)
+    return dep is None or _optional(dep) is not None
+
+
+def _accepted(accept: str) -> List[str]:
+    """Tipos de `accept` ordenados por calidad (`q`), conservando el orden en empates."""
+    ranked: List[Tuple[float, int, str]] = []
+    for pos, part in enumerate(accept.split(',')):
+        media, *params = [p.strip() for p in part.split(';')]
+        q = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if media and q > 0:
+            ranked.append((-q, pos, media.lower()))
+    return [media for _, _, media in sorted(ranked)]
+
+
+def negotiate(fmt: Optional[str], accept: Optional[str]) -> str:
+    """Elige el formato de respuesta.
+
+    `fmt` (el parámetro `format`) tiene prioridad y lanza `HTTPException(406)`
+    si su dependencia no está disponible. Sin él se recorre `accept` por orden
+    de preferencia y se usa el primer formato conocido e instalado; si no hay
+    ninguno, `json`.
+    """
+    if fmt:
+        fmt = fmt.lower()
+        if fmt not in FORMATS:
+            raise HTTPException(status_code=400, detail=f'Unknown format {fmt}')
+        if not available(fmt):
+            raise HTTPException(status_code=406, detail=f"Format '{fmt}' requires the '{_REQUIRES[fmt]}' package")
+        return fmt
+    by_media = {media: name for name, media in MEDIA_TYPES.items()}
+    by_media.update(_ACCEPT_ALIASES)
+    for media in _accepted(accept or ''):
+        name = by_media.get(media)
+        if name is not None and available(name):
+            return name
+    return 'json'
+
+
+def _dumps_json(res: Dict) -> bytes:
+    if os.getenv('JSON_ENCODER', '').lower() == 'orjson':
+        orjson = _optional('orjson')
+        if orjson is not None:
+            return orjson.dumps(res, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(res, ensure_ascii=False, allow_nan=False, separators=(',', ':'),
+                      default=_json_default).encode('utf-8')
+
+
+def _json_default(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def _plain(res: Dict) -> Dict:
+    """Copia de `res` con el array de `series` como lista (para codificadores sin numpy)."""
+    series = res.get('series')
+    if isinstance(series, dict) and isinstance(series.get('forecast'), np.ndarray):
+        res = {**res, 'series': {**series, 'forecast': series['forecast'].tolist()}}
+    return res
+
+
+def _dumps_msgpack(res: Dict) -> bytes:
+    import msgpack
+
+    return msgpack.packb(_plain(res), use_bin_type=True)
+
+
+def _dumps_arrow(res: Dict) -> bytes:
+    import pyarrow as pa
+
+    series = res['series']
+    values = np.asarray(series['forecast'], dtype=np.float64)
+    start = np.datetime64(series['start'], 'D')
+    dates = start + np.arange(len(values)) * np.timedelta64(1, series['freq'])
+    meta = {k: v for k, v in res.items() if k != 'series'}
+    table = pa.table(
+        {'date': pa.array(dates.astype('datetime64[D]')), 'forecast': pa.array(values)},
+        metadata={'forecast': json.dumps(meta, separators=(',', ':'))},
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+_ENCODERS = {
+    'json': _dumps_json,
+    'columnar': _dumps_json,
+    'msgpack': _dumps_msgpack,
+    'arrow': _dumps_arrow,
+}
+
+
+def encode(res: Dict, fmt: str) -> bytes:
+    """Serializa el resultado de `evaluate_methods` (con el layout de `fmt`)."""
+    return _ENCODERS[fmt](res)
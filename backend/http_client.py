@@ -0,0 +1,135 @@
+"""Cliente HTTP compartido para las fuentes externas (EIA).
+
+- `PooledClient`: una `requests.Session` con pool de conexiones keep-alive,
+  reintentos con backoff exponencial y *jitter* ante 429/5xx o errores de red
+  (respetando `Retry-After`), y un límite de peticiones simultáneas por host.
+- `SingleFlight`: agrupa llamadas concurrentes con la misma clave en una sola
+  ejecución cuyo resultado (o excepción) reciben todos los que esperan.
+
+Configuración por entorno (valores por defecto entre paréntesis):
+`HTTP_POOL_SIZE` (16), `HTTP_PER_HOST_LIMIT` (4), `HTTP_RETRIES` (3),
+`HTTP_BACKOFF` (0.5 s), `HTTP_MAX_BACKOFF` (8 s), `HTTP_TIMEOUT` (30 s).
+"""
+
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, Optional, TypeVar
+from urllib.parse import urlsplit
+
+from .lazy import lazy_module
+
+requests = lazy_module('requests')
+
+T = TypeVar('T')
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class SingleFlight:
+    """Coalesce llamadas concurrentes por clave (patrón *single-flight*)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Ejecuta `fn` una sola vez para todas las llamadas simultáneas con `key`."""
+        with self._lock:
+            fut = self._inflight.get(key)
+            leader = fut is None
+            if leader:
+                fut = self._inflight[key] = Future()
+        if not leader:
+            return fut.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def inflight(self) -> int:
+        with self._lock:
+            return len(self._inflight)
+
+
+class PooledClient:
+    """`GET` con conexiones reutilizables, reintentos y límite de concurrencia por host."""
+
+    def __init__(self, pool_size: int = 16, per_host_limit: int = 4, retries: int = 3,
+                 backoff: float = 0.5, max_backoff: float = 8.0, timeout: float = 30.0,
+                 sleep: Callable[[float], None] = time.sleep):
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.per_host_limit = max(1, per_host_limit)
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, threading.BoundedSemaphore] = {}
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc
+        with self._lock:
+            sem = self._hosts.get(host)
+            if sem is None:
+                sem = self._hosts[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return sem
+
+    def _delay(self, attempt: int, resp=None) -> float:
+        retry_after = getattr(resp, 'headers', {}).get('Retry-After') if resp is not None else None
+        if retry_after:
+            try:
+                return min(self.max_backoff, float(retry_after))
+            except ValueError:
+                pass
+        # "full jitter": spreads retries from concurrent clients apart
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+    def get(self, url: str, params: Optional[dict] = None, timeout: Optional[float] = None):
+        """Hace un `GET` reintentando ante 429/5xx y errores de conexión.
+
+        Devuelve la última respuesta (aunque sea un error HTTP) para que el
+        llamador decida con `raise_for_status()`.
+        """
+        slot = self._host_slot(url)
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                with slot:
+                    resp = self.session.get(url, params=params, timeout=timeout or self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if last:
+                    raise
+                self._sleep(self._delay(attempt))
+                continue
+            if getattr(resp, 'status_code', 200) in RETRY_STATUSES and not last:
+                self._sleep(self._delay(attempt, resp))
+                continue
+            return resp
+
+
+def client_from_env() -> PooledClient:
+    """Crea un `PooledClient` con la configuración `HTTP_*` del entorno."""
+    return PooledClient(
+        pool_size=int(os.getenv('HTTP_POOL_SIZE', '16')),
+        per_host_limit=int(os.getenv('HTTP_PER_HOST_LIMIT', '4')),
+        retries=int(os.getenv('HTTP_RETRIES', '3')),
+        backoff=float(os.getenv('HTTP_BACKOFF', '0.5')),
+        max_backoff=float(os.getenv('HTTP_MAX_BACKOFF', '8')),
+        timeout=float(os.getenv('HTTP_TIMEOUT', '30')),
+    )
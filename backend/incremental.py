@@ -0,0 +1,256 @@
+"""Estado incremental de los modelos por serie (actualización en O(puntos nuevos)).
+
+`ModelState` guarda, para una serie y unos parámetros `window`/`alpha`:
+
+- el último valor (`naive`),
+- un buffer circular con las últimas `window` observaciones y su suma
+  (`moving_average`),
+- numerador y denominador de la EWM con `adjust=True` (`ewm`), de modo que
+  `num / den` es exactamente `series.ewm(alpha=alpha).mean().iloc[-1]`,
+- acumuladores de error a un paso de cada método (suma de errores
+  porcentuales absolutos, suma de cuadrados y número de puntos) para MAPE/RMSE.
+
+`ModelState.fit` inicializa el estado con una pasada vectorizada O(n) sobre la
+historia (los niveles coinciden con `_forecast_naive`, `_forecast_ma` y
+`_forecast_ewm`); `update` solo recorre las observaciones posteriores a la
+última fecha conocida.
+
+Las métricas son *prequential*: cada observación nueva se compara con el
+pronóstico que cada método tenía antes de verla.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from . import engine
+
+# como en `engine.error_metrics`, un real igual a cero usa este denominador
+_ZERO_DENOM = 1e-8
+
+
+class ModelState:
+    """Niveles y errores acumulados de `naive`, `moving_average` y `ewm` para una serie."""
+
+    def __init__(self, window: int = engine.DEFAULT_WINDOW, alpha: float = engine.DEFAULT_ALPHA):
+        self.window = int(window)
+        self.alpha = float(alpha)
+        self.decay = 1.0 - self.alpha
+        self.n = 0
+        self.last_date: Optional[pd.Timestamp] = None
+        self.last = np.nan
+        self.ring = np.zeros(self.window, dtype=np.float64)
+        self.ring_sum = 0.0
+        self._pos = 0
+        self.ewm_num = 0.0
+        self.ewm_den = 0.0
+        self.ape = np.zeros(len(engine.METHODS))
+        self.sq = np.zeros(len(engine.METHODS))
+        self.scored = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def fit(cls, s: pd.Series, window: int = engine.DEFAULT_WINDOW,
+            alpha: float = engine.DEFAULT_ALPHA) -> 'ModelState':
+        """Construye el estado para la serie completa `s` en una pasada vectorizada."""
+        state = cls(window, alpha)
+        y = engine.as_array(s.to_numpy(dtype=np.float64))
+        n = len(y)
+        if n == 0:
+            return state
+        if n > 1:
+            # one-step-ahead levels: for every t, each method's forecast from y[:t].
+            # The EWM levels come from pandas' O(n) recursion: `engine.ewm_levels`
+            # truncates a window whose length grows like 1/alpha, too slow for
+            # every origin of a long series with a small alpha.
+            ends = np.arange(1, n)
+            levels = np.vstack([
+                engine.naive_levels(y, ends),
+                engine.ma_levels(y, ends, [state.window])[0],
+                pd.Series(y).ewm(alpha=state.alpha).mean().to_numpy()[:-1],
+            ])
+            state._score(y[1:], levels)
+        tail = y[-state.window:]
+        state.ring[:len(tail)] = tail
+        state._pos = len(tail) % state.window
+        state.ring_sum = float(tail.sum())
+        weights = state.decay ** np.arange(n)
+        state.ewm_num = float(weights @ y[::-1])
+        state.ewm_den = float(weights.sum())
+        state.n = n
+        state.last = float(y[-1])
+        state.last_date = pd.Timestamp(s.index[-1])
+        return state
+
+    def _score(self, actual: np.ndarray, levels: np.ndarray) -> None:
+        err = actual - levels
+        denom = np.where(actual == 0, _ZERO_DENOM, actual)
+        self.ape += np.abs(err / denom).sum(axis=-1)
+        self.sq += (err ** 2).sum(axis=-1)
+        self.scored += len(actual)
+
+    def levels(self) -> np.ndarray:
+        """Nivel actual de cada método (orden de `engine.METHODS`)."""
+        ma = self.ring_sum / min(self.n, self.window) if self.n else np.nan
+        ewm = self.ewm_num / self.ewm_den if self.ewm_den else np.nan
+        return np.array([self.last, ma, ewm])
+
+    def _push(self, value: float) -> None:
+        if self.n:
+            self._score(np.array([value]), self.levels()[:, None])
+        self.last = value
+        if self.n >= self.window:
+            self.ring_sum -= self.ring[self._pos]
+        self.ring[self._pos] = value
+        self.ring_sum += value
+        self._pos = (self._pos + 1) % self.window
+        if self._pos == 0:
+            # resync the running sum once per lap so rounding errors cannot accumulate
+            self.ring_sum = float(self.ring[:min(self.n + 1, self.window)].sum())
+        self.ewm_num = self.decay * self.ewm_num + value
+        self.ewm_den = self.decay * self.ewm_den + 1.0
+        self.n += 1
+
+    def update(self, s: pd.Series) -> int:
+        """Añade las observaciones de `s` posteriores a `last_date`; devuelve cuántas.
+
+        Los valores `NaN` se ignoran. El coste es proporcional al número de
+        observaciones nuevas, no a la longitud de la historia.
+        """
+        if self.last_date is not None:
+            if s.index.is_monotonic_increasing:
+                # a binary search keeps a full cached history from costing O(n)
+                s = s.iloc[s.index.searchsorted(self.last_date, side='right'):]
+            else:
+                s = s[s.index > self.last_date]
+        s = s.dropna()
+        if s.empty:
+            return 0
+        s = s.sort_index()
+        with self._lock:
+            for value in s.to_numpy(dtype=np.float64):
+                self._push(float(value))
+            self.last_date = pd.Timestamp(s.index[-1])
+        return len(s)
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """MAPE (%) y RMSE a un paso de cada método sobre todas las observaciones puntuadas."""
+        if not self.scored:
+            return {name: {'mape': None, 'rmse': None} for name in engine.METHODS}
+        mape = self.ape / self.scored * 100
+        rmse = np.sqrt(self.sq / self.scored)
+        return {name: {'mape': round(float(mape[i]), 4), 'rmse': round(float(rmse[i]), 4)}
+                for i, name in enumerate(engine.METHODS)}
+
+    def forecast(self, horizon: int = 7, method: Optional[str] = None, layout: str = 'records') -> Dict:
+        """Pronóstico plano con la forma de `evaluate_methods` más el bloque `online`.
+
+        `layout` ('records' o 'columnar') da a `series` la misma forma que en
+        `evaluate_methods`.
+
+        Sin `method` se elige el de menor MAPE acumulada (RMSE como desempate).
+        Lanza `ValueError` si el método no existe o aún no hay observaciones.
+        """
+        if not self.n:
+            raise ValueError('Model has no observations yet')
+        with self._lock:
+            levels = self.levels()
+            if self.scored:
+                mape = self.ape / self.scored * 100
+                rmse = np.sqrt(self.sq / self.scored)
+            else:
+                mape = rmse = np.zeros(len(engine.METHODS))
+            metrics = self.metrics()
+            n, last_date, scored = self.n, self.last_date, self.scored
+        if method:
+            method = method.lower()
+            if method not in engine.METHODS:
+                raise ValueError(f'Unknown method {method}')
+            i = engine.METHODS.index(method)
+        else:
+            i = engine.best_index(mape, rmse)
+        start = last_date + pd.Timedelta(days=1)
+        level = float(levels[i])
+        if layout == 'columnar':
+            series = {'start': start.strftime('%Y-%m-%d'), 'freq': 'D', 'forecast': np.full(horizon, level)}
+        else:
+            dates = pd.date_range(start, periods=horizon, freq='D')
+            series = [{'date': d, 'forecast': level} for d in dates.strftime('%Y-%m-%d')]
+        return {
+            'best_method': engine.METHODS[i],
+            'mape': round(float(mape[i]), 4),
+            'rmse': round(float(rmse[i]), 4),
+            'series': series,
+            'online': {
+                'observations': n,
+                'scored': scored,
+                'last_date': last_date.strftime('%Y-%m-%d'),
+                'window': self.window,
+                'alpha': self.alpha,
+                'metrics': metrics,
+            },
+        }
+
+
+class ModelRegistry:
+    """Estados de modelo por clave `(series_id, window, alpha)`, con expulsión LRU."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        self._states: "OrderedDict[Hashable, ModelState]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[ModelState]:
+        with self._lock:
+            state = self._states.get(key)
+            if state is not None:
+                self._states.move_to_end(key)
+            return state
+
+    def get_or_fit(self, key: Hashable, history: Callable[[], Optional[pd.Series]],
+                   window: int, alpha: float) -> Optional[ModelState]:
+        """Devuelve el estado de `key` o lo ajusta con `history()` (`None` si no hay historia)."""
+        state = self.get(key)
+        if state is not None:
+            return state
+        s = history()
+        if s is None or s.empty:
+            return None
+        state = ModelState.fit(s, window=window, alpha=alpha)
+        with self._lock:
+            # another request may have fitted it meanwhile; keep the first one
+            state = self._states.setdefault(key, state)
+            self._states.move_to_end(key)
+            while len(self._states) > self.max_entries:
+                self._states.popitem(last=False)
+        return state
+
+    def for_series(self, series_id: Hashable) -> List[ModelState]:
+        """Todos los estados de `series_id` (uno por combinación de parámetros)."""
+        with self._lock:
+            return [state for key, state in self._states.items() if key[0] == series_id]
+
+    def discard(self, prefix: Hashable) -> int:
+        """Olvida todos los estados cuya clave empieza por `prefix`; devuelve cuántos."""
+        with self._lock:
+            keys = [k for k in self._states if k[0] == prefix]
+            for k in keys:
+                del self._states[k]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'entries': len(self._states), 'max_entries': self.max_entries}
+
+
+def registry_from_env() -> ModelRegistry:
+    """Crea un `ModelRegistry` con `MODEL_STATE_MAX_ENTRIES` (1024 por defecto)."""
+    return ModelRegistry(max_entries=int(os.getenv('MODEL_STATE_MAX_ENTRIES', '1024')))
@@ -0,0 +1,224 @@
+"""Lectura en streaming de ficheros subidos a `/api/upload`.
+
+En lugar de cargar el fichero completo en memoria, se lee por bloques y solo
+se conservan las columnas `date` y `price`/`close` (con `price` como float64).
+La memoria máxima queda así ligada al tamaño de la serie retenida y no al
+tamaño del fichero.
+
+Si el fichero trae además una columna `series_id` (o `symbol`) se trata como
+formato largo con varias series: la columna se conserva como `series_id`
+categórica (códigos enteros + una sola copia de cada identificador).
+
+Límites configurables por entorno (HTTP 413 si se superan):
+- `UPLOAD_MAX_BYTES`: tamaño máximo del fichero (por defecto 512 MB).
+- `UPLOAD_MAX_ROWS`: número máximo de filas de datos (por defecto 10 millones).
+- `UPLOAD_CHUNK_ROWS`: filas por bloque al parsear (por defecto 100000).
+"""
+
+import os
+from typing import BinaryIO, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+from pandas.api.types import union_categoricals
+from pandas.tseries.api import guess_datetime_format
+
+_MISSING_COLUMNS = "File must contain 'date' and 'price' (or 'close') columns"
+
+# columnas que identifican la serie en un fichero de formato largo, por preferencia
+ID_COLUMNS = ('series_id', 'symbol')
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def max_upload_bytes() -> int:
+    """Límite `UPLOAD_MAX_BYTES` (por defecto 512 MB)."""
+    return _env_int('UPLOAD_MAX_BYTES', 512 * 1024 * 1024)
+
+
+def _resolve_columns(columns) -> Tuple[str, str]:
+    """Devuelve los nombres reales de las columnas de fecha y precio (sin distinguir mayúsculas)."""
+    lower_cols = {str(c).strip().lower(): c for c in columns if c is not None}
+    if 'date' not in lower_cols:
+        raise HTTPException(status_code=400, detail=_MISSING_COLUMNS)
+    if 'price' in lower_cols:
+        return lower_cols['date'], lower_cols['price']
+    if 'close' in lower_cols:
+        return lower_cols['date'], lower_cols['close']
+    raise HTTPException(status_code=400, detail=_MISSING_COLUMNS)
+
+
+def _id_column(columns) -> Optional[str]:
+    """Nombre real de la columna `series_id`/`symbol`, o `None` si el fichero es de una sola serie."""
+    lower_cols = {str(c).strip().lower(): c for c in columns if c is not None}
+    for name in ID_COLUMNS:
+        if name in lower_cols:
+            return lower_cols[name]
+    return None
+
+
+class _Collector:
+    """Acumula bloques `(date, price[, series_id])` ya filtrados y controla el límite de filas.
+
+    El formato de las fechas de texto se deduce una sola vez, del primer valor
+    no vacío, y se aplica a todos los bloques: así una fecha ambigua como
+    `03/02/2024` se lee igual en cualquier bloque que en el primero.
+    """
+
+    def __init__(self, max_rows: int):
+        self.max_rows = max_rows
+        self.date_format: Optional[str] = None
+        self._format_known = False
+        self.rows = 0
+        self.dates: List[pd.Series] = []
+        self.prices: List[np.ndarray] = []
+        self.ids: List[pd.Categorical] = []
+
+    def add(self, dates, prices, ids=None) -> None:
+        self.rows += len(prices)
+        if self.rows > self.max_rows:
+            raise HTTPException(status_code=413, detail=f'File exceeds the maximum of {self.max_rows} rows')
+        prices = pd.to_numeric(pd.Series(prices), errors='coerce').to_numpy(dtype=np.float64)
+        dates = pd.Series(dates)
+        if not self._format_known:
+            self._guess_format(dates)
+        dates = pd.to_datetime(dates, errors='coerce', format=self.date_format)
+        keep = ~(np.isnan(prices) | dates.isna().to_numpy())
+        if ids is not None:
+            ids = ids.array if isinstance(getattr(ids, 'dtype', None), pd.CategoricalDtype) else pd.Categorical(ids)
+            names = ids.categories.astype(str)
+            if names.is_unique:
+                ids = ids.rename_categories(names)
+            else:
+                # e.g. int 1 and str '1' in an Excel column: both are the series '1'
+                raw = pd.Series(ids)
+                ids = pd.Categorical(raw.astype(str).where(raw.notna()))
+            keep &= ids.codes >= 0
+        if keep.any():
+            self.dates.append(dates[keep].reset_index(drop=True))
+            self.prices.append(prices[keep])
+            if ids is not None:
+                self.ids.append(ids[keep])
+
+    def _guess_format(self, dates: pd.Series) -> None:
+        first = dates.dropna()
+        first = first[first.astype(str).str.strip() != ''] if len(first) else first
+        if first.empty:
+            return
+        value = first.iloc[0]
+        if isinstance(value, str):
+            self.date_format = guess_datetime_format(value.strip())
+        # datetimes from Excel (or an unrecognised layout) keep pandas' own parsing
+        self._format_known = True
+
+    def frame(self) -> pd.DataFrame:
+        if not self.prices:
+            return pd.DataFrame({'date': pd.Series([], dtype='datetime64[ns]'), 'price': np.array([], dtype=np.float64)})
+        df = pd.DataFrame({
+            'date': pd.concat(self.dates, ignore_index=True),
+            'price': np.concatenate(self.prices),
+        })
+        if self.ids:
+            df['series_id'] = union_categoricals(self.ids)
+        return df
+
+
+def _read_csv(fh: BinaryIO, collector: _Collector, chunk_rows: int) -> None:
+    header = pd.read_csv(fh, nrows=0)
+    date_col, price_col = _resolve_columns(header.columns)
+    id_col = _id_column(header.columns)
+    fh.seek(0)
+    usecols = [date_col, price_col]
+    dtype = {date_col: object}
+    if id_col is not None:
+        # ids are parsed straight into categorical codes, not one str object per row
+        usecols.append(id_col)
+        dtype[id_col] = 'category'
+    reader = pd.read_csv(
+        fh,
+        usecols=usecols,
+        dtype=dtype,
+        chunksize=chunk_rows,
+    )
+    with reader:
+        for chunk in reader:
+            collector.add(chunk[date_col], chunk[price_col], chunk[id_col] if id_col is not None else None)
+
+
+def _read_xlsx(fh: BinaryIO, collector: _Collector, chunk_rows: int) -> None:
+    # the Excel engine is only needed (and imported) when a workbook arrives
+    from openpyxl import load_workbook
+
+    wb = load_workbook(fh, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, None) or ()
+        date_col, price_col = _resolve_columns(header)
+        id_col = _id_column(header)
+        di, pi = list(header).index(date_col), list(header).index(price_col)
+        ii = list(header).index(id_col) if id_col is not None else None
+        dates, prices, ids = [], [], []
+        for row in rows:
+            dates.append(row[di] if di < len(row) else None)
+            prices.append(row[pi] if pi < len(row) else None)
+            if ii is not None:
+                ids.append(row[ii] if ii < len(row) else None)
+            if len(prices) >= chunk_rows:
+                collector.add(dates, prices, ids if ii is not None else None)
+                dates, prices, ids = [], [], []
+        if prices:
+            collector.add(dates, prices, ids if ii is not None else None)
+    finally:
+        wb.close()
+
+
+def _file_size(fh: BinaryIO) -> Optional[int]:
+    try:
+        pos = fh.tell()
+        fh.seek(0, os.SEEK_END)
+        size = fh.tell()
+        fh.seek(pos)
+        return size
+    except (AttributeError, OSError):
+        return None
+
+
+def read_upload(fh: BinaryIO, filename: str | None, content_type: str | None,
+                max_bytes: int | None = None, max_rows: int | None = None,
+                chunk_rows: int | None = None) -> pd.DataFrame:
+    """Parsea un CSV/XLSX subido y devuelve `DataFrame(date, price)`.
+
+    Con una columna `series_id`/`symbol` el resultado incluye además
+    `series_id` (categórica) para el formato largo multi-serie.
+
+    Función síncrona y CPU-bound: desde un endpoint `async` debe ejecutarse
+    fuera del event loop (p. ej. con `run_in_threadpool`). Lanza
+    `HTTPException(413)` si se superan los límites y `HTTPException(400)` si
+    faltan columnas.
+    """
+    max_bytes = max_bytes if max_bytes is not None else max_upload_bytes()
+    max_rows = max_rows if max_rows is not None else _env_int('UPLOAD_MAX_ROWS', 10_000_000)
+    chunk_rows = chunk_rows if chunk_rows is not None else _env_int('UPLOAD_CHUNK_ROWS', 100_000)
+
+    size = _file_size(fh)
+    if size is not None and size > max_bytes:
+        raise HTTPException(status_code=413, detail=f'File exceeds the maximum of {max_bytes} bytes')
+    fh.seek(0)
+
+    collector = _Collector(max_rows)
+    name = (filename or '').lower()
+    if name.endswith('.csv') or content_type == 'text/csv':
+        _read_csv(fh, collector, chunk_rows)
+    elif name.endswith(('.xlsx', '.xlsm')) or not name:
+        _read_xlsx(fh, collector, chunk_rows)
+    else:
+        # legacy formats (.xls, .ods) need a non-streaming pandas engine
+        df = pd.read_excel(fh)
+        date_col, price_col = _resolve_columns(df.columns)
+        id_col = _id_column(df.columns)
+        collector.add(df[date_col], df[price_col], df[id_col] if id_col is not None else None)
+    return collector.frame()
+
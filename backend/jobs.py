@@ -0,0 +1,282 @@
+"""Cola de trabajos asíncronos de forecasting (`/api/jobs`).
+
+Un trabajo es una función `fn(job)` que se ejecuta en un pool de hilos propio
+(`JOB_WORKERS`, 2 por defecto). Las descargas y el parseo ocurren en ese hilo
+y la evaluación se envía al pool de procesos compartido
+(`workers.submit_evaluation`). Mientras avanza, `fn` publica etapas con
+`job.emit(stage, progress)`; los clientes las leen con `GET /api/jobs/{id}` o
+en streaming con Server-Sent Events (`sse_events`).
+
+- Contrapresión: si ya hay `JOB_QUEUE_MAX` (32) trabajos sin terminar,
+  `submit` lanza `HTTPException(429)` con `Retry-After`.
+- Cancelación: un trabajo en cola no llega a ejecutarse. Uno en curso se
+  detiene en la siguiente etapa (`job.check()`), y si la evaluación aún no
+  ha empezado en el pool de procesos también se cancela.
+- Los trabajos terminados se conservan `JOB_TTL` segundos (3600) y luego se
+  olvidan.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from . import telemetry
+from .workers import error_payload
+
+TERMINAL = frozenset({'done', 'failed', 'cancelled'})
+
+
+class JobCancelled(Exception):
+    """Se lanza dentro de `fn` cuando el trabajo ha sido cancelado."""
+
+
+class Job:
+    """Estado, resultado y eventos de progreso de un trabajo."""
+
+    def __init__(self, job_id: str, kind: str, clock: Callable[[], float] = time.time):
+        self.id = job_id
+        self.kind = kind
+        self.status = 'queued'
+        self.stage = 'queued'
+        self.progress = 0.0
+        self.result: Optional[Dict] = None
+        self.error: Optional[Dict] = None
+        self._clock = clock
+        self.created = self.updated = clock()
+        self.events: List[Dict] = []
+        self._cond = threading.Condition()
+        # SSE streams waiting in an event loop: `emit` wakes them from any thread
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+        self._task: Optional[Future] = None
+        self.emit('queued', 0.0)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in TERMINAL
+
+    def emit(self, stage: str, progress: float, status: Optional[str] = None) -> None:
+        """Publica una etapa (`fetch`, `parse`, `evaluate`...) con su fracción de avance."""
+        with self._cond:
+            if self.finished:
+                return
+            self.stage = stage
+            self.progress = progress
+            if status is not None:
+                self.status = status
+            self.updated = self._clock()
+            self.events.append({'stage': stage, 'status': self.status, 'progress': progress, 'ts': self.updated})
+            self._cond.notify_all()
+            for loop, ready in self._waiters:
+                try:
+                    loop.call_soon_threadsafe(ready.set)
+                except RuntimeError:  # the stream's loop is already closed
+                    pass
+
+    def check(self) -> None:
+        """Lanza `JobCancelled` si el trabajo se ha cancelado (llamar entre etapas)."""
+        if self.status == 'cancelled':
+            raise JobCancelled(self.id)
+
+    def wait(self, fut: Future):
+        """Espera el resultado de `fut` (p. ej. una evaluación en el pool de procesos)."""
+        with self._cond:
+            self._task = fut
+        self.check()
+        try:
+            return fut.result()
+        except CancelledError:
+            raise JobCancelled(self.id)
+        finally:
+            with self._cond:
+                self._task = None
+
+    def cancel(self) -> bool:
+        """Marca el trabajo como cancelado; `False` si ya había terminado."""
+        with self._cond:
+            if self.finished:
+                return False
+            task = self._task
+            self.emit('cancelled', self.progress, status='cancelled')
+        if task is not None:
+            task.cancel()
+        return True
+
+    def finish(self, result: Dict) -> None:
+        with self._cond:
+            if self.finished:
+                return
+            self.result = result
+            self.emit('done', 1.0, status='done')
+
+    def fail(self, error: Dict) -> None:
+        with self._cond:
+            if self.finished:
+                return
+            self.error = error
+            self.emit('failed', self.progress, status='failed')
+
+    async def events_since(self, index: int, timeout: float) -> List[Dict]:
+        """Eventos a partir de `index`, esperando hasta `timeout` s si aún no hay nuevos.
+
+        La espera ocurre en el bucle de eventos, sin ocupar un hilo del pool.
+        """
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._cond:
+            if len(self.events) > index or self.finished:
+                return self.events[index:]
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._cond:
+                self._waiters.remove(waiter)
+        with self._cond:
+            return self.events[index:]
+
+    def snapshot(self) -> Dict:
+        with self._cond:
+            out = {
+                'id': self.id,
+                'kind': self.kind,
+                'status': self.status,
+                'stage': self.stage,
+                'progress': self.progress,
+                'created': self.created,
+                'updated': self.updated,
+            }
+            if self.result is not None:
+                out['result'] = self.result
+            if self.error is not None:
+                out['error'] = self.error
+            return out
+
+
+class JobQueue:
+    """Registro de trabajos con ejecución acotada y límite de trabajos pendientes."""
+
+    def __init__(self, workers: int = 2, max_pending: int = 32, ttl: float = 3600.0,
+                 clock: Callable[[], float] = time.time):
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self.rejected = 0
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='job')
+        return self._pool
+
+    def _prune(self) -> None:
+        cutoff = self._clock() - self.ttl
+        for job_id in [j.id for j in self._jobs.values() if j.finished and j.updated < cutoff]:
+            del self._jobs[job_id]
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(1 for j in self._jobs.values() if not j.finished)
+
+    def submit(self, kind: str, fn: Callable[[Job], Dict], cleanup: Optional[Callable[[], None]] = None) -> Job:
+        """Encola `fn`; lanza `HTTPException(429)` si la cola está llena.
+
+        `cleanup` (si se da) se llama al terminar el trabajo, también si se
+        cancela antes de empezar.
+        """
+        with self._lock:
+            self._prune()
+            if sum(1 for j in self._jobs.values() if not j.finished) >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(status_code=429, detail=f'Job queue is full ({self.max_pending} pending jobs)',
+                                    headers={'Retry-After': '5'})
+            job = Job(uuid.uuid4().hex, kind, clock=self._clock)
+            self._jobs[job.id] = job
+            self._executor().submit(self._run, job, fn, cleanup)
+        return job
+
+    def _run(self, job: Job, fn: Callable[[Job], Dict], cleanup: Optional[Callable[[], None]]) -> None:
+        try:
+            if job.finished:
+                return
+            job.emit('started', job.progress, status='running')
+            with telemetry.request_scope('/api/jobs'):
+                try:
+                    result = fn(job)
+                except JobCancelled:
+                    return
+                except Exception as e:
+                    job.fail(error_payload(e)['error'])
+                else:
+                    job.finish(result)
+        finally:
+            if cleanup is not None:
+                cleanup()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return {'jobs': counts, 'max_pending': self.max_pending, 'workers': self.workers,
+                    'rejected': self.rejected}
+
+    def shutdown(self) -> None:
+        """Cancela los trabajos pendientes y cierra el pool (se recrea bajo demanda).
+
+        Los que seguían en cola salen enseguida sin ejecutarse (y con su `cleanup`).
+        """
+        with self._lock:
+            jobs = [j for j in self._jobs.values() if not j.finished]
+            pool, self._pool = self._pool, None
+        for job in jobs:
+            job.cancel()
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+
+async def sse_events(job: Job, heartbeat: float = 15.0) -> AsyncIterator[str]:
+    """Genera los eventos de `job` en formato Server-Sent Events hasta que termina.
+
+    Cada evento lleva `event: <stage>` y `data: <json>`; el último incluye el
+    estado completo (`snapshot`). Sin novedades se envía un comentario cada
+    `heartbeat` segundos para mantener viva la conexión tras los proxies.
+    Es un generador asíncrono: cada cliente conectado espera en el bucle de
+    eventos y no retiene un hilo del pool de Starlette.
+    """
+    sent = 0
+    while True:
+        events = await job.events_since(sent, heartbeat)
+        if not events:
+            yield ': keep-alive\n\n'
+            continue
+        for event in events:
+            sent += 1
+            data = job.snapshot() if event['status'] in TERMINAL else event
+            yield f"event: {event['stage']}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+            if event['status'] in TERMINAL:
+                return
+
+
+def job_queue_from_env() -> JobQueue:
+    """Crea una `JobQueue` a partir de `JOB_WORKERS`, `JOB_QUEUE_MAX` y `JOB_TTL`."""
+    return JobQueue(
+        workers=int(os.getenv('JOB_WORKERS', '2')),
+        max_pending=int(os.getenv('JOB_QUEUE_MAX', '32')),
+        ttl=float(os.getenv('JOB_TTL', '3600')),
+    )
@@ -0,0 +1,43 @@
+"""Importación diferida de dependencias pesadas o específicas de una fuente.
+
+`lazy_module('yfinance')` devuelve un proxy que importa el módulo real la
+primera vez que se accede a uno de sus atributos (`yf.Ticker`, `yf.download`).
+Así un worker que solo sirve `/api/eia_status` o uploads no paga el coste de
+importar yfinance al arrancar. El proxy es seguro entre hilos y admite
+`monkeypatch.setattr(proxy, ...)` en los tests.
+"""
+
+import importlib
+import threading
+from types import ModuleType
+
+
+class LazyModule:
+    """Proxy que carga `name` con `importlib.import_module` en el primer acceso."""
+
+    def __init__(self, name: str):
+        self.__dict__['_lazy_name'] = name
+        self.__dict__['_lazy_module'] = None
+        self.__dict__['_lazy_lock'] = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            with self.__dict__['_lazy_lock']:
+                module = self.__dict__['_lazy_module']
+                if module is None:
+                    module = importlib.import_module(self.__dict__['_lazy_name'])
+                    self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.__dict__['_lazy_module'] is not None else 'not loaded'
+        return f"<lazy module '{self.__dict__['_lazy_name']}' ({state})>"
+
+
+def lazy_module(name: str) -> LazyModule:
+    """Devuelve un `LazyModule` para `name`."""
+    return LazyModule(name)
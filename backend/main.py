@@ -10,20 +10,39 @@ Notas:
 - Para usar EIA, defina `EIA_API_KEY` en el entorno o en Codespaces secrets.
 """
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, Query, Form
+from fastapi import FastAPI, HTTPException, UploadFile, File, Query, Form, Request, Response
 from dotenv import load_dotenv
 
 # Cargar variables de entorno desde .env (conveniencia en desarrollo)
 load_dotenv()
 from fastapi.middleware.cors import CORSMiddleware
-import yfinance as yf
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Match
+from starlette.concurrency import run_in_threadpool
 import pandas as pd
-import io
+import numpy as np
 import os
 import math
-import requests
-from typing import List, Tuple, Dict
-from .data_sources import load_from_eia
+import time
+import contextvars
+import shutil
+import tempfile
+from typing import Callable, List, Tuple, Dict
+from concurrent.futures import as_completed
+from pydantic import BaseModel, Field, ValidationError
+from .lazy import lazy_module
+from .data_sources import eia_budget, eia_period, load_from_eia
+from .cache import cache_from_env
+from .store import store_from_env
+from . import downsample, engine, formats, incremental, jobs, prewarm, quotes, shared, telemetry, workers
+from .ingest import ID_COLUMNS, max_upload_bytes, read_upload
+from .memo import result_cache_from_env, series_key
+
+# yfinance y requests solo se importan al usarlos por primera vez (arranque en frío
+# más rápido para workers que solo sirven uploads o `/api/eia_status`)
+yf = lazy_module('yfinance')
+requests = lazy_module('requests')
 
 app = FastAPI(title="energia-forecast backend")
 
@@ -35,12 +54,103 @@ app.add_middleware(
 )
 
 
+def _route_path(request: Request) -> str:
+    """Plantilla de la ruta (p. ej. `/api/online`) para etiquetar métricas sin ids.
+
+    Las URLs que no corresponden a ninguna ruta comparten la etiqueta
+    `unmatched`, de modo que los clientes no pueden crear series nuevas.
+    """
+    partial = None
+    for route in app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return getattr(route, 'path', 'unmatched')
+        if match == Match.PARTIAL and partial is None:
+            partial = getattr(route, 'path', None)
+    return partial or 'unmatched'
+
+
+def _method_label(method: str | None) -> str:
+    """Etiqueta de métricas para `method`: `auto`, uno de `engine.METHODS` u `other`."""
+    if not method:
+        return 'auto'
+    method = method.lower()
+    return method if method in engine.METHODS else 'other'
+
+
+# rutas que aceptan ficheros; el límite admite un margen para las cabeceras multipart
+_UPLOAD_PATHS = ('/api/upload', '/api/jobs')
+_MULTIPART_OVERHEAD = 64 * 1024
+
+
+@app.middleware('http')
+async def _upload_size_guard(request: Request, call_next):
+    """Rechaza con 413 las subidas cuyo `Content-Length` supera `UPLOAD_MAX_BYTES`.
+
+    FastAPI lee el formulario completo antes de llamar al endpoint, así que la
+    comprobación de `read_upload` llega tarde para cuerpos enormes: aquí se
+    responde sin leer el cuerpo.
+    """
+    if request.method == 'POST' and request.url.path in _UPLOAD_PATHS:
+        try:
+            length = int(request.headers.get('content-length', ''))
+        except ValueError:
+            length = None
+        limit = max_upload_bytes()
+        if length is not None and length > limit + _MULTIPART_OVERHEAD:
+            return JSONResponse(status_code=413, content={'detail': f'File exceeds the maximum of {limit} bytes'})
+    return await call_next(request)
+
+
+@app.middleware('http')
+async def _timing_middleware(request: Request, call_next):
+    """Mide cada petición y, si se pide, añade la cabecera `Server-Timing`.
+
+    La cabecera se activa con `SERVER_TIMING=1` en el entorno o por petición
+    con la cabecera `X-Server-Timing: 1`.
+    """
+    endpoint = _route_path(request)
+    start = time.perf_counter()
+    with telemetry.request_scope(endpoint) as timings:
+        response = await call_next(request)
+        elapsed = time.perf_counter() - start
+    telemetry.REQUEST_SECONDS.observe(elapsed, endpoint=endpoint, status=response.status_code)
+    if os.getenv('SERVER_TIMING') == '1' or request.headers.get('x-server-timing') == '1':
+        timings.spans['total'] = elapsed
+        response.headers['Server-Timing'] = telemetry.server_timing(timings)
+    return response
+
+
 @app.on_event('startup')
 def _startup_checks():
     # Log whether the EIA key is present (do not log the key itself)
     key_present = bool(os.getenv('EIA_API_KEY') or os.getenv('EIA_TOKEN'))
     import logging
     logging.getLogger('uvicorn.info').info(f'EIA key present: {key_present}')
+    _start_prewarm()
+
+
+@app.on_event('shutdown')
+def _shutdown_pools():
+    if _prewarm_scheduler is not None:
+        _prewarm_scheduler.stop(timeout=1)
+    _job_queue.shutdown()
+    workers.shutdown()
+
+
+def _download_closes(symbols: List[str], period: str) -> Dict[str, quotes.Quote]:
+    """Último cierre de `symbols` con un único `yf.download` por lotes.
+
+    yfinance reparte los tickers entre `QUOTES_FETCH_THREADS` hilos (8 por defecto).
+    """
+    threads = max(1, min(len(symbols), int(os.getenv('QUOTES_FETCH_THREADS', '8'))))
+    with telemetry.span('fetch'):
+        frame = yf.download(symbols, period=period, group_by='column', auto_adjust=True,
+                            progress=False, threads=threads)
+    return quotes.last_closes(frame, symbols)
+
+
+_quotes = quotes.quote_cache_from_env(_download_closes)
 
 
 @app.get("/api/price")
@@ -52,26 +162,56 @@ def get_price(ticker: str = "AAPL", period: str = "5d"):
     - `period`: periodo aceptado por yfinance (ej. `5d`, `1y`).
 
     Respuesta JSON: `{"ticker": <TICKER>, "close": <float>}` o HTTP 404/500 en errores.
+    Comparte la caché de cotizaciones de `/api/quotes`.
     """
     try:
-        t = yf.Ticker(ticker)
-        df = t.history(period=period)
-        if df.empty:
+        telemetry.set_labels(source='yahoo')
+        sym = ticker.strip().upper()
+        quote = _quotes.get_many([sym], period)[sym]
+        if quote is None:
             raise HTTPException(status_code=404, detail="No data for ticker")
-        last_close = float(df["Close"].iloc[-1])
-        return {"ticker": ticker.upper(), "close": last_close}
+        return {"ticker": sym, "close": quote['close']}
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get('/api/quotes')
+def get_quotes(tickers: str = Query(..., min_length=1), period: str = '5d'):
+    """Último cierre de varios tickers (`tickers=CL=F,BZ=F,XOM`) en una sola descarga.
+
+    Respuesta: `{"quotes": {TICKER: {"close", "date"} | {"error": {...}}}}`.
+    Las cotizaciones se guardan `QUOTES_TTL` segundos y las peticiones
+    simultáneas con tickers en común comparten la descarga (ver `backend/quotes.py`).
+    """
+    symbols = quotes.parse_symbols(tickers)
+    if not symbols:
+        raise HTTPException(status_code=400, detail='No tickers given')
+    limit = quotes.max_symbols_from_env()
+    if len(symbols) > limit:
+        raise HTTPException(status_code=400, detail=f'At most {limit} tickers per request')
+    try:
+        telemetry.set_labels(source='yahoo')
+        found = _quotes.get_many(symbols, period)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {'quotes': {
+        sym: quote if quote is not None else {'error': {'status': 404, 'detail': 'No data for ticker'}}
+        for sym, quote in found.items()
+    }}
+
+
 def _ensure_series(df: pd.DataFrame) -> pd.Series:
     """Normaliza un `DataFrame` entrante y devuelve una `Series` indexada por fecha.
 
     El `DataFrame` debe contener una columna `date` y `price` (o `close`). Se
     convierten los tipos y se ordenan por fecha. Lanza `HTTPException(400)` si
     no hay datos válidos.
+
+    Si además trae `series_id` (o `symbol`), es un fichero de formato largo con
+    varias series: se devuelve una única `Series` con índice
+    `(series_id, date)` ordenado por serie y fecha (ver `_ensure_panel`).
     """
     # Accept 'price' or 'close' column names
     lower_cols = {c.lower(): c for c in df.columns}
@@ -83,6 +223,9 @@ def _ensure_series(df: pd.DataFrame) -> pd.Series:
         price_col = lower_cols['close']
     else:
         raise HTTPException(status_code=400, detail="File must contain 'date' and 'price' (or 'close') columns")
+    id_col = next((lower_cols[c] for c in ID_COLUMNS if c in lower_cols), None)
+    if id_col is not None:
+        return _ensure_panel(df, id_col, price_col)
 
     df['date'] = pd.to_datetime(df['date'])
     df = df.sort_values('date')
@@ -93,22 +236,68 @@ def _ensure_series(df: pd.DataFrame) -> pd.Series:
     return s
 
 
-def _split_train_test(s: pd.Series, test_size: int = 14) -> Tuple[pd.Series, pd.Series]:
-    """Divide la serie en train/test para evaluación.
+def _ensure_panel(df: pd.DataFrame, id_col: str, price_col: str) -> pd.Series:
+    """Normaliza un `DataFrame` de formato largo en una `Series` con índice `(series_id, date)`.
+
+    Los identificadores se manejan como códigos de un `Categorical` y el orden
+    (serie, fecha) sale de un único `np.lexsort`, así que no se crea ningún
+    objeto Python por fila ni un `DataFrame` por serie.
+    """
+    ids = df[id_col]
+    cat = ids.array if isinstance(ids.dtype, pd.CategoricalDtype) else pd.Categorical(ids)
+    if not isinstance(cat.categories.dtype, pd.StringDtype) and cat.categories.dtype != object:
+        cat = cat.rename_categories(cat.categories.astype(str))
+    dates = pd.DatetimeIndex(pd.to_datetime(df['date']))
+    codes = cat.codes
+    values = df[price_col].to_numpy(dtype=np.float64)
+    keep = (codes >= 0) & ~np.isnan(values) & ~dates.isna()
+    codes, dates, values = codes[keep], dates[keep], values[keep]
+    if not len(values):
+        raise HTTPException(status_code=400, detail="No valid price data found")
+    order = np.lexsort((dates.asi8, codes))
+    codes, dates, values = codes[order], dates[order], values[order]
+    index = pd.MultiIndex.from_arrays([pd.Categorical.from_codes(codes, cat.categories), dates],
+                                      names=['series_id', 'date'])
+    return pd.Series(values, index=index)
+
+
+def _panel_groups(s: pd.Series) -> Tuple[pd.Index, np.ndarray]:
+    """Identificadores y límites `[b[i], b[i+1])` de cada serie de un panel de `_ensure_panel`."""
+    codes = s.index.codes[0]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    return s.index.levels[0][codes[starts]], np.append(starts, len(codes))
+
+
+def _is_panel(s: pd.Series) -> bool:
+    return isinstance(s.index, pd.MultiIndex)
+
+
+def _evaluate_panel(s: pd.Series, **params) -> Dict[str, Dict]:
+    """Evalúa cada serie del panel en el pool de procesos; un resultado (o error) por `series_id`."""
+    ids, bounds = _panel_groups(s)
+    return workers.evaluate_panel(list(ids), bounds, s.index.get_level_values('date'),
+                                  s.to_numpy(dtype=np.float64), **params)
+
+
+def _holdout_size(n: int, test_size: int = 14) -> int:
+    """Tamaño del bloque de test para una serie de `n` puntos.
 
     Usa `test_size` pero ajusta para que el tamaño mínimo sea razonable. Lanza
     `HTTPException(400)` si no hay suficientes puntos.
     """
-    if len(s) < 8:
+    if n < 8:
         raise HTTPException(status_code=400, detail="Not enough data points; need at least 8")
-    test_size = min(test_size, max(1, len(s) // 4))
+    return min(test_size, max(1, n // 4))
+
+
+def _split_train_test(s: pd.Series, test_size: int = 14) -> Tuple[pd.Series, pd.Series]:
+    """Divide la serie en train/test para evaluación (ver `_holdout_size`)."""
+    test_size = _holdout_size(len(s), test_size)
     train = s.iloc[:-test_size]
     test = s.iloc[-test_size:]
     return train, test
 
 
-import numpy as np
-
 def _mape(y_true: pd.Series, y_pred: pd.Series) -> float:
     y_true_v = np.asarray(y_true)
     y_pred_v = np.asarray(y_pred)
@@ -155,75 +344,241 @@ def _forecast_ewm(train: pd.Series, horizon: int, alpha: float = 0.2) -> pd.Seri
     return pd.Series([val] * horizon)
 
 
-def evaluate_methods(s: pd.Series, horizon: int = 7, method: str | None = None) -> Dict:
-    """Evaluate available forecasting methods and optionally force a specific method.
-
-    If `method` is provided and valid, evaluate only that method and return its metrics and forecast.
-    Otherwise select the best by MAPE (fallback RMSE) among implemented methods.
-    """
+def evaluate_methods(s: pd.Series, horizon: int = 7, method: str | None = None,
+                     backtest: str | None = None, folds: int = 5,
+                     window: int = engine.DEFAULT_WINDOW, alpha: float = engine.DEFAULT_ALPHA,
+                     tune: bool = False, layout: str = 'records') -> Dict:
     """Evalúa métodos disponibles y retorna métricas y pronóstico futuro.
 
-    Si `method` es especificado, se evalúa solo ese método (y se devuelve su
-    pronóstico). Si no, se selecciona el mejor por MAPE (con RMSE como tie-breaker).
+    Si `method` es especificado, se devuelve su pronóstico y sus métricas. Si
+    no, se selecciona el mejor por MAPE (con RMSE como tie-breaker).
+
+    Todos los métodos se puntúan en una sola pasada vectorizada sobre un array
+    float64 (ver `backend/engine.py`); los resultados coinciden con aplicar
+    `_forecast_naive`, `_forecast_ma` y `_forecast_ewm` sobre el split de
+    `_split_train_test`.
+
+    Con `backtest='rolling'` los métodos se evalúan sobre `folds` orígenes con
+    ventana expansiva (el último es el holdout simple) y la selección usa la
+    MAPE media de todos los folds. La respuesta incluye entonces `backtest` con
+    las métricas por fold y agregadas.
+
+    `window` y `alpha` fijan los parámetros de `moving_average` y `ewm`. Con
+    `tune=True` se buscan en `engine.WINDOW_GRID` x `engine.ALPHA_GRID` (cada
+    rejilla como una única matriz parámetros x orígenes) y la respuesta incluye
+    `tuning` con la mejor pareja.
 
     Retorna diccionario con `best_method`, `mape`, `rmse` y `series` (lista de
-    objetos `{date, forecast}`).
+    objetos `{date, forecast}`). Con `layout='columnar'`, `series` es
+    `{start, freq, forecast}` con los valores en un array float64 (ver
+    `backend/formats.py`).
     """
-    train, test = _split_train_test(s, test_size=min(14, len(s) // 4))
-    methods = {
-        'naive': _forecast_naive,
-        'moving_average': _forecast_ma,
-        'ewm': _forecast_ewm,
-    }
+    y = engine.as_array(s.to_numpy(dtype=np.float64))
+    n = len(y)
+    test_size = _holdout_size(n, min(14, n // 4))
 
-    results = {}
-    for name, fn in methods.items():
-        pred_test = fn(train, len(test))
-        mape = _mape(test, pred_test)
-        rmse = _rmse(test, pred_test)
-        results[name] = {'mape': mape, 'rmse': rmse, 'pred_test': pred_test}
+    if backtest is None:
+        origins = np.array([n - test_size])
+    elif backtest.lower() == 'rolling':
+        try:
+            origins = engine.rolling_origins(n, test_size, folds, min_train=min(n - test_size, max(test_size, 2)))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        raise HTTPException(status_code=400, detail=f'Unknown backtest mode {backtest}')
+
+    # levels at every origin plus the end of the full series; one row per parameter
+    ends = np.append(origins, n)
+    actual = engine.holdout_windows(y, origins, test_size)
+    windows = engine.WINDOW_GRID if tune else [window]
+    alphas = engine.ALPHA_GRID if tune else [alpha]
+    grids = {
+        'naive': engine.naive_levels(y, ends)[None, :],
+        'moving_average': engine.ma_levels(y, ends, windows),
+        'ewm': engine.ewm_levels(y, ends, alphas),
+    }
+    rows, mape, rmse, results = [], [], [], {}
+    for name in engine.METHODS:
+        fold_mape, fold_rmse, agg_m, agg_r = engine.score_levels(actual, grids[name][:, :-1])
+        i = engine.best_index(agg_m, agg_r)
+        rows.append(grids[name][i])
+        mape.append(fold_mape[i])
+        rmse.append(fold_rmse[i])
+        results[name] = (float(agg_m[i]), float(agg_r[i]))
+        if name == 'moving_average':
+            window = int(windows[i])
+        elif name == 'ewm':
+            alpha = float(alphas[i])
+    levels, mape, rmse = np.vstack(rows), np.vstack(mape), np.vstack(rmse)
 
-    chosen_name = None
     if method:
         method = method.lower()
-        if method not in methods:
+        if method not in results:
             raise HTTPException(status_code=400, detail=f'Unknown method {method}')
         chosen_name = method
-        chosen_metrics = results[method]
     else:
         # choose best by mape, fallback to rmse
-        best = min(results.items(), key=lambda kv: (kv[1]['mape'], kv[1]['rmse']))
-        chosen_name = best[0]
-        chosen_metrics = best[1]
+        chosen_name = min(results, key=lambda name: results[name])
+    chosen_mape, chosen_rmse = results[chosen_name]
 
-    # forecast future using chosen method applied to full series (train+test)
-    future = methods[chosen_name](pd.concat([train, test]), horizon)
+    # forecast future using chosen method applied to the full series
+    level = float(levels[engine.METHODS.index(chosen_name), -1])
 
-    last_date = s.index[-1]
-    dates = pd.date_range(last_date + pd.Timedelta(days=1), periods=horizon, freq='D')
+    start = s.index[-1] + pd.Timedelta(days=1)
 
-    series = [{'date': d.strftime('%Y-%m-%d'), 'forecast': float(v)} for d, v in zip(dates, future)]
+    with telemetry.span('build_series'):
+        if layout == 'columnar':
+            series = {'start': start.strftime('%Y-%m-%d'), 'freq': 'D', 'forecast': np.full(horizon, level)}
+        else:
+            dates = pd.date_range(start, periods=horizon, freq='D')
+            series = [{'date': d, 'forecast': level} for d in dates.strftime('%Y-%m-%d')]
 
-    return {
+    out = {
         'best_method': chosen_name,
-        'mape': round(float(chosen_metrics['mape']), 4),
-        'rmse': round(float(chosen_metrics['rmse']), 4),
+        'mape': round(chosen_mape, 4),
+        'rmse': round(chosen_rmse, 4),
         'series': series,
     }
+    if tune:
+        out['tuning'] = {
+            'window': window,
+            'alpha': alpha,
+            'windows_searched': len(windows),
+            'alphas_searched': len(alphas),
+        }
+    if backtest is not None:
+        fold_dates = s.index[origins - 1].strftime('%Y-%m-%d')
+        out['backtest'] = {
+            'mode': 'rolling',
+            'horizon': int(test_size),
+            'folds': [
+                {
+                    'origin': fold_dates[j],
+                    'mape': {name: round(float(mape[i, j]), 4) for i, name in enumerate(engine.METHODS)},
+                    'rmse': {name: round(float(rmse[i, j]), 4) for i, name in enumerate(engine.METHODS)},
+                }
+                for j in range(len(origins))
+            ],
+            'aggregate': {
+                name: {'mape': round(results[name][0], 4), 'rmse': round(results[name][1], 4)}
+                for name in engine.METHODS
+            },
+        }
+    return out
+
+
+_result_cache = result_cache_from_env()
+
+FORMAT_PATTERN = '^(' + '|'.join(formats.FORMATS) + ')$'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    return etag in [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+
+
+def _history_view(resample: str | None, agg: str, max_points: int | None) -> Dict | None:
+    """Parámetros de `downsample.history`, o `None` si no se pidió la historia."""
+    if resample is None and max_points is None:
+        return None
+    return {'resample': resample, 'agg': agg, 'max_points': max_points}
+
+
+def _forecast_response(request: Request, s: pd.Series, fmt: str | None = None, view: Dict | None = None,
+                       **params) -> Response:
+    """Evalúa `s` con memoización por contenido y soporte de `ETag`/`If-None-Match`.
+
+    La clave (hash de la serie, de `params` y del formato) se usa como `ETag`:
+    si el cliente ya la tiene se responde 304 sin evaluar ni serializar; si el
+    cuerpo está en `_result_cache` se devuelve tal cual. El formato sale de
+    `fmt` (parámetro `format`) o de la cabecera `Accept` (ver `backend/formats.py`).
+
+    Con `view` (ver `_history_view`) la respuesta incluye además `history`, la
+    serie observada agregada/reducida en el servidor.
+    """
+    fmt = formats.negotiate(fmt, request.headers.get('accept'))
+    if _is_panel(s) and fmt not in ('json', 'columnar'):
+        raise HTTPException(status_code=406, detail=f"Format '{fmt}' is not available for multi-series uploads")
+    if _is_panel(s) and view is not None:
+        raise HTTPException(status_code=400, detail='resample/max_points are not available for multi-series uploads')
+    if view is not None:
+        params['history'] = view
+    key = series_key(s, format=fmt, **params)
+    etag = f'"{key}"'
+    headers = {'ETag': etag, 'Vary': 'Accept'}
+    if _etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=304, headers=headers)
+    body = _forecast_body(key, s, fmt, **params)
+    return Response(content=body, media_type=formats.MEDIA_TYPES[fmt], headers=headers)
+
+
+def _forecast_body(key: str, s: pd.Series, fmt: str, **params) -> bytes:
+    """Cuerpo serializado de `evaluate_methods(s, **params)` en `fmt`, pasando por `_result_cache`.
+
+    Para un panel multi-serie el cuerpo es `{'results': {series_id: resultado}}`.
+    """
+    with telemetry.span('cache_lookup'):
+        body = _result_cache.get(key)
+    if body is None:
+        with telemetry.span('evaluate'):
+            if _is_panel(s):
+                res = {'results': _evaluate_panel(s, layout=formats.layout(fmt), **params)}
+            else:
+                view = params.pop('history', None)
+                res = evaluate_methods(s, layout=formats.layout(fmt), **params)
+                if view is not None:
+                    with telemetry.span('downsample'):
+                        res['history'] = downsample.history(s, layout=formats.layout(fmt), **view)
+        with telemetry.span('serialize'):
+            body = formats.encode(res, fmt)
+        _result_cache.put(key, body)
+    return body
 
 
 @app.post('/api/upload')
-async def upload_file(file: UploadFile = File(...), horizon: int = Query(7, ge=1, le=365), method: str | None = Form(None)):
-    """Upload CSV or XLSX file containing `date` and `price` columns."""
+async def upload_file(request: Request, file: UploadFile = File(...), horizon: int = Query(7, ge=1, le=365), method: str | None = Form(None),
+                      backtest: str | None = Query(None, pattern='^rolling$'), folds: int = Query(5, ge=1, le=1000),
+                      window: int = Query(engine.DEFAULT_WINDOW, ge=1, le=365), alpha: float = Query(engine.DEFAULT_ALPHA, gt=0, le=1),
+                      tune: bool = Query(False), format: str | None = Query(None, pattern=FORMAT_PATTERN),
+                      resample: str | None = Query(None, pattern='^(W|M)$'), agg: str = Query('mean', pattern='^(mean|last|ohlc)$'),
+                      max_points: int | None = Query(None, ge=3, le=100_000)):
+    """Upload CSV or XLSX file containing `date` and `price` columns.
+
+    El fichero se parsea por bloques fuera del event loop y con límites de
+    tamaño y filas (ver `backend/ingest.py`).
+
+    Con `backtest=rolling&folds=N` los métodos se evalúan sobre N orígenes;
+    `window`/`alpha` fijan los parámetros de moving_average/ewm y `tune=true`
+    los busca automáticamente (ver `evaluate_methods`).
+
+    Un fichero de formato largo con columna `series_id` (o `symbol`) evalúa
+    todas sus series en paralelo y responde `{'results': {series_id: resultado}}`
+    con la forma habitual por serie (solo `json` o `columnar`).
+
+    Los resultados se memorizan por contenido y llevan `ETag`; con
+    `If-None-Match` se responde 304 (ver `_forecast_response`). `format`
+    (json|columnar|msgpack|arrow) o `Accept` eligen la codificación.
+
+    `resample=W|M` (con `agg=mean|last|ohlc`) y/o `max_points=N` (LTTB) añaden
+    `history`, la serie observada agregada y reducida para el gráfico (ver
+    `backend/downsample.py`).
+    """
+    telemetry.set_labels(source='upload', method=_method_label(method))
+
+    def process() -> Response:
+        with telemetry.span('parse'):
+            df = read_upload(file.file, file.filename, file.content_type)
+        with telemetry.span('normalize'):
+            s = _ensure_series(df)
+        return _forecast_response(request, s, format, _history_view(resample, agg, max_points), horizon=horizon,
+                                  method=method, backtest=backtest, folds=folds, window=window, alpha=alpha, tune=tune)
+
     try:
-        contents = await file.read()
-        if file.filename.lower().endswith('.csv') or file.content_type == 'text/csv':
-            df = pd.read_csv(io.BytesIO(contents))
-        else:
-            # try excel
-            df = pd.read_excel(io.BytesIO(contents))
-        s = _ensure_series(df)
-        res = evaluate_methods(s, horizon=horizon, method=method)
+        # parsing and evaluation are CPU-bound: keep them off the event loop
+        res = await run_in_threadpool(process)
         return res
     except HTTPException:
         raise
@@ -231,67 +586,525 @@ async def upload_file(file: UploadFile = File(...), horizon: int = Query(7, ge=1
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _resolve_symbol(src: str, symbol: str | None) -> str:
+    """Traduce `symbol` (o su valor por defecto) al identificador real de la fuente."""
+    if src == 'yahoo':
+        # support friendly symbol names
+        if symbol and symbol.lower() == 'brent':
+            return 'BZ=F'
+        if symbol and symbol.lower() == 'henry':
+            return 'NG=F'
+        return symbol or 'CL=F'
+    if src == 'eia':
+        return symbol or 'PET.RWTC.D'
+    if src == 'xm':
+        # xm maps to Exxon Mobil ticker XOM by default
+        return symbol or 'XOM'
+    raise HTTPException(status_code=400, detail='Unknown source')
+
+
+def _yahoo_frame(sym: str, **history_kwargs) -> pd.DataFrame:
+    """Descarga `sym` con `yf.Ticker(...).history(**history_kwargs)` como `DataFrame(date, price)`."""
+    df = yf.Ticker(sym).history(**history_kwargs)
+    if df.empty:
+        return pd.DataFrame(columns=['date', 'price'])
+    return df.reset_index()[['Date', 'Close']].rename(columns={'Date': 'date', 'Close': 'price'})
+
+
+def _eia_frame(series_id: str, start: str | None = None) -> pd.DataFrame:
+    """Descarga una serie EIA traduciendo los errores del cargador a `HTTPException`."""
+    # Quick validation: frequently users pass tickers like 'CL=F' by mistake.
+    if series_id and '=' in series_id:
+        raise HTTPException(status_code=400, detail=(
+            "Invalid series id for EIA: it looks like a Yahoo ticker (e.g. 'CL=F'). "
+            "EIA expects series ids like 'PET.RWTC.D'. Use source=yahoo for tickers or provide a valid EIA series id."))
+    api_key = os.getenv('EIA_API_KEY') or os.getenv('EIA_TOKEN')
+    try:
+        return load_from_eia(series_id, token=api_key, start=start)
+    except ValueError as e:
+        # Distinguish between invalid input and missing data
+        msg = str(e)
+        if msg.lower().startswith('invalid series_id'):
+            raise HTTPException(status_code=400, detail=msg)
+        raise HTTPException(status_code=404, detail=msg)
+    except requests.HTTPError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    except shared.BudgetExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={'Retry-After': str(math.ceil(e.retry_after))})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Ventana que cubre cada `period` de yfinance; se usa para recortar la serie
+# cacheada tras anexar filas nuevas.
+_YAHOO_PERIOD_OFFSETS = {
+    '1d': pd.DateOffset(days=1),
+    '5d': pd.DateOffset(days=5),
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10),
+}
+
+
+def _period_trim(period: str):
+    """Devuelve una función que recorta una serie a la ventana de `period` (o `None`)."""
+    offset = _YAHOO_PERIOD_OFFSETS.get(period)
+    if offset is None:
+        return None
+    return lambda s: s[s.index > s.index[-1] - offset]
+
+
+def _delta_series(df: pd.DataFrame) -> pd.Series:
+    """Como `_ensure_series` pero admite un resultado vacío (sin filas nuevas)."""
+    if df.empty:
+        return pd.Series(dtype=float)
+    return _ensure_series(df)
+
+
+_series_cache = cache_from_env()
+_series_store = store_from_env()
+
+
+def _get_online_series(src: str, symbol: str | None, period: str, refresh: bool = False) -> pd.Series:
+    """Obtiene la serie normalizada de `src` pasando por la caché TTL/LRU.
+
+    En un fallo de caché se descarga la historia completa (o se lee del almacén
+    en disco si está activo); cuando la entrada expira (o con `refresh=True`)
+    solo se piden las filas desde la última fecha cacheada (incluida).
+    """
+    sym = _resolve_symbol(src, symbol)
+
+    if src == 'eia':
+        def fetch_full():
+            df = _eia_frame(sym)
+            with telemetry.span('normalize'):
+                return _ensure_series(df)
+
+        def fetch_since(last):
+            # ask again for the last cached period too: EIA may revise it
+            return _delta_series(_eia_frame(sym, start=eia_period(last, sym)))
+
+        trim = None
+    else:
+        label = ' (xm)' if src == 'xm' else ''
+
+        def fetch_full():
+            df = _yahoo_frame(sym, period=period)
+            if df.empty:
+                raise HTTPException(status_code=404, detail=f'No data for {sym} on Yahoo{label}')
+            with telemetry.span('normalize'):
+                return _ensure_series(df)
+
+        def fetch_since(last):
+            # inclusive: the last cached bar may be a partial intraday close
+            return _delta_series(_yahoo_frame(sym, start=last.strftime('%Y-%m-%d')))
+
+        trim = _period_trim(period)
+
+    key = (src, sym, period)
+    if _series_store is not None:
+        fetch_full, fetch_since = _series_store.stored_fetchers(key, fetch_full, fetch_since, trim=trim)
+    with telemetry.span('fetch', source=src):
+        return _series_cache.get_or_fetch(key, fetch_full, fetch_since, trim=trim, refresh=refresh)
+
+
+def _default_params(horizon: int) -> Dict:
+    """Parámetros de evaluación de `/api/online` cuando solo se indica `horizon`."""
+    return {'horizon': horizon, 'method': None, 'backtest': None, 'folds': 5,
+            'window': engine.DEFAULT_WINDOW, 'alpha': engine.DEFAULT_ALPHA, 'tune': False}
+
+
+_PREWARM_FORMATS = ('json', 'columnar')
+_prewarm_horizons = prewarm.horizons_from_env()
+_prewarm_scheduler: prewarm.PrewarmScheduler | None = None
+
+
+def _prewarm(target: prewarm.Target) -> None:
+    """Refresca `target` en la caché de series y memoriza sus resultados por defecto."""
+    with telemetry.request_scope('prewarm'):
+        telemetry.set_labels(source=target.source, method='auto')
+        s = _get_online_series(target.source, target.symbol, target.period, refresh=True)
+        for horizon in _prewarm_horizons:
+            params = _default_params(horizon)
+            for fmt in _PREWARM_FORMATS:
+                _forecast_body(series_key(s, format=fmt, **params), s, fmt, **params)
+
+
+def _start_prewarm() -> None:
+    global _prewarm_scheduler
+    if _prewarm_scheduler is None:
+        _prewarm_scheduler = prewarm.scheduler_from_env(_prewarm)
+    if _prewarm_scheduler is not None:
+        _prewarm_scheduler.start()
+
+
 @app.get('/api/online')
-def online(source: str = Query('yahoo', pattern='^(yahoo|eia|xm)$'), symbol: str | None = None, period: str = '1y', horizon: int = Query(7, ge=1, le=365), method: str | None = Query(None)):
+def online(request: Request, source: str = Query('yahoo', pattern='^(yahoo|eia|xm)$'), symbol: str | None = None, period: str = '1y', horizon: int = Query(7, ge=1, le=365), method: str | None = Query(None),
+           backtest: str | None = Query(None, pattern='^rolling$'), folds: int = Query(5, ge=1, le=1000),
+           window: int = Query(engine.DEFAULT_WINDOW, ge=1, le=365), alpha: float = Query(engine.DEFAULT_ALPHA, gt=0, le=1),
+           tune: bool = Query(False), format: str | None = Query(None, pattern=FORMAT_PATTERN),
+           use_incremental: bool = Query(False, alias='incremental'),
+           resample: str | None = Query(None, pattern='^(W|M)$'), agg: str = Query('mean', pattern='^(mean|last|ohlc)$'),
+           max_points: int | None = Query(None, ge=3, le=100_000)):
     """Fetch series online from `source` (yahoo|eia|xm) and run forecasting evaluation.
 
     - yahoo: uses yfinance, default symbol `CL=F` (crude oil futures)
     - eia: uses series id `PET.RWTC.D` by default; requires `EIA_API_KEY` env var
-    - xm: alias to yfinance with default symbol `XM` (pass `symbol` to override)
+    - xm: alias to yfinance with default symbol `XOM` (pass `symbol` to override)
+
+    `backtest=rolling&folds=N` activa la validación rolling-origin con N folds;
+    `window`/`alpha` fijan los parámetros de moving_average/ewm y `tune=true`
+    los busca automáticamente.
+
+    Los resultados se memorizan por contenido y llevan `ETag`; con
+    `If-None-Match` se responde 304 (ver `_forecast_response`). `format`
+    (json|columnar|msgpack|arrow) o `Accept` eligen la codificación.
+
+    `resample=W|M` (con `agg=mean|last|ohlc`) y/o `max_points=N` (LTTB) añaden
+    `history`, la serie observada agregada y reducida para el gráfico (ver
+    `backend/downsample.py`).
+
+    Las series descargadas se guardan en una caché TTL/LRU (ver `backend/cache.py`)
+    y, si `SERIES_STORE_DIR` está definido, también en disco (`backend/store.py`).
+
+    Con `incremental=true` el pronóstico sale del estado de modelo de la serie
+    (`backend/incremental.py`): solo se procesan las observaciones nuevas desde
+    la petición anterior y las métricas son errores a un paso acumulados.
     """
     try:
-        src = source.lower()
-        if src == 'yahoo':
-            # support friendly symbol names
-            if symbol and symbol.lower() == 'brent':
-                sym = 'BZ=F'
-            elif symbol and symbol.lower() == 'henry':
-                sym = 'NG=F'
-            else:
-                sym = symbol or 'CL=F'
-            t = yf.Ticker(sym)
-            df = t.history(period=period)
-            if df.empty:
-                raise HTTPException(status_code=404, detail=f'No data for {sym} on Yahoo')
-            df = df.reset_index()[['Date', 'Close']].rename(columns={'Date': 'date', 'Close': 'price'})
-        elif src == 'eia':
-            series_id = symbol or 'PET.RWTC.D'
-            # Quick validation: frequently users pass tickers like 'CL=F' by mistake.
-            if series_id and '=' in series_id:
-                raise HTTPException(status_code=400, detail=(
-                    "Invalid series id for EIA: it looks like a Yahoo ticker (e.g. 'CL=F'). "
-                    "EIA expects series ids like 'PET.RWTC.D'. Use source=yahoo for tickers or provide a valid EIA series id."))
-            api_key = os.getenv('EIA_API_KEY') or os.getenv('EIA_TOKEN')
-            try:
-                df = load_from_eia(series_id, token=api_key)
-            except ValueError as e:
-                # Distinguish between invalid input and missing data
-                msg = str(e)
-                if msg.lower().startswith('invalid series_id'):
-                    raise HTTPException(status_code=400, detail=msg)
-                raise HTTPException(status_code=404, detail=msg)
-            except requests.HTTPError as e:
-                raise HTTPException(status_code=502, detail=str(e))
-            except Exception as e:
-                raise HTTPException(status_code=500, detail=str(e))
-        elif src == 'xm':
-            # xm maps to Exxon Mobil ticker XOM by default
-            sym = symbol or 'XOM'
-            t = yf.Ticker(sym)
-            df = t.history(period=period)
-            if df.empty:
-                raise HTTPException(status_code=404, detail=f'No data for {sym} on Yahoo (xm)')
-            df = df.reset_index()[['Date', 'Close']].rename(columns={'Date': 'date', 'Close': 'price'})
-        else:
-            raise HTTPException(status_code=400, detail='Unknown source')
+        telemetry.set_labels(source=source.lower(), method=_method_label(method))
+        s = _get_online_series(source.lower(), symbol, period)
+        if use_incremental:
+            if backtest is not None or tune:
+                raise HTTPException(status_code=400, detail='incremental=true cannot be combined with backtest or tune')
+            fmt = formats.negotiate(format, request.headers.get('accept'))
+            series_id = f'{source.lower()}:{_resolve_symbol(source.lower(), symbol)}:{period}'
+            with telemetry.span('evaluate'):
+                state = _models.get_or_fit((series_id, window, alpha), lambda: s, window, alpha)
+                state.update(s)
+                res = _model_forecast(state, horizon, method, layout=formats.layout(fmt))
+            view = _history_view(resample, agg, max_points)
+            if view is not None:
+                with telemetry.span('downsample'):
+                    res['history'] = downsample.history(s, layout=formats.layout(fmt), **view)
+            with telemetry.span('serialize'):
+                body = formats.encode(res, fmt)
+            return Response(content=body, media_type=formats.MEDIA_TYPES[fmt], headers={'Vary': 'Accept'})
+        return _forecast_response(request, s, format, _history_view(resample, agg, max_points), horizon=horizon,
+                                  method=method, backtest=backtest, folds=folds, window=window, alpha=alpha, tune=tune)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+_models = incremental.registry_from_env()
+
+
+def _model_forecast(state: incremental.ModelState, horizon: int, method: str | None, layout: str = 'records') -> Dict:
+    try:
+        return state.forecast(horizon, method, layout=layout)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _model_history(series_id: str) -> pd.Series | None:
+    """Historia guardada de un modelo (si `SERIES_STORE_DIR` está activo)."""
+    if _series_store is None:
+        return None
+    return _series_store.read(('model', series_id))
+
+
+class Observation(BaseModel):
+    date: str
+    price: float
+
+
+class ObservationBatch(BaseModel):
+    observations: List[Observation] = Field(..., min_length=1, max_length=100_000)
+
 
+@app.post('/api/models/{series_id}/observations')
+def push_observations(series_id: str, batch: ObservationBatch, horizon: int = Query(7, ge=1, le=365),
+                      method: str | None = Query(None), window: int = Query(engine.DEFAULT_WINDOW, ge=1, le=365),
+                      alpha: float = Query(engine.DEFAULT_ALPHA, gt=0, le=1)):
+    """Añade observaciones a una serie seguida y devuelve el pronóstico actualizado.
+
+    La primera vez el modelo se ajusta con la historia guardada (si hay almacén
+    en disco) o con las propias observaciones. Después solo se procesan las
+    fechas posteriores a la última conocida, en todos los estados de la serie
+    (uno por `window`/`alpha`). Con `SERIES_STORE_DIR` las observaciones se
+    anexan también al almacén, para reconstruir el estado tras un reinicio.
+    """
+    df = pd.DataFrame({'date': [o.date for o in batch.observations], 'price': [o.price for o in batch.observations]})
+    try:
         s = _ensure_series(df)
-        res = evaluate_methods(s, horizon=horizon, method=method)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if _is_panel(s):
+        raise HTTPException(status_code=400, detail='Observations must not carry a series_id column')
+
+    fitted_from_batch = []
+
+    def history():
+        stored = _model_history(series_id)
+        if stored is not None and not stored.empty:
+            return stored
+        fitted_from_batch.append(True)
+        return s
+
+    state = _models.get_or_fit((series_id, window, alpha), history, window, alpha)
+    appended = {id(st): st.update(s) for st in _models.for_series(series_id)}
+    if _series_store is not None:
+        _series_store.append(('model', series_id), s)
+    # a state fitted on this very batch has ingested all of it (update() then finds nothing new)
+    count = len(s) if fitted_from_batch else appended.get(id(state), 0)
+    return {'series_id': series_id, 'appended': count, **_model_forecast(state, horizon, method)}
+
+
+@app.get('/api/models/{series_id}')
+def get_model(series_id: str, horizon: int = Query(7, ge=1, le=365), method: str | None = Query(None),
+              window: int = Query(engine.DEFAULT_WINDOW, ge=1, le=365),
+              alpha: float = Query(engine.DEFAULT_ALPHA, gt=0, le=1)):
+    """Pronóstico actual de una serie seguida (404 si no hay estado ni historia guardada)."""
+    state = _models.get_or_fit((series_id, window, alpha), lambda: _model_history(series_id), window, alpha)
+    if state is None:
+        raise HTTPException(status_code=404, detail=f'Unknown model {series_id}')
+    return {'series_id': series_id, **_model_forecast(state, horizon, method)}
+
+
+@app.delete('/api/models/{series_id}')
+def delete_model(series_id: str):
+    """Olvida los estados en memoria de la serie (la historia guardada en disco se conserva)."""
+    return {'series_id': series_id, 'discarded': _models.discard(series_id)}
+
+
+class ForecastSpec(BaseModel):
+    """Especificación de un elemento de `/api/forecast/batch` (mismos parámetros que `/api/online`)."""
+    source: str = Field('yahoo', pattern='^(yahoo|eia|xm)$')
+    symbol: str | None = None
+    period: str = '1y'
+    horizon: int = Field(7, ge=1, le=365)
+    method: str | None = None
+
+
+class BatchRequest(BaseModel):
+    items: List[ForecastSpec] = Field(..., min_length=1, max_length=200)
+
+
+def _spec_key(spec: ForecastSpec) -> str:
+    """Clave estable `source:symbol:period:method:horizon` de un elemento del lote."""
+    try:
+        sym = _resolve_symbol(spec.source.lower(), spec.symbol)
+    except HTTPException:
+        sym = spec.symbol or ''
+    return f"{spec.source.lower()}:{sym}:{spec.period}:{(spec.method or 'auto').lower()}:{spec.horizon}"
+
+
+@app.post('/api/forecast/batch')
+def forecast_batch(req: BatchRequest):
+    """Evalúa varias series en paralelo.
+
+    Las descargas se lanzan a la vez en un pool de hilos acotado y cada serie
+    se evalúa en un pool de procesos en cuanto llega, así que la latencia total
+    se aproxima a la de la descarga más lenta. El resultado es
+    `{'results': {<clave>: <resultado o {'error': {...}}>}}`; un elemento que
+    falla no invalida el resto del lote.
+    """
+    specs = {}
+    for spec in req.items:
+        specs.setdefault(_spec_key(spec), spec)
+
+    # each fetch runs in its own copy of the request context so its spans are attributed here
+    fetches = {
+        workers.fetch_pool().submit(contextvars.copy_context().run, _get_online_series,
+                                    spec.source.lower(), spec.symbol, spec.period): key
+        for key, spec in specs.items()
+    }
+    results: Dict[str, Dict] = {}
+    evaluations = {}
+    for fut in as_completed(fetches):
+        key = fetches[fut]
+        spec = specs[key]
+        try:
+            s = fut.result()
+        except Exception as e:
+            results[key] = workers.error_payload(e)
+            continue
+        evaluations[workers.submit_evaluation(s, horizon=spec.horizon, method=spec.method)] = key
+
+    for fut in as_completed(evaluations):
+        try:
+            results[evaluations[fut]] = fut.result()
+        except Exception as e:
+            results[evaluations[fut]] = workers.error_payload(e)
+
+    return {'results': {key: results[key] for key in specs}}
+
+
+_job_queue = jobs.job_queue_from_env()
+
+
+class JobSpec(BaseModel):
+    """Parámetros de `POST /api/jobs`: los de `/api/online`, o los de `/api/upload` con `source='upload'`."""
+    source: str = Field('yahoo', pattern='^(yahoo|eia|xm|upload)$')
+    symbol: str | None = None
+    period: str = '1y'
+    horizon: int = Field(7, ge=1, le=365)
+    method: str | None = None
+    backtest: str | None = Field(None, pattern='^rolling$')
+    folds: int = Field(5, ge=1, le=1000)
+    window: int = Field(engine.DEFAULT_WINDOW, ge=1, le=365)
+    alpha: float = Field(engine.DEFAULT_ALPHA, gt=0, le=1)
+    tune: bool = False
+
+
+def _forecast_job(spec: JobSpec, upload: Tuple[str, str | None, str | None] | None = None) -> Callable[[jobs.Job], Dict]:
+    """Trabajo que obtiene la serie (descarga o fichero subido) y la evalúa en el pool de procesos."""
+    params = spec.model_dump(include={'horizon', 'method', 'backtest', 'folds', 'window', 'alpha', 'tune'})
+    source = spec.source.lower()
+
+    def run(job: jobs.Job) -> Dict:
+        telemetry.set_labels(source=source, method=_method_label(spec.method))
+        if upload is not None:
+            path, filename, content_type = upload
+            job.emit('parse', 0.1)
+            with telemetry.span('parse'), open(path, 'rb') as fh:
+                df = read_upload(fh, filename, content_type)
+            job.check()
+            job.emit('normalize', 0.3)
+            with telemetry.span('normalize'):
+                s = _ensure_series(df)
+        else:
+            job.emit('fetch', 0.1)
+            s = _get_online_series(source, spec.symbol, spec.period)
+        job.check()
+        job.emit('evaluate', 0.5)
+        if _is_panel(s):
+            with telemetry.span('evaluate'):
+                return {'results': _evaluate_panel(s, **params)}
+        with telemetry.span('evaluate'):
+            res = job.wait(workers.submit_evaluation(s, **params))
+        if 'error' in res:
+            raise HTTPException(status_code=res['error']['status'], detail=res['error']['detail'])
         return res
+
+    return run
+
+
+def _spool_upload(file) -> str:
+    """Copia el fichero subido a un temporal que sobrevive a la petición; devuelve su ruta."""
+    suffix = os.path.splitext(file.filename or '')[1]
+    with tempfile.NamedTemporaryFile(prefix='forecast-job-', suffix=suffix, delete=False) as tmp:
+        shutil.copyfileobj(file.file, tmp, 1024 * 1024)
+    return tmp.name
+
+
+def _job_or_404(job_id: str) -> jobs.Job:
+    job = _job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f'Unknown job {job_id}')
+    return job
+
+
+@app.post('/api/jobs', status_code=202)
+async def create_job(request: Request):
+    """Encola un forecast y devuelve `202` con el estado inicial y su `id`.
+
+    - Cuerpo JSON con los parámetros de `/api/online` (`source`, `symbol`,
+      `period`, `horizon`, `method`, `backtest`, `folds`, `window`, `alpha`, `tune`).
+    - Multipart con `file` (como `/api/upload`); los parámetros van como campos
+      del formulario o en la query.
+
+    Si la cola está llena responde 429 con `Retry-After` (ver `backend/jobs.py`).
+    """
+    upload = None
+    try:
+        if request.headers.get('content-type', '').startswith('multipart/form-data'):
+            form = await request.form()
+            file = form.get('file')
+            if file is None or isinstance(file, str):
+                raise HTTPException(status_code=400, detail="Multipart job requests need a 'file' field")
+            fields = {**request.query_params, **{k: v for k, v in form.items() if k != 'file'}, 'source': 'upload'}
+            spec = JobSpec.model_validate(fields)
+            path = await run_in_threadpool(_spool_upload, file)
+            upload = (path, file.filename, file.content_type)
+        else:
+            try:
+                body = await request.json()
+            except ValueError:
+                raise HTTPException(status_code=400, detail='Job request body must be JSON or multipart/form-data')
+            spec = JobSpec.model_validate(body)
+            if spec.source == 'upload':
+                raise HTTPException(status_code=400, detail="source=upload needs a multipart request with a 'file'")
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+    cleanup = (lambda: os.unlink(upload[0])) if upload is not None else None
+    try:
+        job = _job_queue.submit(spec.source, _forecast_job(spec, upload), cleanup=cleanup)
     except HTTPException:
+        if cleanup is not None:
+            cleanup()
         raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return JSONResponse(status_code=202, content=job.snapshot(), headers={'Location': f'/api/jobs/{job.id}'})
+
+
+@app.get('/api/jobs')
+def job_stats():
+    """Número de trabajos por estado, límites de la cola y peticiones rechazadas (429)."""
+    return _job_queue.stats()
+
+
+@app.get('/api/jobs/{job_id}')
+def get_job(job_id: str):
+    """Estado de un trabajo: `status`, `stage`, `progress` y, al terminar, `result` o `error`."""
+    return _job_or_404(job_id).snapshot()
+
+
+@app.delete('/api/jobs/{job_id}')
+def cancel_job(job_id: str):
+    """Cancela un trabajo en cola o en curso (sin efecto si ya terminó) y devuelve su estado."""
+    job = _job_or_404(job_id)
+    job.cancel()
+    return job.snapshot()
+
+
+@app.get('/api/jobs/{job_id}/events')
+def job_events(job_id: str):
+    """Progreso del trabajo como Server-Sent Events; el último evento trae el estado final."""
+    job = _job_or_404(job_id)
+    return StreamingResponse(jobs.sse_events(job), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.get('/api/prewarm')
+def prewarm_status():
+    """Estado del pre-calentado: configuración y, por serie, `last_refresh`, `duration` y `error`."""
+    if _prewarm_scheduler is None:
+        return {'running': False, 'series': {}}
+    return {**_prewarm_scheduler.status(), 'horizons': _prewarm_horizons}
+
+
+@app.get('/api/cache_stats')
+def cache_stats():
+    """Devuelve los contadores de la caché de series, de la de resultados (`forecast`) y de cotizaciones."""
+    return {**_series_cache.stats(), 'forecast': _result_cache.stats(), 'quotes': _quotes.stats(),
+            'state': shared.default_backend().stats()}
+
+
+@app.get('/api/metrics', response_class=PlainTextResponse)
+def metrics():
+    """Histogramas de latencia por etapa y por petición en formato de texto de Prometheus.
+
+    Etapas: `fetch`, `normalize`, `parse`, `cache_lookup`, `evaluate`,
+    `build_series`, `downsample` y `serialize`, etiquetadas por `endpoint`, `source` y `method`.
+    """
+    return PlainTextResponse(telemetry.render(), media_type='text/plain; version=0.0.4')
 
 
 @app.get('/api/eia_status')
@@ -299,7 +1112,8 @@ def eia_status():
     """Check whether an EIA API key is available in the environment.
 
     Returns a JSON object with `eia_key_present: true|false` so the UI
-    (or operator) can quickly detect missing tokens.
+    (or operator) can quickly detect missing tokens, plus the shared request
+    `budget` (`EIA_BUDGET`, see `backend/shared.py`).
     """
     key = os.getenv('EIA_API_KEY') or os.getenv('EIA_TOKEN')
-    return {'eia_key_present': bool(key)}
+    return {'eia_key_present': bool(key), 'budget': eia_budget().status()}
@@ -0,0 +1,210 @@
+"""Memoización de resultados de forecasting direccionada por contenido.
+
+La clave de un resultado es un hash SHA-256 de la serie normalizada (índice y
+valores) más los parámetros de evaluación (`horizon`, `method`, ajustes...).
+Se guarda el cuerpo JSON ya serializado, de modo que una repetición se sirve
+sin recalcular ni reserializar, y la clave sirve también como `ETag`.
+
+Configuración por entorno:
+- `FORECAST_CACHE_MAX_BYTES`: tamaño máximo en memoria (por defecto 32 MB);
+  se expulsan primero los resultados usados hace más tiempo.
+- `FORECAST_CACHE_DIR`: directorio opcional donde persistir los resultados,
+  compartido entre workers de uvicorn.
+- `FORECAST_CACHE_DISK_MAX_BYTES`: tamaño máximo del directorio (por defecto
+  256 MB); se borran primero los ficheros más antiguos.
+
+Con `STATE_BACKEND=sqlite` (ver `backend/shared.py`) los cuerpos se publican
+también en el backend compartido, que se consulta antes que el directorio.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from . import shared as shared_state
+
+# Incrementar cuando cambie la forma o el cálculo de los resultados.
+RESULT_VERSION = 1
+
+
+def series_key(s: pd.Series, **params) -> str:
+    """Hash hexadecimal de la serie (fechas + valores) y de los parámetros dados.
+
+    Para un panel multi-serie (índice `(series_id, date)`) se incluyen también
+    los identificadores y a qué serie pertenece cada fila.
+    """
+    h = hashlib.sha256()
+    index = s.index
+    if isinstance(index, pd.MultiIndex):
+        h.update(json.dumps([str(v) for v in index.levels[0]]).encode())
+        h.update(np.ascontiguousarray(index.codes[0], dtype=np.int64).tobytes())
+        index = index.get_level_values(-1)
+    index = pd.DatetimeIndex(index)
+    h.update(str(index.tz).encode())
+    h.update(np.ascontiguousarray(index.as_unit('ns').asi8).tobytes())
+    h.update(np.ascontiguousarray(s.to_numpy(dtype=np.float64)).tobytes())
+    h.update(json.dumps({'v': RESULT_VERSION, **params}, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+# full directory rescan interval (in writes) for `ResultCache`
+_RESCAN_EVERY = 1000
+
+
+class ResultCache:
+    """Caché LRU de cuerpos serializados acotada por bytes, con respaldo opcional en disco."""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, directory: str | os.PathLike | None = None,
+                 disk_max_bytes: int = 256 * 1024 * 1024, shared=None):
+        self.max_bytes = int(max_bytes)
+        self.shared = shared
+        self.disk_max_bytes = int(disk_max_bytes)
+        self.directory = Path(directory) if directory else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # running estimate of the directory size; a full scan only happens on
+        # the first write, when the limit is crossed, or every _RESCAN_EVERY
+        # writes (to account for files written by other workers)
+        self._disk_bytes: Optional[int] = None
+        self._disk_writes = 0
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.shared_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Devuelve el cuerpo guardado para `key` (memoria, backend compartido y luego disco)."""
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return body
+        if self.shared is not None:
+            body = self.shared.get('forecast', key)
+            if body is not None:
+                self._remember(key, body)
+                with self._lock:
+                    self.shared_hits += 1
+                return body
+        if self.directory is not None:
+            try:
+                body = (self.directory / f'{key}.json').read_bytes()
+            except OSError:
+                body = None
+            if body is not None:
+                self._remember(key, body)
+                with self._lock:
+                    self.disk_hits += 1
+                return body
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, body: bytes) -> None:
+        """Guarda `body` bajo `key` en memoria y, si están configurados, en el backend compartido y en disco."""
+        self._remember(key, body)
+        if self.shared is not None:
+            self.shared.put('forecast', key, body)
+        if self.directory is not None:
+            path = self.directory / f'{key}.json'
+            tmp = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+            try:
+                try:
+                    replaced = path.stat().st_size
+                except OSError:
+                    replaced = 0
+                tmp.write_bytes(body)
+                os.replace(tmp, path)
+                self._account_disk(len(body) - replaced)
+            except OSError:
+                tmp.unlink(missing_ok=True)
+
+    def _account_disk(self, delta: int) -> None:
+        """Suma `delta` al tamaño estimado del directorio y poda solo si supera el límite."""
+        with self._lock:
+            self._disk_writes += 1
+            rescan = self._disk_bytes is None or self._disk_writes % _RESCAN_EVERY == 0
+            if not rescan:
+                self._disk_bytes += delta
+                if self._disk_bytes <= self.disk_max_bytes:
+                    return
+        self._prune_disk()
+
+    def _remember(self, key: str, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def _prune_disk(self) -> None:
+        files = []
+        total = 0
+        for path in self.directory.glob('*.json'):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        if total > self.disk_max_bytes:
+            for _, size, path in sorted(files):
+                path.unlink(missing_ok=True)
+                total -= size
+                if total <= self.disk_max_bytes:
+                    break
+        with self._lock:
+            self._disk_bytes = total
+
+    def clear(self) -> None:
+        """Vacía la memoria (no toca el directorio compartido) y reinicia contadores."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.shared_hits = self.disk_hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'shared_hits': self.shared_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'directory': str(self.directory) if self.directory else None,
+                'disk_bytes': self._disk_bytes,
+                'shared': self.shared is not None,
+            }
+
+
+def result_cache_from_env() -> ResultCache:
+    """Crea una `ResultCache` a partir de las variables `FORECAST_CACHE_*` (y de `STATE_BACKEND`)."""
+    backend = shared_state.default_backend()
+    return ResultCache(
+        max_bytes=int(os.getenv('FORECAST_CACHE_MAX_BYTES', str(32 * 1024 * 1024))),
+        directory=os.getenv('FORECAST_CACHE_DIR') or None,
+        disk_max_bytes=int(os.getenv('FORECAST_CACHE_DISK_MAX_BYTES', str(256 * 1024 * 1024))),
+        shared=backend if backend.shared else None,
+    )
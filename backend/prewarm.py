@@ -0,0 +1,177 @@
+"""Pre-calentado periódico de las series más consultadas.
+
+Un hilo en segundo plano (arrancado desde el hook `startup` de `main.py`)
+refresca cada cierto tiempo un conjunto de series y precalcula sus resultados
+de `evaluate_methods` para los horizontes habituales, de modo que el primer
+usuario tras una actualización de datos no paga la descarga ni la evaluación.
+
+Configuración por entorno (valores por defecto entre paréntesis):
+- `PREWARM_ENABLED` (`1`): `0` desactiva el planificador.
+- `PREWARM_SERIES`: lista `source:symbol[:period]` separada por comas. Por
+  defecto `CL=F`, `BZ=F`, `NG=F` (yahoo), `XOM` (xm) y, si hay clave de EIA,
+  las series de `data_sources.EIA_SERIES`.
+- `PREWARM_HORIZONS` (`7,30`): horizontes a precalcular.
+- `PREWARM_INTERVAL` (900 s) y `PREWARM_JITTER` (0.1): cada ciclo espera
+  `interval * (1 ± jitter)` para que varios workers no refresquen a la vez.
+- `PREWARM_CONCURRENCY` (2): series refrescadas en paralelo como máximo.
+"""
+
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from .data_sources import EIA_SERIES
+
+DEFAULT_TARGETS = ('yahoo:CL=F', 'yahoo:BZ=F', 'yahoo:NG=F', 'xm:XOM')
+
+
+class Target(NamedTuple):
+    """Serie a pre-calentar (mismos parámetros que `/api/online`)."""
+    source: str
+    symbol: str
+    period: str = '1y'
+
+    @property
+    def key(self) -> str:
+        return f'{self.source}:{self.symbol}:{self.period}'
+
+
+def parse_targets(spec: str) -> List[Target]:
+    """Convierte `'yahoo:CL=F,eia:PET.RWTC.D:5y'` en una lista de `Target`."""
+    targets = []
+    for item in spec.split(','):
+        parts = [p.strip() for p in item.strip().split(':')]
+        if len(parts) < 2 or not parts[0] or not parts[1]:
+            if item.strip():
+                raise ValueError(f'Invalid prewarm series {item.strip()!r}; expected source:symbol[:period]')
+            continue
+        targets.append(Target(parts[0].lower(), parts[1], parts[2] if len(parts) > 2 and parts[2] else '1y'))
+    return targets
+
+
+def default_targets() -> List[Target]:
+    targets = parse_targets(','.join(DEFAULT_TARGETS))
+    if os.getenv('EIA_API_KEY') or os.getenv('EIA_TOKEN'):
+        targets += [Target('eia', series_id) for series_id in EIA_SERIES.values()]
+    return targets
+
+
+class PrewarmScheduler:
+    """Refresca `targets` cada `interval` segundos (con jitter) llamando a `warm(target)`.
+
+    `warm` descarga la serie y deja los resultados en las cachés; sus errores
+    se registran en el estado de la serie sin detener el ciclo.
+    """
+
+    def __init__(self, targets: Sequence[Target], warm: Callable[[Target], None], interval: float = 900.0,
+                 jitter: float = 0.1, concurrency: int = 2, clock: Callable[[], float] = time.time):
+        self.targets = list(dict.fromkeys(targets))
+        self.warm = warm
+        self.interval = float(interval)
+        self.jitter = max(0.0, min(float(jitter), 1.0))
+        self.concurrency = max(1, int(concurrency))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.cycles = 0
+        self._status: Dict[str, Dict] = {
+            t.key: {'last_refresh': None, 'last_attempt': None, 'duration': None,
+                    'error': None, 'refreshes': 0, 'failures': 0}
+            for t in self.targets
+        }
+
+    def _next_delay(self) -> float:
+        return self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _warm_one(self, target: Target) -> None:
+        started = self._clock()
+        t0 = time.perf_counter()
+        try:
+            self.warm(target)
+            error = None
+        except Exception as e:
+            error = str(getattr(e, 'detail', None) or e)
+        elapsed = time.perf_counter() - t0
+        with self._lock:
+            status = self._status[target.key]
+            status['last_attempt'] = started
+            status['duration'] = round(elapsed, 4)
+            status['error'] = error
+            if error is None:
+                status['last_refresh'] = started
+                status['refreshes'] += 1
+            else:
+                status['failures'] += 1
+
+    def run_once(self) -> None:
+        """Refresca todas las series una vez, como mucho `concurrency` a la vez."""
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='prewarm') as pool:
+            list(pool.map(self._warm_one, self.targets))
+        with self._lock:
+            self.cycles += 1
+
+    def _loop(self) -> None:
+        # a short random delay so workers started together do not warm in lockstep
+        if self._stop.wait(random.uniform(0, min(self.interval * self.jitter, 30.0))):
+            return
+        while not self._stop.is_set():
+            self.run_once()
+            if self._stop.wait(self._next_delay()):
+                return
+
+    def start(self) -> None:
+        """Arranca el hilo del planificador (idempotente)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='prewarm', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def status(self) -> Dict:
+        """Configuración y, por serie, última actualización correcta, duración y último error."""
+        with self._lock:
+            return {
+                'running': self.running,
+                'interval': self.interval,
+                'jitter': self.jitter,
+                'concurrency': self.concurrency,
+                'cycles': self.cycles,
+                'series': {key: dict(status) for key, status in self._status.items()},
+            }
+
+
+def scheduler_from_env(warm: Callable[[Target], None]) -> Optional[PrewarmScheduler]:
+    """Crea el planificador según `PREWARM_*`, o `None` si está desactivado o sin series."""
+    if os.getenv('PREWARM_ENABLED', '1') == '0':
+        return None
+    spec = os.getenv('PREWARM_SERIES')
+    targets = parse_targets(spec) if spec is not None else default_targets()
+    if not targets:
+        return None
+    return PrewarmScheduler(
+        targets,
+        warm,
+        interval=float(os.getenv('PREWARM_INTERVAL', '900')),
+        jitter=float(os.getenv('PREWARM_JITTER', '0.1')),
+        concurrency=int(os.getenv('PREWARM_CONCURRENCY', '2')),
+    )
+
+
+def horizons_from_env() -> List[int]:
+    """Horizontes de `PREWARM_HORIZONS` (por defecto 7 y 30)."""
+    return [int(h) for h in os.getenv('PREWARM_HORIZONS', '7,30').split(',') if h.strip()]
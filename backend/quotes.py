@@ -0,0 +1,167 @@
+"""Últimos cierres de varios tickers con una sola descarga y caché TTL corta.
+
+`QuoteCache.get_many(symbols, period)` devuelve la última cotización de cada
+símbolo:
+
+- los símbolos con una entrada de menos de `ttl` segundos salen de memoria;
+- los que otra petición ya está descargando se esperan en lugar de pedirse
+  de nuevo (coalescencia por símbolo, de modo que dos listas que se solapan
+  solo comparten la parte común);
+- el resto se pide en una única llamada `fetch(symbols, period)` (en
+  `backend/main.py`, un `yf.download` por lotes).
+
+Un símbolo sin datos se guarda como `None` durante el mismo TTL para no
+repetir la descarga en cada petición.
+
+Configuración por entorno:
+- `QUOTES_TTL`: segundos de validez de una cotización (por defecto 5).
+- `QUOTES_MAX_ENTRIES`: cotizaciones en memoria antes de expulsar la menos
+  usada (por defecto 1024).
+- `QUOTES_MAX_SYMBOLS`: símbolos por petición (por defecto 100).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, Iterable, List, Optional
+
+import pandas as pd
+
+Quote = Optional[Dict]
+
+
+def parse_symbols(raw: str | Iterable[str]) -> List[str]:
+    """Normaliza una lista de tickers (`'cl=f, XOM,,xom'` -> `['CL=F', 'XOM']`)."""
+    if isinstance(raw, str):
+        raw = raw.split(',')
+    out: List[str] = []
+    for sym in raw:
+        sym = sym.strip().upper()
+        if sym and sym not in out:
+            out.append(sym)
+    return out
+
+
+def last_closes(frame: pd.DataFrame, symbols: List[str]) -> Dict[str, Quote]:
+    """Última columna `Close` no nula de cada símbolo en el resultado de `yf.download`.
+
+    Acepta columnas `(campo, ticker)` (por defecto en yfinance) o planas
+    (un único ticker con `multi_level_index=False`).
+    """
+    out: Dict[str, Quote] = {sym: None for sym in symbols}
+    if frame is None or frame.empty or 'Close' not in frame.columns.get_level_values(0):
+        return out
+    close = frame['Close']
+    if isinstance(close, pd.Series):
+        close = close.to_frame(symbols[0])
+    close = close.rename(columns=str.upper)
+    for sym in symbols:
+        if sym not in close.columns:
+            continue
+        col = close[sym].dropna()
+        if not col.empty:
+            out[sym] = {'close': float(col.iloc[-1]), 'date': pd.Timestamp(col.index[-1]).strftime('%Y-%m-%d')}
+    return out
+
+
+class QuoteCache:
+    """Cotizaciones por `(symbol, period)` con TTL, LRU y descargas coalescidas."""
+
+    def __init__(self, fetch: Callable[[List[str], str], Dict[str, Quote]], ttl: float = 5.0,
+                 max_entries: int = 1024, clock: Callable[[], float] = time.monotonic):
+        self._fetch = fetch
+        self.ttl = float(ttl)
+        self.max_entries = max(1, int(max_entries))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple[float, Quote]]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.batches = 0
+
+    def get_many(self, symbols: List[str], period: str = '5d') -> Dict[str, Quote]:
+        """Cotización (o `None` si no hay datos) de cada símbolo, en el orden recibido.
+
+        Si la descarga falla, la excepción llega a esta petición y a las que
+        esperaban esos mismos símbolos; nada se guarda en caché.
+        """
+        now = self._clock()
+        found: Dict[str, Quote] = {}
+        waiting: Dict[str, Future] = {}
+        mine: Dict[str, Future] = {}
+        with self._lock:
+            for sym in symbols:
+                key = (sym, period)
+                entry = self._entries.get(key)
+                if entry is not None and now - entry[0] < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    found[sym] = entry[1]
+                    continue
+                fut = self._inflight.get(key)
+                if fut is None:
+                    fut = mine[sym] = self._inflight[key] = Future()
+                    self.misses += 1
+                else:
+                    self.coalesced += 1
+                waiting[sym] = fut
+            if mine:
+                self.batches += 1
+
+        if mine:
+            try:
+                fetched = self._fetch(list(mine), period)
+            except BaseException as e:
+                with self._lock:
+                    for sym in mine:
+                        self._inflight.pop((sym, period), None)
+                for fut in mine.values():
+                    fut.set_exception(e)
+                raise
+            stamp = self._clock()
+            with self._lock:
+                for sym in mine:
+                    key = (sym, period)
+                    self._entries[key] = (stamp, fetched.get(sym))
+                    self._entries.move_to_end(key)
+                    self._inflight.pop(key, None)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            for sym, fut in mine.items():
+                fut.set_result(fetched.get(sym))
+
+        for sym, fut in waiting.items():
+            found[sym] = fut.result()
+        return {sym: found[sym] for sym in symbols}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'inflight': len(self._inflight),
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'batches': self.batches,
+            }
+
+
+def max_symbols_from_env() -> int:
+    return int(os.getenv('QUOTES_MAX_SYMBOLS', '100'))
+
+
+def quote_cache_from_env(fetch: Callable[[List[str], str], Dict[str, Quote]]) -> QuoteCache:
+    """Crea un `QuoteCache` con `QUOTES_TTL` y `QUOTES_MAX_ENTRIES`."""
+    return QuoteCache(
+        fetch,
+        ttl=float(os.getenv('QUOTES_TTL', '5')),
+        max_entries=int(os.getenv('QUOTES_MAX_ENTRIES', '1024')),
+    )
@@ -0,0 +1,305 @@
+"""Estado compartido entre workers: caché clave/valor y presupuesto de peticiones.
+
+Con varios workers de uvicorn cada proceso tiene sus propias cachés en
+memoria; este módulo añade un nivel común que todos consultan:
+
+- `MemoryBackend`: diccionario en proceso. No comparte nada entre workers
+  (`shared = False`), de modo que las cachés lo ignoran, pero sirve para el
+  presupuesto dentro de un único proceso. Es la opción por defecto.
+- `SQLiteBackend`: un fichero SQLite en modo WAL que pueden abrir todos los
+  workers del mismo host. Guarda series (`cache.SeriesCache`), cuerpos de
+  pronóstico (`memo.ResultCache`) y los contadores de `Budget`.
+
+`Budget` limita las peticiones a un servicio externo (EIA) a `limit` por
+ventana fija de `window` segundos, sumando las de todos los procesos que usan
+el mismo backend.
+
+Configuración por entorno:
+- `STATE_BACKEND`: `memory` (por defecto) o `sqlite`.
+- `STATE_SQLITE_PATH`: fichero de la base (por defecto `forecast-state.db` en
+  el directorio temporal).
+- `STATE_MAX_ENTRIES`: entradas clave/valor antes de purgar las más antiguas
+  (por defecto 10000).
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# purge expired/old rows once every this many writes
+_PRUNE_EVERY = 256
+
+
+class BudgetExceeded(RuntimeError):
+    """No queda presupuesto en la ventana actual; `retry_after` indica cuándo se renueva."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Request budget '{name}' exhausted; retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+def key_str(key: Hashable) -> str:
+    """Clave estable (texto) para las tuplas que usan las cachés en memoria."""
+    return '\x1f'.join(str(p) for p in key) if isinstance(key, tuple) else str(key)
+
+
+def dumps_series(s: pd.Series, stamp: float) -> bytes:
+    """Serializa una serie fecha/valor (sin pickle): cabecera JSON + fechas int64 + valores float64."""
+    index = pd.DatetimeIndex(s.index)
+    header = json.dumps({'stamp': stamp, 'n': len(s), 'unit': index.unit, 'tz': str(index.tz) if index.tz else None,
+                         'name': s.name if isinstance(s.name, str) else None,
+                         'index_name': index.name if isinstance(index.name, str) else None}).encode()
+    dates = np.ascontiguousarray(index.asi8, dtype='<i8')
+    values = np.ascontiguousarray(s.to_numpy(dtype=np.float64), dtype='<f8')
+    return len(header).to_bytes(4, 'little') + header + dates.tobytes() + values.tobytes()
+
+
+def loads_series(blob: bytes) -> Tuple[float, pd.Series]:
+    """Inversa de `dumps_series`: devuelve `(stamp, serie)`."""
+    size = int.from_bytes(blob[:4], 'little')
+    meta = json.loads(blob[4:4 + size])
+    n, start = meta['n'], 4 + size
+    dates = np.frombuffer(blob, dtype='<i8', count=n, offset=start)
+    values = np.frombuffer(blob, dtype='<f8', count=n, offset=start + 8 * n).copy()
+    index = pd.DatetimeIndex(dates.astype(f"datetime64[{meta['unit']}]"), name=meta['index_name'])
+    if meta['tz']:
+        index = index.tz_localize('UTC').tz_convert(meta['tz'])
+    return meta['stamp'], pd.Series(values, index=index, name=meta['name'])
+
+
+class MemoryBackend:
+    """Estado en memoria del proceso (no compartido entre workers)."""
+
+    shared = False
+
+    def __init__(self, max_entries: int = 10000, clock: Callable[[], float] = time.time):
+        self.max_entries = max(1, int(max_entries))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._kv: "OrderedDict[Tuple[str, str], Tuple[bytes, Optional[float]]]" = OrderedDict()
+        self._budgets: Dict[str, Tuple[float, int]] = {}
+
+    def get(self, ns: str, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._kv.get((ns, key))
+            if item is None:
+                return None
+            if item[1] is not None and item[1] <= self._clock():
+                del self._kv[(ns, key)]
+                return None
+            self._kv.move_to_end((ns, key))
+            return item[0]
+
+    def put(self, ns: str, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        expires = self._clock() + ttl if ttl else None
+        with self._lock:
+            self._kv[(ns, key)] = (value, expires)
+            self._kv.move_to_end((ns, key))
+            while len(self._kv) > self.max_entries:
+                self._kv.popitem(last=False)
+
+    def delete(self, ns: str, key: str) -> None:
+        with self._lock:
+            self._kv.pop((ns, key), None)
+
+    def take(self, name: str, limit: int, window: float, cost: int = 1) -> Tuple[bool, int, float]:
+        """Consume `cost` del presupuesto `name`; devuelve `(concedido, usado, segundos_hasta_renovar)`."""
+        now = self._clock()
+        with self._lock:
+            start, used = self._budgets.get(name, (now, 0))
+            if now - start >= window:
+                start, used = now, 0
+            granted = used + cost <= limit
+            if granted:
+                used += cost
+            self._budgets[name] = (start, used)
+            return granted, used, start + window - now
+
+    def peek(self, name: str, window: float) -> Tuple[int, float]:
+        now = self._clock()
+        with self._lock:
+            start, used = self._budgets.get(name, (now, 0))
+        if now - start >= window:
+            return 0, window
+        return used, start + window - now
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'backend': 'memory', 'entries': len(self._kv), 'max_entries': self.max_entries}
+
+
+class SQLiteBackend:
+    """Estado en un fichero SQLite (modo WAL) compartido por los procesos del host.
+
+    Cada hilo abre su propia conexión; las escrituras del presupuesto usan
+    `BEGIN IMMEDIATE` para que leer y actualizar el contador sea atómico
+    entre procesos.
+    """
+
+    shared = True
+
+    def __init__(self, path: str | os.PathLike, max_entries: int = 10000, busy_timeout: float = 5.0,
+                 clock: Callable[[], float] = time.time):
+        self.path = str(path)
+        self.max_entries = max(1, int(max_entries))
+        self.busy_timeout = float(busy_timeout)
+        self._clock = clock
+        self._local = threading.local()
+        self._writes = 0
+        conn = self._conn()
+        conn.execute('CREATE TABLE IF NOT EXISTS kv (ns TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, '
+                     'updated REAL NOT NULL, expires REAL, PRIMARY KEY (ns, key))')
+        conn.execute('CREATE INDEX IF NOT EXISTS kv_updated ON kv (updated)')
+        conn.execute('CREATE TABLE IF NOT EXISTS budget (name TEXT PRIMARY KEY, start REAL NOT NULL, '
+                     'used INTEGER NOT NULL)')
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            import sqlite3
+
+            # autocommit mode: every statement commits unless wrapped in BEGIN ... COMMIT
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, ns: str, key: str) -> Optional[bytes]:
+        row = self._conn().execute('SELECT value, expires FROM kv WHERE ns = ? AND key = ?', (ns, key)).fetchone()
+        if row is None or (row[1] is not None and row[1] <= self._clock()):
+            return None
+        return bytes(row[0])
+
+    def put(self, ns: str, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        now = self._clock()
+        conn = self._conn()
+        conn.execute('INSERT OR REPLACE INTO kv (ns, key, value, updated, expires) VALUES (?, ?, ?, ?, ?)',
+                     (ns, key, value, now, now + ttl if ttl else None))
+        self._writes += 1
+        if self._writes % _PRUNE_EVERY == 0:
+            self._prune(conn, now)
+
+    def _prune(self, conn, now: float) -> None:
+        conn.execute('DELETE FROM kv WHERE expires IS NOT NULL AND expires <= ?', (now,))
+        conn.execute('DELETE FROM kv WHERE rowid IN (SELECT rowid FROM kv ORDER BY updated DESC LIMIT -1 OFFSET ?)',
+                     (self.max_entries,))
+
+    def delete(self, ns: str, key: str) -> None:
+        self._conn().execute('DELETE FROM kv WHERE ns = ? AND key = ?', (ns, key))
+
+    def take(self, name: str, limit: int, window: float, cost: int = 1) -> Tuple[bool, int, float]:
+        """Como `MemoryBackend.take`, pero atómico entre todos los procesos que abren el fichero."""
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = self._clock()
+            row = conn.execute('SELECT start, used FROM budget WHERE name = ?', (name,)).fetchone()
+            start, used = row if row is not None else (now, 0)
+            if now - start >= window:
+                start, used = now, 0
+            granted = used + cost <= limit
+            if granted:
+                used += cost
+            conn.execute('INSERT OR REPLACE INTO budget (name, start, used) VALUES (?, ?, ?)', (name, start, used))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return granted, used, start + window - now
+
+    def peek(self, name: str, window: float) -> Tuple[int, float]:
+        now = self._clock()
+        row = self._conn().execute('SELECT start, used FROM budget WHERE name = ?', (name,)).fetchone()
+        if row is None or now - row[0] >= window:
+            return 0, window
+        return row[1], row[0] + window - now
+
+    def stats(self) -> Dict:
+        entries = self._conn().execute('SELECT COUNT(*) FROM kv').fetchone()[0]
+        return {'backend': 'sqlite', 'path': self.path, 'entries': entries, 'max_entries': self.max_entries}
+
+
+class Budget:
+    """Presupuesto de `limit` peticiones por ventana de `window` segundos (`limit <= 0`: sin límite)."""
+
+    def __init__(self, backend, name: str, limit: int, window: float = 3600.0, wait: float = 0.0,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.backend = backend
+        self.name = name
+        self.limit = int(limit)
+        self.window = float(window)
+        self.wait = float(wait)
+        self._sleep = sleep
+
+    def acquire(self, cost: int = 1) -> None:
+        """Consume `cost` peticiones o lanza `BudgetExceeded`.
+
+        Si la ventana se renueva antes de `wait` segundos, espera en lugar de fallar.
+        """
+        if self.limit <= 0:
+            return
+        waited = 0.0
+        while True:
+            granted, _, resets_in = self.backend.take(self.name, self.limit, self.window, cost)
+            if granted:
+                return
+            if waited + resets_in > self.wait:
+                raise BudgetExceeded(self.name, resets_in)
+            self._sleep(resets_in)
+            waited += resets_in
+
+    def status(self) -> Dict:
+        if self.limit <= 0:
+            return {'name': self.name, 'limit': None}
+        used, resets_in = self.backend.peek(self.name, self.window)
+        return {'name': self.name, 'limit': self.limit, 'window': self.window, 'used': used,
+                'remaining': max(0, self.limit - used), 'resets_in': round(resets_in, 3)}
+
+
+def backend_from_env():
+    """Crea el backend indicado por `STATE_BACKEND` (`memory` o `sqlite`)."""
+    kind = os.getenv('STATE_BACKEND', 'memory').strip().lower()
+    max_entries = int(os.getenv('STATE_MAX_ENTRIES', '10000'))
+    if kind == 'sqlite':
+        path = os.getenv('STATE_SQLITE_PATH') or os.path.join(tempfile.gettempdir(), 'forecast-state.db')
+        return SQLiteBackend(path, max_entries=max_entries)
+    if kind != 'memory':
+        raise ValueError(f'Unknown STATE_BACKEND {kind!r} (expected memory or sqlite)')
+    return MemoryBackend(max_entries=max_entries)
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_backend():
+    """Backend del proceso, creado una vez con `backend_from_env` y compartido por todos los módulos."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = backend_from_env()
+        return _default
+
+
+def eia_budget_from_env(backend=None) -> Budget:
+    """Presupuesto EIA: `EIA_BUDGET` peticiones (0 = sin límite) cada `EIA_BUDGET_WINDOW` s.
+
+    `EIA_BUDGET_WAIT` (segundos, 0 por defecto) permite esperar a la siguiente
+    ventana en lugar de fallar.
+    """
+    return Budget(
+        backend if backend is not None else default_backend(),
+        'eia',
+        limit=int(os.getenv('EIA_BUDGET', '0')),
+        window=float(os.getenv('EIA_BUDGET_WINDOW', '3600')),
+        wait=float(os.getenv('EIA_BUDGET_WAIT', '0')),
+    )
@@ -0,0 +1,159 @@
+"""Almacén local de series en disco con lecturas mapeadas en memoria.
+
+Cada serie se guarda como dos ficheros binarios crudos en `SERIES_STORE_DIR`:
+`<clave>.dates` (int64, nanosegundos UTC) y `<clave>.values` (float64), más un
+`<clave>.json` con la zona horaria original. Las observaciones nuevas se
+anexan al final de los ficheros (sobrescribiendo las guardadas desde su primera
+fecha, para corregir la última barra) y las lecturas abren ambos con `np.memmap`,
+de modo que la `Series` devuelta comparte memoria con el fichero (sin copia).
+
+Las escrituras de una clave se serializan con un `fcntl.flock` sobre
+`<clave>.lock`, de modo que varios workers pueden compartir el directorio.
+
+El almacén está desactivado salvo que se defina `SERIES_STORE_DIR`.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Hashable, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: only threads in one process are serialized
+    fcntl = None
+
+
+def _safe_name(key: Hashable) -> str:
+    """Convierte la clave de una serie en un nombre de fichero estable y seguro."""
+    raw = ':'.join(str(p) for p in key) if isinstance(key, tuple) else str(key)
+    slug = re.sub(r'[^A-Za-z0-9._-]+', '_', raw)[:80]
+    digest = hashlib.sha1(raw.encode('utf-8')).hexdigest()[:12]
+    return f'{slug}-{digest}'
+
+
+class SeriesStore:
+    """Series float64/datetime64 persistidas como columnas binarias anexables."""
+
+    def __init__(self, root: str | os.PathLike):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _paths(self, key: Hashable) -> Tuple[Path, Path, Path]:
+        base = self.root / _safe_name(key)
+        return base.with_suffix('.dates'), base.with_suffix('.values'), base.with_suffix('.json')
+
+    @contextmanager
+    def _locked(self, key: Hashable) -> Iterator[None]:
+        """Exclusión entre hilos (`self._lock`) y entre procesos (`flock` por clave)."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.root / f'{_safe_name(key)}.lock', 'a') as fh:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self._paths(key)[0].exists()
+
+    def read(self, key: Hashable) -> Optional[pd.Series]:
+        """Devuelve la serie guardada para `key` (o `None`) sin copiar los datos."""
+        dates_path, values_path, meta_path = self._paths(key)
+        if not dates_path.exists() or not values_path.exists():
+            return None
+        # a writer appends values before dates; trust the shorter column
+        n = min(dates_path.stat().st_size, values_path.stat().st_size) // 8
+        if n == 0:
+            return None
+        dates = np.memmap(dates_path, dtype=np.int64, mode='r', shape=(n,))
+        values = np.memmap(values_path, dtype=np.float64, mode='r', shape=(n,))
+        index = pd.DatetimeIndex(dates.view('M8[ns]'), copy=False, name='date')
+        tz = json.loads(meta_path.read_text()).get('tz') if meta_path.exists() else None
+        if tz:
+            index = index.tz_localize('UTC').tz_convert(tz)
+        return pd.Series(values, index=index, copy=False)
+
+    def append(self, key: Hashable, s: pd.Series) -> int:
+        """Guarda las observaciones de `s`; sustituyen a las guardadas desde su primera fecha.
+
+        Así una barra que se vuelve a descargar (p. ej. un cierre parcial ya
+        corregido) reemplaza a la almacenada. Devuelve el número de filas escritas.
+        """
+        if s is None or s.empty:
+            return 0
+        dates_path, values_path, meta_path = self._paths(key)
+        s = s.sort_index()
+        index = pd.DatetimeIndex(s.index)
+        tz = str(index.tz) if index.tz is not None else None
+        if tz:
+            index = index.tz_convert('UTC').tz_localize(None)
+        dates = index.as_unit('ns').asi8
+        values = np.ascontiguousarray(s.to_numpy(dtype=np.float64))
+
+        # finding the overlap, rewriting it and appending must not interleave with another worker
+        with self._locked(key):
+            start = 0
+            if values_path.exists() and dates_path.exists():
+                n = min(dates_path.stat().st_size, values_path.stat().st_size) // 8
+                if n:
+                    stored = np.memmap(dates_path, dtype=np.int64, mode='r', shape=(n,))
+                    start = int(np.searchsorted(stored, dates[0], side='left'))
+                    del stored
+            if not meta_path.exists():
+                meta_path.write_text(json.dumps({'tz': tz}))
+            # rewrite from the first overlapping row in place rather than truncating first,
+            # so the files never shrink under a reader's memmap; the final truncate() also
+            # drops any torn tail left by an interrupted write. Values go before dates.
+            for path, column in ((values_path, values), (dates_path, np.ascontiguousarray(dates, dtype=np.int64))):
+                with open(path, 'r+b' if path.exists() else 'wb') as fh:
+                    fh.seek(start * 8)
+                    fh.write(column.tobytes())
+                    fh.truncate()
+        return int(len(dates))
+
+    def stored_fetchers(
+        self,
+        key: Hashable,
+        fetch_full: Callable[[], pd.Series],
+        fetch_since: Callable[[pd.Timestamp], pd.Series],
+        trim: Optional[Callable[[pd.Series], pd.Series]] = None,
+    ) -> Tuple[Callable[[], pd.Series], Callable[[pd.Timestamp], pd.Series]]:
+        """Envuelve los callables de descarga de `SeriesCache` para pasar por disco.
+
+        Una descarga completa se sirve desde disco si la serie ya existe (pidiendo
+        solo las filas nuevas); cualquier fila nueva descargada se anexa al almacén.
+        """
+        def full() -> pd.Series:
+            s = self.read(key)
+            if s is None:
+                s = fetch_full()
+                self.append(key, s)
+                return s
+            if self.append(key, fetch_since(s.index[-1])):
+                s = self.read(key)
+            return trim(s) if trim is not None else s
+
+        def since(last: pd.Timestamp) -> pd.Series:
+            new = fetch_since(last)
+            self.append(key, new)
+            return new
+
+        return full, since
+
+
+def store_from_env() -> Optional[SeriesStore]:
+    """Crea un `SeriesStore` en `SERIES_STORE_DIR` o devuelve `None` si no está definido."""
+    root = os.getenv('SERIES_STORE_DIR')
+    return SeriesStore(root) if root else None
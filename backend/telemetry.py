@@ -0,0 +1,159 @@
+"""Instrumentación de latencia por etapa y exportación en formato Prometheus.
+
+Uso típico:
+
+    with telemetry.request_scope('/api/online'):
+        telemetry.set_labels(source='yahoo', method='auto')
+        with telemetry.span('fetch'):
+            ...
+
+Cada `span` observa su duración en el histograma
+`forecast_stage_seconds{endpoint, stage, source, method}` y, dentro de un
+`request_scope`, se acumula para la cabecera `Server-Timing` de la respuesta.
+Los spans anidados no se cuentan dos veces: cada etapa registra su tiempo
+propio (el de sus spans hijos se descuenta), de modo que las etapas suman.
+La latencia total de cada petición va a `forecast_request_seconds{endpoint, status}`.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+STAGE_LABELS = ('endpoint', 'stage', 'source', 'method')
+REQUEST_LABELS = ('endpoint', 'status')
+
+
+class Histogram:
+    """Histograma acumulativo con etiquetas fijas, seguro entre hilos.
+
+    Como salvaguarda, a partir de `max_series` combinaciones de etiquetas las
+    nuevas se acumulan en una única serie con todas las etiquetas a `other`.
+    """
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets=BUCKETS,
+                 max_series: int = 1000):
+        self.max_series = max(1, int(max_series))
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(n, '')) for n in self.label_names)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                if len(self._series) >= self.max_series:
+                    key = ('other',) * len(self.label_names)
+                    series = self._series.get(key)
+                if series is None:
+                    series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self) -> Dict[Tuple[str, ...], Tuple[List[int], float, int]]:
+        with self._lock:
+            return {k: (list(v[0]), v[1], v[2]) for k, v in self._series.items()}
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for key, (counts, total, count) in sorted(self.snapshot().items()):
+            labels = ','.join(f'{n}="{_escape(v)}"' for n, v in zip(self.label_names, key))
+            sep = ',' if labels else ''
+            for bound, c in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{labels}{sep}le="{bound}"}} {c}')
+            lines.append(f'{self.name}_bucket{{{labels}{sep}le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{{labels}}} {total}')
+            lines.append(f'{self.name}_count{{{labels}}} {count}')
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+STAGE_SECONDS = Histogram('forecast_stage_seconds', 'Latency of each request stage in seconds.', STAGE_LABELS)
+REQUEST_SECONDS = Histogram('forecast_request_seconds', 'Total request latency in seconds.', REQUEST_LABELS)
+
+
+class _RequestTimings:
+    def __init__(self, endpoint: str):
+        self.labels = {'endpoint': endpoint}
+        self.spans: Dict[str, float] = {}
+
+
+_current: contextvars.ContextVar[Optional[_RequestTimings]] = contextvars.ContextVar('request_timings', default=None)
+# seconds spent in child spans of the innermost open span
+_children: contextvars.ContextVar[Optional[List[float]]] = contextvars.ContextVar('span_children', default=None)
+
+
+@contextmanager
+def request_scope(endpoint: str) -> Iterator[_RequestTimings]:
+    """Abre el ámbito de una petición: etiquetas comunes y acumulador de spans."""
+    timings = _RequestTimings(endpoint)
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+def set_labels(**labels) -> None:
+    """Fija etiquetas (`source`, `method`) para los spans siguientes de la petición."""
+    timings = _current.get()
+    if timings is not None:
+        timings.labels.update({k: v for k, v in labels.items() if v is not None})
+
+
+@contextmanager
+def span(stage: str, **labels) -> Iterator[None]:
+    """Mide un bloque y lo registra como etapa `stage` de la petición actual.
+
+    Solo cuenta el tiempo propio: el de los spans abiertos dentro se descuenta.
+    """
+    children = [0.0]
+    token = _children.set(children)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        total = time.perf_counter() - start
+        _children.reset(token)
+        parent = _children.get()
+        if parent is not None:
+            parent[0] += total
+        elapsed = max(0.0, total - children[0])
+        timings = _current.get()
+        merged = dict(timings.labels) if timings is not None else {}
+        merged.update(labels)
+        STAGE_SECONDS.observe(elapsed, stage=stage, **merged)
+        if timings is not None:
+            timings.spans[stage] = timings.spans.get(stage, 0.0) + elapsed
+
+
+def server_timing(timings: _RequestTimings) -> str:
+    """Valor de la cabecera `Server-Timing` (duraciones en milisegundos)."""
+    return ', '.join(f'{stage};dur={elapsed * 1000:.2f}' for stage, elapsed in timings.spans.items())
+
+
+def render() -> str:
+    """Todas las métricas en formato de texto de Prometheus."""
+    return '\n'.join(STAGE_SECONDS.render() + REQUEST_SECONDS.render()) + '\n'
+
+
+def clear() -> None:
+    STAGE_SECONDS.clear()
+    REQUEST_SECONDS.clear()
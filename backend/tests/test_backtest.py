@@ -0,0 +1,68 @@
+import sys
+import pathlib
+
+# ensure project root is on sys.path so `backend` package can be imported when running pytest
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+
+import io
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import engine
+from backend.main import _forecast_ewm, _forecast_ma, _forecast_naive, _mape, _rmse, app, evaluate_methods
+
+
+def _series(n, seed=1):
+    rng = np.random.default_rng(seed)
+    return pd.Series(80 + rng.normal(0, 1, n).cumsum(), index=pd.date_range('2020-01-01', periods=n))
+
+
+def test_rolling_origins_end_at_holdout():
+    origins = engine.rolling_origins(100, 14, 5, min_train=14)
+    assert origins[-1] == 86
+    assert origins[0] >= 14
+    assert np.all(np.diff(origins) > 0)
+    with pytest.raises(ValueError):
+        engine.rolling_origins(30, 7, 50, min_train=7)
+
+
+def test_rolling_backtest_matches_per_fold_reference():
+    s = _series(120)
+    res = evaluate_methods(s, horizon=3, backtest='rolling', folds=6)
+    bt = res['backtest']
+    assert len(bt['folds']) == 6
+    h = bt['horizon']
+    origins = engine.rolling_origins(len(s), h, 6, min_train=h)
+    fns = {'naive': _forecast_naive, 'moving_average': _forecast_ma, 'ewm': _forecast_ewm}
+    for fold, origin in zip(bt['folds'], origins):
+        train, test = s.iloc[:origin], s.iloc[origin:origin + h]
+        assert fold['origin'] == train.index[-1].strftime('%Y-%m-%d')
+        for name, fn in fns.items():
+            pred = fn(train, h)
+            assert fold['mape'][name] == pytest.approx(_mape(test, pred), abs=1e-4)
+            assert fold['rmse'][name] == pytest.approx(_rmse(test, pred), abs=1e-4)
+    best = min(bt['aggregate'], key=lambda k: (bt['aggregate'][k]['mape'], bt['aggregate'][k]['rmse']))
+    assert res['best_method'] == best
+    assert res['mape'] == bt['aggregate'][best]['mape']
+
+
+def test_rolling_backtest_hundreds_of_folds():
+    s = _series(3 * 365)
+    res = evaluate_methods(s, horizon=7, backtest='rolling', folds=500)
+    assert len(res['backtest']['folds']) == 500
+    assert all(math.isfinite(v['mape']) for v in res['backtest']['aggregate'].values())
+
+
+def test_backtest_query_params_on_upload():
+    s = _series(60)
+    csv = pd.DataFrame({'date': s.index.strftime('%Y-%m-%d'), 'price': s.values}).to_csv(index=False)
+    client = TestClient(app)
+    r = client.post('/api/upload?backtest=rolling&folds=4', files={'file': ('p.csv', io.BytesIO(csv.encode()), 'text/csv')})
+    assert r.status_code == 200
+    assert len(r.json()['backtest']['folds']) == 4
+    r = client.post('/api/upload?backtest=rolling&folds=900', files={'file': ('p.csv', io.BytesIO(csv.encode()), 'text/csv')})
+    assert r.status_code == 400
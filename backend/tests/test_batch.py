@@ -0,0 +1,57 @@
+import sys
+import pathlib
+
+# ensure project root is on sys.path so `backend` package can be imported when running pytest
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+
+import time
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.cache import SeriesCache
+
+
+class SlowTicker:
+    delay = 0.3
+
+    def __init__(self, sym):
+        self.sym = sym
+
+    def history(self, **kwargs):
+        time.sleep(self.delay)
+        if self.sym == 'EMPTY':
+            return pd.DataFrame()
+        idx = pd.date_range('2025-01-01', periods=40, name='Date')
+        return pd.DataFrame({'Close': [70.0 + (i % 5) for i in range(40)]}, index=idx)
+
+
+def test_batch_runs_concurrently_with_per_item_errors(monkeypatch):
+    monkeypatch.setattr(main.yf, 'Ticker', SlowTicker)
+    monkeypatch.setattr(main, '_series_cache', SeriesCache(ttl=300, max_entries=32))
+    client = TestClient(main.app)
+    items = [{'source': 'yahoo', 'symbol': sym, 'period': '3mo', 'horizon': 3} for sym in ('CL=F', 'BZ=F', 'NG=F', 'XOM', 'EMPTY')]
+    items.append({'source': 'eia', 'symbol': 'CL=F'})
+    items.append({'source': 'yahoo', 'symbol': 'CL=F', 'period': '3mo', 'horizon': 3, 'method': 'bogus'})
+
+    t0 = time.perf_counter()
+    r = client.post('/api/forecast/batch', json={'items': items})
+    elapsed = time.perf_counter() - t0
+
+    assert r.status_code == 200
+    results = r.json()['results']
+    assert len(results) == 7
+    assert len(results['yahoo:CL=F:3mo:auto:3']['series']) == 3
+    assert results['yahoo:BZ=F:3mo:auto:3']['best_method'] in ('naive', 'moving_average', 'ewm')
+    assert results['yahoo:EMPTY:3mo:auto:3']['error']['status'] == 404
+    assert results['eia:CL=F:1y:auto:7']['error']['status'] == 400
+    assert results['yahoo:CL=F:3mo:bogus:3']['error']['status'] == 400
+    # five 0.3s downloads in parallel, not back to back
+    assert elapsed < 5 * SlowTicker.delay
+
+
+def test_batch_requires_items():
+    client = TestClient(main.app)
+    r = client.post('/api/forecast/batch', json={'items': []})
+    assert r.status_code == 422
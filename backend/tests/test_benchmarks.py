@@ -0,0 +1,42 @@
+import sys
+import pathlib
+
+# ensure project root is on sys.path so `backend` package can be imported when running pytest
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+
+import json
+
+from backend.benchmarks import run as bench
+
+
+def test_benchmark_suite_smoke(tmp_path):
+    out = tmp_path / 'bench.json'
+    assert bench.main(['--sizes', '100', '--repeat', '1', '--output', str(out)]) == 0
+    doc = json.loads(out.read_text())
+    assert 'evaluate_methods[n=100]' in doc['results']
+    assert 'api_online_eia[cold]' in doc['results']
+    assert all(r['median'] > 0 for r in doc['results'].values())
+
+
+def test_full_preset_reaches_ten_million_points(tmp_path, monkeypatch):
+    seen = []
+    monkeypatch.setattr(bench, 'run', lambda sizes, **kw: seen.append(sizes) or {'results': {}})
+    out = str(tmp_path / 'bench.json')
+    bench.main(['--output', out])
+    bench.main(['--full', '--output', out])
+    bench.main(['--full', '--sizes', '100', '--output', out])
+    assert seen == [bench.DEFAULT_SIZES, bench.FULL_SIZES, [100]]
+    assert bench.FULL_SIZES[0] == 100 and bench.FULL_SIZES[-1] == 10_000_000
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = {'results': {'a': {'median': 1.0}, 'b': {'median': 1.0}, 'gone': {'median': 1.0}}}
+    current = {'results': {'a': {'median': 1.2}, 'b': {'median': 1.5}, 'new': {'median': 9.0}}}
+    rows = {r['case']: r for r in bench.compare(current, baseline, threshold=0.25)}
+    assert set(rows) == {'a', 'b'}
+    assert not rows['a']['regression']
+    assert rows['b']['regression']
+
+
+def test_synthetic_series_is_reproducible():
+    assert bench.synthetic_series(500).equals(bench.synthetic_series(500))
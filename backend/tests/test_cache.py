@@ -0,0 +1,114 @@
+import sys
+import pathlib
+
+# ensure project root is on sys.path so `backend` package can be imported when running pytest
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.cache import SeriesCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _series(start, periods, first=100.0):
+    idx = pd.date_range(start, periods=periods)
+    return pd.Series([first + i for i in range(periods)], index=idx, dtype=float)
+
+
+def test_cache_hit_then_incremental_refresh():
+    clock = FakeClock()
+    cache = SeriesCache(ttl=10, max_entries=4, clock=clock)
+    calls = {'full': 0, 'since': []}
+
+    def fetch_full():
+        calls['full'] += 1
+        return _series('2025-01-01', 20)
+
+    def fetch_since(last):
+        calls['since'].append(last)
+        # the overlapping row replaces the cached one
+        return _series(last, 3, first=500.0)
+
+    s1 = cache.get_or_fetch('k', fetch_full, fetch_since)
+    s2 = cache.get_or_fetch('k', fetch_full, fetch_since)
+    assert s1 is s2
+    assert calls['full'] == 1
+
+    clock.now = 11
+    s3 = cache.get_or_fetch('k', fetch_full, fetch_since)
+    assert calls['full'] == 1
+    assert calls['since'] == [pd.Timestamp('2025-01-20')]
+    assert len(s3) == 22
+    assert s3.index.is_monotonic_increasing
+    assert s3['2025-01-20'] == 500.0 and s3.iloc[-1] == 502.0
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+    assert cache.stats()['refreshes'] == 1
+
+
+def test_refresh_corrects_partial_last_bar():
+    clock = FakeClock()
+    cache = SeriesCache(ttl=10, clock=clock)
+    closes = {'2025-01-03': 69.0}  # session still open: partial close
+
+    def fetch_since(last):
+        idx = pd.DatetimeIndex(sorted(d for d in closes if pd.Timestamp(d) >= last))
+        return pd.Series([closes[d] for d in idx.strftime('%Y-%m-%d')], index=idx)
+
+    full = pd.Series([70.0, 71.0, 69.0], index=pd.date_range('2025-01-01', periods=3))
+    assert cache.get_or_fetch('k', lambda: full, fetch_since).iloc[-1] == 69.0
+
+    closes['2025-01-03'] = 99.0  # final close
+    clock.now = 11
+    s = cache.get_or_fetch('k', lambda: full, fetch_since)
+    assert s.tolist() == [70.0, 71.0, 99.0]
+
+    closes['2025-01-06'] = 101.0
+    clock.now = 22
+    s = cache.get_or_fetch('k', lambda: full, fetch_since)
+    assert s.tolist() == [70.0, 71.0, 99.0, 101.0]
+    assert not s.index.has_duplicates
+
+
+def test_cache_evicts_least_recently_used():
+    cache = SeriesCache(ttl=10, max_entries=2, clock=FakeClock())
+    for key in ('a', 'b'):
+        cache.get_or_fetch(key, lambda: _series('2025-01-01', 10), lambda last: None)
+    cache.get_or_fetch('a', lambda: _series('2025-01-01', 10), lambda last: None)
+    cache.get_or_fetch('c', lambda: _series('2025-01-01', 10), lambda last: None)
+    assert cache.stats()['evictions'] == 1
+    # 'b' was the least recently used and must be fetched again
+    cache.get_or_fetch('b', lambda: _series('2025-01-01', 10), lambda last: None)
+    assert cache.stats()['misses'] == 4
+
+
+def test_online_uses_cache(monkeypatch):
+    downloads = []
+
+    class FakeTicker:
+        def __init__(self, sym):
+            self.sym = sym
+
+        def history(self, **kwargs):
+            downloads.append(kwargs)
+            idx = pd.date_range('2025-01-01', periods=30, name='Date')
+            return pd.DataFrame({'Close': [50.0 + i for i in range(30)]}, index=idx)
+
+    monkeypatch.setattr(main.yf, 'Ticker', FakeTicker)
+    monkeypatch.setattr(main, '_series_cache', SeriesCache(ttl=300, max_entries=8))
+    client = TestClient(main.app)
+    for _ in range(3):
+        r = client.get('/api/online?source=yahoo&symbol=brent&period=1mo')
+        assert r.status_code == 200
+    assert downloads == [{'period': '1mo'}]
+    stats = client.get('/api/cache_stats').json()
+    assert stats['hits'] == 2 and stats['misses'] == 1
@@ -25,7 +25,7 @@ class DummyResp:
 
 def test_load_from_eia_success(monkeypatch):
     js = {'response': {'data': [{'period': '2025-12-01', 'value': '50'}]}}
-    monkeypatch.setattr('requests.get', lambda *a, **k: DummyResp(js=js))
+    monkeypatch.setattr('requests.Session.get', lambda *a, **k: DummyResp(js=js))
     df = load_from_eia('PET.RWTC.D', token='KEY')
     assert not df.empty
     assert 'date' in df.columns and 'price' in df.columns
@@ -34,7 +34,7 @@ def test_load_from_eia_success(monkeypatch):
 
 def test_load_from_eia_no_data(monkeypatch):
     js = {}
-    monkeypatch.setattr('requests.get', lambda *a, **k: DummyResp(js=js))
+    monkeypatch.setattr('requests.Session.get', lambda *a, **k: DummyResp(js=js))
     with pytest.raises(ValueError) as e:
         load_from_eia('PET.RWTC.D', token='KEY')
     assert 'No data returned' in str(e.value)
@@ -42,7 +42,7 @@ def test_load_from_eia_no_data(monkeypatch):
 
 def test_load_from_eia_http_error(monkeypatch):
     js = {'error': 'invalid key'}
-    monkeypatch.setattr('requests.get', lambda *a, **k: DummyResp(js=js, status_ok=False, text='invalid'))
+    monkeypatch.setattr('requests.Session.get', lambda *a, **k: DummyResp(js=js, status_ok=False, text='invalid'))
     with pytest.raises(requests.HTTPError):
         load_from_eia('PET.RWTC.D', token='KEY')
 
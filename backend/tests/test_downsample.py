@@ -0,0 +1,140 @@
+import sys
+import pathlib
+
+# ensure project root is on sys.path so `backend` package can be imported when running pytest
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.downsample import history, lttb, resample_buckets
+from backend.memo import ResultCache
+
+
+def _series(n=400, seed=5):
+    rng = np.random.default_rng(seed)
+    return pd.Series(60 + rng.normal(size=n).cumsum(), index=pd.date_range('2023-12-20', periods=n))
+
+
+@pytest.mark.parametrize('rule,pandas_rule', [('W', 'W'), ('M', 'ME')])
+def test_resample_matches_pandas(rule, pandas_rule):
+    s = _series()
+    values = s.to_numpy()
+    ref = s.resample(pandas_rule)
+
+    dates, cols = resample_buckets(s.index, values, rule, 'mean')
+    expected = ref.mean()
+    assert list(pd.DatetimeIndex(dates).date) == list(expected.index.date)
+    np.testing.assert_allclose(cols['value'], expected.to_numpy())
+
+    _, cols = resample_buckets(s.index, values, rule, 'last')
+    np.testing.assert_allclose(cols['value'], ref.last().to_numpy())
+
+    _, cols = resample_buckets(s.index, values, rule, 'ohlc')
+    ohlc = ref.ohlc()
+    for name in ('open', 'high', 'low', 'close'):
+        np.testing.assert_allclose(cols[name], ohlc[name].to_numpy())
+
+
+def test_resample_skips_empty_periods():
+    s = pd.Series([1.0, 2.0, 3.0], index=pd.to_datetime(['2024-01-02', '2024-01-03', '2024-03-05']))
+    dates, cols = resample_buckets(s.index, s.to_numpy(), 'M', 'mean')
+    assert np.datetime_as_string(dates).tolist() == ['2024-01-31', '2024-03-31']
+    assert cols['value'].tolist() == [1.5, 3.0]
+
+
+def _lttb_reference(x, y, n_out):
+    """LTTB escrito punto a punto, como en la descripción original del algoritmo."""
+    n = len(y)
+    every = (n - 2) / (n_out - 2)
+    out, a = [0], 0
+    for i in range(n_out - 2):
+        lo, hi = int(np.floor(i * every)) + 1, int(np.floor((i + 1) * every)) + 1
+        nlo, nhi = hi, min(int(np.floor((i + 2) * every)) + 1, n - 1)
+        if i == n_out - 3:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+        else:
+            avg_x, avg_y = np.mean(x[nlo:nhi]), np.mean(y[nlo:nhi])
+        best, best_area = lo, -1.0
+        for j in range(lo, hi):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        out.append(best)
+        a = best
+    out.append(n - 1)
+    return out
+
+
+@pytest.mark.parametrize('n,n_out', [(1000, 50), (997, 100), (50, 49), (10, 3)])
+def test_lttb_matches_reference(n, n_out):
+    rng = np.random.default_rng(n)
+    x = np.arange(n, dtype=float)
+    y = rng.normal(size=n).cumsum()
+    assert lttb(x, y, n_out).tolist() == _lttb_reference(x, y, n_out)
+
+
+def test_lttb_keeps_extremes_and_short_series():
+    y = np.zeros(1000)
+    y[321], y[777] = 50.0, -50.0
+    keep = lttb(np.arange(1000), y, 20)
+    assert len(keep) == 20 and {0, 321, 777, 999} <= set(keep.tolist())
+    assert lttb(np.arange(5), np.arange(5.0), 10).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_history_layouts():
+    s = _series(100)
+    records = history(s, resample='W', agg='ohlc', max_points=5)
+    assert len(records) == 5
+    assert set(records[0]) == {'date', 'open', 'high', 'low', 'close'}
+    assert records[0]['date'] == '2023-12-24'
+    columnar = history(s, max_points=10, layout='columnar')
+    assert list(columnar) == ['date', 'value']
+    assert columnar['date'][0] == '2023-12-20' and columnar['date'][-1] == '2024-03-28'
+    assert columnar['value'][-1] == s.iloc[-1]
+
+
+def test_online_returns_downsampled_history(monkeypatch):
+    class FakeTicker:
+        def __init__(self, sym):
+            pass
+
+        def history(self, **kwargs):
+            idx = pd.date_range('2024-01-01', periods=300, name='Date')
+            return pd.DataFrame({'Close': np.linspace(70, 80, 300)}, index=idx)
+
+    monkeypatch.setattr(main.yf, 'Ticker', FakeTicker)
+    monkeypatch.setattr(main, '_result_cache', ResultCache())
+    client = TestClient(main.app)
+    base = '/api/online?source=yahoo&symbol=CL=F&period=1y&horizon=3'
+
+    plain = client.get(base)
+    assert 'history' not in plain.json()
+    r = client.get(base + '&resample=M&agg=last&max_points=5')
+    body = r.json()
+    dates = [row['date'] for row in body['history']]
+    assert len(dates) == 5
+    assert dates[0] == '2024-01-31' and dates[-1] == '2024-10-31'
+    assert body['history'][-1]['value'] == 80.0
+    assert body['series'] == plain.json()['series']
+    assert r.headers['etag'] != plain.headers['etag']
+    col = client.get(base + '&max_points=20&format=columnar').json()
+    assert len(col['history']['date']) == 20
+    assert client.get(base + '&resample=Q').status_code == 422
+    assert client.get(base + '&max_points=20&incremental=true').json()['history'][-1]['date'] == '2024-10-26'
+
+
+def test_history_is_refused_for_panels():
+    csv = pd.DataFrame({
+        'series_id': ['A'] * 10 + ['B'] * 10,
+        'date': list(pd.date_range('2024-01-01', periods=10).strftime('%Y-%m-%d')) * 2,
+        'price': np.arange(20.0) + 1,
+    }).to_csv(index=False).encode()
+    client = TestClient(main.app)
+    r = client.post('/api/upload?max_points=5', files={'file': ('p.csv', io.BytesIO(csv), 'text/csv')})
+    assert r.status_code == 400
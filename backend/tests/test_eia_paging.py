@@ -0,0 +1,88 @@
+import sys
+import pathlib
+
+# ensure project root is on sys.path so `backend` package can be imported when running pytest
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend import data_sources
+from backend.http_client import PooledClient, SingleFlight
+
+
+class PagedEIA:
+    """Stand-in for EIA v2 that caps page size and honours offset/start/end."""
+
+    def __init__(self, n=2345, cap=500):
+        dates = pd.date_range('2015-01-01', periods=n)
+        self.rows = [{'period': d.strftime('%Y-%m-%d'), 'value': str(50 + i * 0.01)} for i, d in enumerate(dates)]
+        self.cap = cap
+        self.queries = []
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                q = {k: v[0] for k, v in parse_qs(urlsplit(self.path).query).items()}
+                stand_in.queries.append(q)
+                rows = [r for r in stand_in.rows
+                        if r['period'] >= q.get('start', '') and (not q.get('end') or r['period'] <= q['end'])]
+                offset = int(q.get('offset', 0))
+                length = min(int(q.get('length', stand_in.cap)), stand_in.cap)
+                body = json.dumps({'response': {'total': str(len(rows)), 'data': rows[offset:offset + length]}}).encode()
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/v2'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def paged(monkeypatch):
+    server = PagedEIA()
+    monkeypatch.setattr(data_sources, 'EIA_BASE_URL', server.url)
+    monkeypatch.setattr(data_sources, '_http', PooledClient(backoff=0.01))
+    monkeypatch.setattr(data_sources, '_eia_flight', SingleFlight())
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+
+def test_all_pages_are_fetched(paged):
+    df = data_sources.load_from_eia('PET.RWTC.D', token='KEY')
+    assert len(df) == 2345
+    assert df['date'].is_monotonic_increasing
+    assert df['price'].iloc[-1] == pytest.approx(50 + 2344 * 0.01)
+    assert sorted(int(q['offset']) for q in paged.queries) == [0, 500, 1000, 1500, 2000]
+    assert np.array_equal(np.diff(df['date'].to_numpy()), np.full(2344, np.timedelta64(1, 'D')))
+
+
+def test_start_end_filters_are_forwarded(paged):
+    df = data_sources.load_from_eia('PET.RWTC.D', token='KEY', start='2020-06-01', end='2020-06-10')
+    assert len(df) == 10
+    assert all(q.get('start') == '2020-06-01' for q in paged.queries)
+
+
+def test_empty_incremental_range_returns_empty_frame(paged):
+    df = data_sources.load_from_eia('PET.RWTC.D', token='KEY', start='2030-01-01')
+    assert df.empty
+    assert list(df.columns) == ['date', 'price']
+
+
+def test_eia_period_matches_series_frequency():
+    ts = pd.Timestamp('2025-05-17')
+    assert data_sources.eia_period(ts, 'PET.RWTC.D') == '2025-05-17'
+    assert data_sources.eia_period(ts, 'NG.RNGWHHD.M') == '2025-05'
+    assert data_sources.eia_period(ts, 'X.Y.A') == '2025'
@@ -0,0 +1,58 @@
+import sys
+import pathlib
+
+# ensure project root is on sys.path so `backend` package can be imported when running pytest
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend import engine
+from backend.main import (
+    _forecast_ewm, _forecast_ma, _forecast_naive, _mape, _rmse, _split_train_test, evaluate_methods,
+)
+
+
+def _reference(s, horizon, method=None):
+    """Original pandas implementation of `evaluate_methods`."""
+    train, test = _split_train_test(s, test_size=min(14, len(s) // 4))
+    methods = {'naive': _forecast_naive, 'moving_average': _forecast_ma, 'ewm': _forecast_ewm}
+    results = {}
+    for name, fn in methods.items():
+        pred = fn(train, len(test))
+        results[name] = (_mape(test, pred), _rmse(test, pred))
+    name = method or min(results, key=lambda k: results[k])
+    future = methods[name](pd.concat([train, test]), horizon)
+    return name, results[name], future
+
+
+@pytest.mark.parametrize('n', [8, 9, 30, 57, 400])
+def test_evaluate_methods_matches_pandas_reference(n):
+    rng = np.random.default_rng(n)
+    idx = pd.date_range('2024-01-01', periods=n)
+    s = pd.Series(60 + rng.normal(0, 2, n).cumsum(), index=idx)
+    for method in (None, 'naive', 'moving_average', 'ewm'):
+        res = evaluate_methods(s, horizon=4, method=method)
+        name, (mape, rmse), future = _reference(s, 4, method)
+        assert res['best_method'] == name
+        assert res['mape'] == round(mape, 4)
+        assert res['rmse'] == round(rmse, 4)
+        assert [p['forecast'] for p in res['series']] == pytest.approx(list(future), rel=1e-12)
+
+
+def test_ewm_levels_match_pandas_for_all_origins():
+    rng = np.random.default_rng(0)
+    y = rng.normal(100, 5, 600)
+    ends = np.arange(1, 601)
+    alphas = [0.05, 0.2, 0.9, 1.0]
+    levels = engine.ewm_levels(y, ends, alphas)
+    for i, a in enumerate(alphas):
+        expected = pd.Series(y).ewm(alpha=a).mean().to_numpy()
+        assert np.allclose(levels[i], expected, rtol=1e-12)
+
+
+def test_ma_levels_clip_window_to_available_history():
+    y = np.arange(1.0, 11.0)
+    levels = engine.ma_levels(y, [3, 10], [7])
+    assert levels.tolist() == [[2.0, 7.0]]
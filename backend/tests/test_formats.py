@@ -0,0 +1,98 @@
+import sys
+import pathlib
+
+# ensure project root is on sys.path so `backend` package can be imported when running pytest
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from backend import formats, main
+from backend.memo import ResultCache
+
+
+def _series(n=60):
+    return pd.Series(np.linspace(10, 20, n), index=pd.date_range('2024-01-01', periods=n))
+
+
+@pytest.fixture
+def post(monkeypatch):
+    monkeypatch.setattr(main, '_result_cache', ResultCache())
+    s = _series()
+    csv = pd.DataFrame({'date': s.index, 'price': s.values}).to_csv(index=False).encode()
+    client = TestClient(main.app)
+
+    def _post(query='', headers=None):
+        return client.post(f'/api/upload?horizon=5{query}', files={'file': ('p.csv', io.BytesIO(csv), 'text/csv')},
+                           headers=headers)
+
+    return _post
+
+
+def test_default_response_keeps_record_series(post):
+    r = post()
+    assert r.status_code == 200
+    assert r.headers['content-type'] == 'application/json'
+    assert 'Accept' in r.headers['vary']
+    series = r.json()['series']
+    assert [row['date'] for row in series] == ['2024-03-01', '2024-03-02', '2024-03-03', '2024-03-04', '2024-03-05']
+
+
+def test_columnar_matches_records(post):
+    records = post().json()
+    r = post('&format=columnar')
+    assert r.status_code == 200
+    assert r.headers['content-type'] == formats.MEDIA_TYPES['columnar']
+    col = r.json()
+    assert col['series'] == {'start': '2024-03-01', 'freq': 'D',
+                             'forecast': [row['forecast'] for row in records['series']]}
+    assert {k: v for k, v in col.items() if k != 'series'} == {k: v for k, v in records.items() if k != 'series'}
+    assert r.headers['etag'] != post().headers['etag']
+
+
+def test_accept_header_negotiates_columnar(post):
+    r = post(headers={'Accept': 'application/x-msgpack;q=0.9, application/vnd.forecast.columnar+json'})
+    assert r.headers['content-type'] == formats.MEDIA_TYPES['columnar']
+    assert post(headers={'Accept': 'text/html, */*'}).headers['content-type'] == 'application/json'
+
+
+def test_orjson_encoder_gives_same_document(post, monkeypatch):
+    pytest.importorskip('orjson')
+    plain = post('&format=columnar').json()
+    main._result_cache.clear()
+    monkeypatch.setenv('JSON_ENCODER', 'orjson')
+    assert post('&format=columnar').json() == plain
+
+
+def test_missing_binary_dependency_is_406(monkeypatch):
+    monkeypatch.setattr(formats, '_optional', lambda name: None)
+    with pytest.raises(HTTPException) as exc:
+        formats.negotiate('arrow', None)
+    assert exc.value.status_code == 406
+    # with Accept the unavailable format is skipped instead
+    assert formats.negotiate(None, 'application/vnd.apache.arrow.stream, application/json;q=0.5') == 'json'
+
+
+def test_msgpack_roundtrip(post):
+    msgpack = pytest.importorskip('msgpack')
+    r = post('&format=msgpack')
+    assert r.headers['content-type'] == 'application/x-msgpack'
+    doc = msgpack.unpackb(r.content)
+    assert doc['series']['start'] == '2024-03-01'
+    assert len(doc['series']['forecast']) == 5
+
+
+def test_arrow_roundtrip(post):
+    pa = pytest.importorskip('pyarrow')
+    r = post('&format=arrow')
+    table = pa.ipc.open_stream(r.content).read_all()
+    assert table.column('date').to_pylist()[0].isoformat() == '2024-03-01'
+    assert table.num_rows == 5
+    meta = json.loads(table.schema.metadata[b'forecast'])
+    assert meta['best_method'] in ('naive', 'moving_average', 'ewm')
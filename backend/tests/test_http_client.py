@@ -0,0 +1,119 @@
+import sys
+import pathlib
+
+# ensure project root is on sys.path so `backend` package can be imported when running pytest
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from backend import data_sources
+from backend.http_client import PooledClient, SingleFlight
+
+
+class StandInEIA:
+    """Local stand-in for the EIA v2 API running on a random port."""
+
+    def __init__(self, delay=0.0, failures=0, status=503):
+        self.requests = []
+        self.delay = delay
+        self.failures = failures
+        self.status = status
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stand_in.requests.append(self.path)
+                time.sleep(stand_in.delay)
+                if stand_in.failures > 0:
+                    stand_in.failures -= 1
+                    self.send_response(stand_in.status)
+                    self.end_headers()
+                    return
+                body = json.dumps({'response': {'data': [
+                    {'period': '2025-01-02', 'value': '71.5'},
+                    {'period': '2025-01-01', 'value': '70.0'},
+                ]}}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/v2'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stand_in(monkeypatch):
+    servers = []
+
+    def make(**kwargs):
+        server = StandInEIA(**kwargs)
+        servers.append(server)
+        monkeypatch.setattr(data_sources, 'EIA_BASE_URL', server.url)
+        monkeypatch.setattr(data_sources, '_http', PooledClient(backoff=0.01, max_backoff=0.05))
+        monkeypatch.setattr(data_sources, '_eia_flight', SingleFlight())
+        return server
+
+    yield make
+    for server in servers:
+        server.close()
+
+
+def test_concurrent_requests_for_same_series_are_coalesced(stand_in):
+    server = stand_in(delay=0.3)
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        frames = list(pool.map(lambda _: data_sources.load_from_eia('PET.RWTC.D', token='KEY'), range(12)))
+    assert len(server.requests) == 1
+    assert all(list(df['price']) == [70.0, 71.5] for df in frames)
+    # every caller gets its own copy
+    assert len({id(df) for df in frames}) == 12
+
+
+def test_retries_on_5xx_then_succeeds(stand_in):
+    server = stand_in(failures=2)
+    df = data_sources.load_from_eia('PET.RWTC.D', token='KEY')
+    assert len(server.requests) == 3
+    assert len(df) == 2
+
+
+def test_gives_up_after_retries(stand_in):
+    server = stand_in(failures=10, status=429)
+    with pytest.raises(Exception):
+        data_sources.load_from_eia('PET.RWTC.D', token='KEY')
+    assert len(server.requests) == 4
+
+
+def test_per_host_limit_bounds_concurrency():
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    class Session:
+        def get(self, *a, **k):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+            return type('Resp', (), {'status_code': 200})()
+
+    client = PooledClient(per_host_limit=2)
+    client.session = Session()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: client.get(f'http://example.test/{i}'), range(8)))
+    assert peak[0] == 2
@@ -0,0 +1,31 @@
+import sys
+import pathlib
+
+# ensure project root is on sys.path so `backend` package can be imported when running pytest
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'scripts'))
+
+import json
+import subprocess
+
+from check_import_time import LAZY_MODULES
+
+from backend.lazy import lazy_module
+
+
+def test_backend_import_is_lazy():
+    # el presupuesto en milisegundos se comprueba aparte con scripts/check_import_time.py
+    code = ('import json, sys; import backend.main; '
+            f'print(json.dumps(sorted(m for m in {LAZY_MODULES!r} if m in sys.modules)))')
+    proc = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, timeout=60)
+    assert proc.returncode == 0, proc.stderr
+    eager = json.loads(proc.stdout.strip().splitlines()[-1])
+    assert eager == [], f'imported eagerly at startup: {eager}'
+
+
+def test_lazy_module_loads_on_first_attribute():
+    mod = lazy_module('colorsys')
+    assert 'not loaded' in repr(mod)
+    assert mod.rgb_to_hsv(1, 0, 0)[0] == 0
+    assert 'loaded' in repr(mod) and 'not loaded' not in repr(mod)
@@ -0,0 +1,177 @@
+import sys
+import pathlib
+
+# ensure project root is on sys.path so `backend` package can be imported when running pytest
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.cache import SeriesCache
+from backend.incremental import ModelRegistry, ModelState
+from backend.store import SeriesStore
+
+
+def _series(n=120, seed=3):
+    rng = np.random.default_rng(seed)
+    return pd.Series(50 + rng.normal(size=n).cumsum(), index=pd.date_range('2024-01-01', periods=n))
+
+
+def _one_step_metrics(s, window, alpha):
+    """Referencia lenta: errores a un paso recalculando cada método desde cero."""
+    errs = {name: [] for name in ('naive', 'moving_average', 'ewm')}
+    for t in range(1, len(s)):
+        train, actual = s.iloc[:t], s.iloc[t]
+        preds = {
+            'naive': main._forecast_naive(train, 1).iloc[0],
+            'moving_average': main._forecast_ma(train, 1, window=window).iloc[0],
+            'ewm': main._forecast_ewm(train, 1, alpha=alpha).iloc[0],
+        }
+        for name, pred in preds.items():
+            errs[name].append((actual - pred, actual))
+    out = {}
+    for name, pairs in errs.items():
+        e = np.array([p[0] for p in pairs])
+        a = np.array([p[1] for p in pairs])
+        out[name] = (np.mean(np.abs(e / a)) * 100, np.sqrt(np.mean(e ** 2)))
+    return out
+
+
+@pytest.mark.parametrize('window,alpha', [(7, 0.2), (30, 0.05), (3, 1.0)])
+def test_incremental_updates_match_full_refit(window, alpha):
+    s = _series()
+    state = ModelState.fit(s.iloc[:40], window=window, alpha=alpha)
+    for start in range(40, len(s), 9):
+        state.update(s.iloc[:start + 9])  # full history each time; only new rows are applied
+
+    full = ModelState.fit(s, window=window, alpha=alpha)
+    np.testing.assert_allclose(state.levels(), full.levels(), rtol=1e-10)
+    np.testing.assert_allclose(state.levels(), [
+        main._forecast_naive(s, 1).iloc[0],
+        main._forecast_ma(s, 1, window=window).iloc[0],
+        main._forecast_ewm(s, 1, alpha=alpha).iloc[0],
+    ], rtol=1e-10)
+
+    reference = _one_step_metrics(s, window, alpha)
+    metrics = state.forecast(horizon=3)['online']['metrics']
+    for name, (mape, rmse) in reference.items():
+        assert metrics[name]['mape'] == pytest.approx(mape, abs=1e-4)
+        assert metrics[name]['rmse'] == pytest.approx(rmse, abs=1e-4)
+
+
+def test_fit_is_linear_for_small_alpha(monkeypatch):
+    # a truncated EWM window for alpha=0.001 spans ~39k lags; fitting must not build it
+    monkeypatch.setattr('backend.engine.ewm_levels', lambda *a, **k: pytest.fail('O(n*K) EWM levels'))
+    s = _series(200_000)
+    state = ModelState.fit(s, alpha=0.001)
+    assert state.scored == len(s) - 1
+    np.testing.assert_allclose(state.levels()[2], main._forecast_ewm(s, 1, alpha=0.001).iloc[0], rtol=1e-10)
+    ewm = s.ewm(alpha=0.001).mean().to_numpy()
+    err = s.to_numpy()[1:] - ewm[:-1]
+    expected = np.sqrt(np.mean(err ** 2))
+    assert state.forecast(horizon=1)['online']['metrics']['ewm']['rmse'] == pytest.approx(expected, abs=1e-4)
+
+
+def test_update_ignores_known_dates_and_nans():
+    s = _series(30)
+    state = ModelState.fit(s)
+    assert state.update(s) == 0
+    extra = pd.Series([np.nan, 60.0], index=pd.date_range('2024-01-31', periods=2))
+    assert state.update(extra) == 1
+    assert state.last == 60.0
+    assert state.last_date == pd.Timestamp('2024-02-01')
+    assert state.n == 31
+
+
+def test_registry_evicts_least_recently_used():
+    reg = ModelRegistry(max_entries=2)
+    for sid in ('a', 'b', 'c'):
+        reg.get_or_fit((sid, 7, 0.2), lambda: _series(20), 7, 0.2)
+    assert reg.get(('a', 7, 0.2)) is None
+    assert reg.get_or_fit(('z', 7, 0.2), lambda: None, 7, 0.2) is None
+    assert reg.stats()['entries'] == 2
+
+
+def test_push_observations_endpoint(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, '_models', ModelRegistry())
+    monkeypatch.setattr(main, '_series_store', SeriesStore(tmp_path))
+    client = TestClient(main.app)
+    s = _series(60)
+    obs = [{'date': d.strftime('%Y-%m-%d'), 'price': float(v)} for d, v in s.items()]
+
+    r = client.post('/api/models/hub-1/observations?horizon=3', json={'observations': obs[:50]})
+    assert r.status_code == 200
+    assert r.json()['online']['observations'] == 50
+    assert r.json()['appended'] == 50
+    r = client.post('/api/models/hub-1/observations?horizon=3', json={'observations': obs[45:]})
+    body = r.json()
+    assert body['appended'] == 10
+    assert body['online']['observations'] == 60
+    assert body['online']['last_date'] == '2024-02-29'
+    assert [row['date'] for row in body['series']] == ['2024-03-01', '2024-03-02', '2024-03-03']
+    fresh = ModelState.fit(s).forecast(horizon=3)
+    assert body['series'] == fresh['series']
+    assert body['online']['metrics'] == fresh['online']['metrics']
+
+    # state is rebuilt from the stored history after it is dropped from memory
+    assert client.delete('/api/models/hub-1').json()['discarded'] == 1
+    again = client.get('/api/models/hub-1?horizon=3&method=ewm').json()
+    assert again['best_method'] == 'ewm'
+    assert again['online']['observations'] == 60
+    assert client.get('/api/models/unknown').status_code == 404
+    assert client.get('/api/models/hub-1?method=bogus').status_code == 400
+
+
+def test_online_incremental_only_processes_new_rows(monkeypatch):
+    rows = [60]
+
+    class GrowingTicker:
+        def __init__(self, sym):
+            pass
+
+        def history(self, **kwargs):
+            idx = pd.date_range('2025-01-01', periods=rows[0], name='Date')
+            frame = pd.DataFrame({'Close': np.linspace(70, 80, rows[0])}, index=idx)
+            if 'start' in kwargs:
+                frame = frame[frame.index >= pd.Timestamp(kwargs['start'])]
+            return frame
+
+    clock = [0.0]
+    monkeypatch.setattr(main.yf, 'Ticker', GrowingTicker)
+    monkeypatch.setattr(main, '_series_cache', SeriesCache(ttl=10, max_entries=8, clock=lambda: clock[0]))
+    monkeypatch.setattr(main, '_models', ModelRegistry())
+    client = TestClient(main.app)
+    url = '/api/online?source=yahoo&symbol=CL=F&period=1y&horizon=2&incremental=true'
+
+    first = client.get(url).json()
+    assert first['online']['observations'] == 60
+    rows[0], clock[0] = 63, 100.0
+    pushed = []
+    real_push = ModelState._push
+    monkeypatch.setattr(ModelState, '_push', lambda self, v: pushed.append(v) or real_push(self, v))
+    second = client.get(url).json()
+    assert len(pushed) == 3
+    assert second['online']['observations'] == 63
+    assert client.get(url + '&tune=true').status_code == 400
+
+    col = client.get(url + '&format=columnar')
+    assert col.headers['content-type'].startswith('application/vnd.forecast.columnar+json')
+    body = col.json()
+    assert body['series']['start'] == second['series'][0]['date']
+    assert body['series']['forecast'] == [row['forecast'] for row in second['series']]
+    assert body['online'] == second['online']
+
+
+def test_first_push_without_store_reports_the_whole_batch(monkeypatch):
+    monkeypatch.setattr(main, '_models', ModelRegistry())
+    monkeypatch.setattr(main, '_series_store', None)
+    client = TestClient(main.app)
+    obs = [{'date': d.strftime('%Y-%m-%d'), 'price': float(v)} for d, v in _series(20).items()]
+    first = client.post('/api/models/hub-2/observations', json={'observations': obs[:12]}).json()
+    assert first['appended'] == 12
+    again = client.post('/api/models/hub-2/observations', json={'observations': obs[:12]}).json()
+    assert again['appended'] == 0
+    assert client.post('/api/models/hub-2/observations', json={'observations': obs}).json()['appended'] == 8
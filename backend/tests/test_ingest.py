@@ -0,0 +1,95 @@
+import sys
+import pathlib
+
+# ensure project root is on sys.path so `backend` package can be imported when running pytest
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from backend.ingest import read_upload
+from backend.main import app
+
+
+def _csv(n=50, extra=True):
+    df = pd.DataFrame({
+        'Date': pd.date_range('2024-01-01', periods=n).strftime('%Y-%m-%d'),
+        'Close': np.linspace(10, 20, n),
+    })
+    if extra:
+        df['volume'] = 1
+        df['note'] = 'x'
+    return df.to_csv(index=False).encode()
+
+
+def test_csv_is_parsed_in_chunks_keeping_only_needed_columns():
+    df = read_upload(io.BytesIO(_csv(1000)), 'prices.csv', 'text/csv', chunk_rows=64)
+    assert list(df.columns) == ['date', 'price']
+    assert len(df) == 1000
+    assert df['price'].dtype == np.float64
+    assert df['date'].iloc[0] == pd.Timestamp('2024-01-01')
+
+
+def test_csv_drops_invalid_rows():
+    raw = b'date,price\n2024-01-01,1\n2024-01-02,\nnot-a-date,3\n2024-01-04,4\n'
+    df = read_upload(io.BytesIO(raw), 'p.csv', None, chunk_rows=2)
+    assert df['price'].tolist() == [1.0, 4.0]
+
+
+def test_limits_raise_413():
+    with pytest.raises(HTTPException) as e:
+        read_upload(io.BytesIO(_csv(100)), 'p.csv', 'text/csv', max_rows=99, chunk_rows=10)
+    assert e.value.status_code == 413
+    with pytest.raises(HTTPException) as e:
+        read_upload(io.BytesIO(_csv(100)), 'p.csv', 'text/csv', max_bytes=100)
+    assert e.value.status_code == 413
+
+
+def test_missing_columns_raise_400():
+    with pytest.raises(HTTPException) as e:
+        read_upload(io.BytesIO(b'when,value\n2024-01-01,1\n'), 'p.csv', 'text/csv')
+    assert e.value.status_code == 400
+
+
+def test_xlsx_is_streamed_with_openpyxl():
+    buf = io.BytesIO()
+    pd.DataFrame({'date': pd.date_range('2024-01-01', periods=30), 'price': np.arange(30.0)}).to_excel(buf, index=False)
+    buf.seek(0)
+    df = read_upload(buf, 'prices.xlsx', None, chunk_rows=7)
+    assert len(df) == 30
+    assert df['price'].iloc[-1] == 29.0
+
+
+def test_upload_endpoint_enforces_row_limit(monkeypatch):
+    client = TestClient(app)
+    r = client.post('/api/upload?horizon=3', files={'file': ('p.csv', io.BytesIO(_csv(40)), 'text/csv')})
+    assert r.status_code == 200
+    assert len(r.json()['series']) == 3
+
+    monkeypatch.setenv('UPLOAD_MAX_ROWS', '10')
+    r = client.post('/api/upload', files={'file': ('p.csv', io.BytesIO(_csv(40)), 'text/csv')})
+    assert r.status_code == 413
+
+
+def test_date_format_is_fixed_by_the_first_chunk():
+    # day 2 of months 1..4 written month-first; chunk 2 alone would look day-first
+    raw = b'date,price\n01/02/2024,1\n02/02/2024,2\n03/02/2024,3\n04/02/2024,4\n'
+    chunked = read_upload(io.BytesIO(raw), 'p.csv', 'text/csv', chunk_rows=2)
+    whole = read_upload(io.BytesIO(raw), 'p.csv', 'text/csv')
+    expected = pd.to_datetime(['2024-01-02', '2024-02-02', '2024-03-02', '2024-04-02'])
+    assert chunked['date'].tolist() == whole['date'].tolist() == list(expected)
+
+
+def test_oversized_request_is_rejected_before_reading_the_body(monkeypatch):
+    monkeypatch.setenv('UPLOAD_MAX_BYTES', '1000')
+    client = TestClient(app)
+    body = _csv(8000)
+    for path in ('/api/upload', '/api/jobs'):
+        r = client.post(path, files={'file': ('p.csv', io.BytesIO(body), 'text/csv')})
+        assert r.status_code == 413
+        assert r.json()['detail'] == 'File exceeds the maximum of 1000 bytes'
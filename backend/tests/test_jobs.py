@@ -0,0 +1,139 @@
+import sys
+import pathlib
+
+# ensure project root is on sys.path so `backend` package can be imported when running pytest
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+
+import asyncio
+import io
+import json
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.cache import SeriesCache
+from backend.jobs import Job, JobQueue, sse_events
+
+
+class GatedTicker:
+    """Ticker falso que bloquea `history` hasta que se abre `gate`."""
+    gate = threading.Event()
+
+    def __init__(self, sym):
+        self.sym = sym
+
+    def history(self, **kwargs):
+        assert self.gate.wait(5)
+        idx = pd.date_range('2025-01-01', periods=60, name='Date')
+        return pd.DataFrame({'Close': np.linspace(70, 80, 60)}, index=idx)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    GatedTicker.gate = threading.Event()
+    monkeypatch.setattr(main.yf, 'Ticker', GatedTicker)
+    monkeypatch.setattr(main, '_series_cache', SeriesCache(ttl=300, max_entries=32))
+    monkeypatch.setattr(main, '_job_queue', JobQueue(workers=1, max_pending=2))
+    yield TestClient(main.app)
+    GatedTicker.gate.set()
+    main._job_queue.shutdown()
+
+
+def test_sse_streams_wait_in_the_event_loop():
+    # more watchers than Starlette's 40-thread pool, all served by one loop thread
+    job = Job('j1', 'online')
+
+    async def watch():
+        return [chunk async for chunk in sse_events(job, heartbeat=0.05)]
+
+    async def run():
+        tasks = [asyncio.ensure_future(watch()) for _ in range(60)]
+        await asyncio.sleep(0.1)
+        worker = threading.Thread(target=lambda: (job.emit('fetch', 0.5, status='running'), job.finish({'ok': 1})))
+        worker.start()
+        out = await asyncio.wait_for(asyncio.gather(*tasks), 5)
+        worker.join()
+        return out
+
+    streams = asyncio.run(run())
+    for chunks in streams:
+        assert ': keep-alive\n\n' in chunks
+        events = [c.split('\n')[0] for c in chunks if c.startswith('event: ')]
+        assert events == ['event: queued', 'event: fetch', 'event: done']
+        assert json.loads(chunks[-1].split('data: ', 1)[1])['result'] == {'ok': 1}
+    assert job._waiters == []
+
+
+def _wait(client, job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        body = client.get(f'/api/jobs/{job_id}').json()
+        if body['status'] in ('done', 'failed', 'cancelled'):
+            return body
+        time.sleep(0.02)
+    raise AssertionError(f'job {job_id} did not finish')
+
+
+def test_job_runs_and_streams_progress(client):
+    r = client.post('/api/jobs', json={'source': 'yahoo', 'symbol': 'CL=F', 'period': '3mo', 'horizon': 4})
+    assert r.status_code == 202
+    job = r.json()
+    assert r.headers['location'] == f"/api/jobs/{job['id']}"
+    assert job['status'] in ('queued', 'running')
+    GatedTicker.gate.set()
+
+    with client.stream('GET', f"/api/jobs/{job['id']}/events") as stream:
+        text = ''.join(stream.iter_text())
+    stages = [line.split(': ', 1)[1] for line in text.splitlines() if line.startswith('event: ')]
+    assert stages[-3:] == ['fetch', 'evaluate', 'done']
+    final = json.loads(text.strip().splitlines()[-1].split(': ', 1)[1])
+    assert final['status'] == 'done'
+    assert len(final['result']['series']) == 4
+    assert client.get(f"/api/jobs/{job['id']}").json()['result'] == final['result']
+
+
+def test_queue_full_returns_429_and_cancel(client):
+    spec = {'source': 'yahoo', 'symbol': 'CL=F', 'period': '3mo'}
+    first = client.post('/api/jobs', json=spec).json()
+    second = client.post('/api/jobs', json={**spec, 'symbol': 'BZ=F'}).json()
+    r = client.post('/api/jobs', json={**spec, 'symbol': 'NG=F'})
+    assert r.status_code == 429
+    assert r.headers['retry-after'] == '5'
+
+    # the second job is still queued behind the first (one worker): cancelling drops it
+    cancelled = client.delete(f"/api/jobs/{second['id']}").json()
+    assert cancelled['status'] == 'cancelled'
+    GatedTicker.gate.set()
+    assert _wait(client, first['id'])['status'] == 'done'
+    assert _wait(client, second['id'])['stage'] == 'cancelled'
+    assert client.get('/api/jobs').json()['rejected'] == 1
+
+
+def test_upload_job_reports_errors_and_cleans_up(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(main.tempfile, 'tempdir', str(tmp_path))
+    s = pd.Series(np.linspace(1, 2, 40), index=pd.date_range('2024-01-01', periods=40))
+    csv = pd.DataFrame({'date': s.index, 'price': s.values}).to_csv(index=False).encode()
+    ok = client.post('/api/jobs?horizon=3', files={'file': ('p.csv', io.BytesIO(csv), 'text/csv')},
+                     data={'method': 'naive'})
+    bad = client.post('/api/jobs', files={'file': ('p.csv', io.BytesIO(b'when,price\n1,2\n'), 'text/csv')})
+    assert ok.status_code == bad.status_code == 202
+
+    done = _wait(client, ok.json()['id'])
+    assert done['result']['best_method'] == 'naive'
+    assert len(done['result']['series']) == 3
+    failed = _wait(client, bad.json()['id'])
+    assert failed['status'] == 'failed'
+    assert failed['error']['status'] == 400
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_job_validation_and_unknown_id(client):
+    assert client.post('/api/jobs', json={'source': 'bogus'}).status_code == 422
+    assert client.post('/api/jobs', json={'source': 'upload'}).status_code == 400
+    assert client.get('/api/jobs/nope').status_code == 404
+    assert client.delete('/api/jobs/nope').status_code == 404
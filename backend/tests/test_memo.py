@@ -0,0 +1,90 @@
+import sys
+import pathlib
+
+# ensure project root is on sys.path so `backend` package can be imported when running pytest
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+
+import io
+
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.memo import ResultCache, series_key
+
+
+def _series(n=40):
+    return pd.Series(np.linspace(1, 2, n), index=pd.date_range('2024-01-01', periods=n))
+
+
+def test_series_key_depends_on_values_index_and_params():
+    s = _series()
+    assert series_key(s, horizon=7) == series_key(s.copy(), horizon=7)
+    assert series_key(s, horizon=7) != series_key(s, horizon=8)
+    changed = s.copy()
+    changed.iloc[-1] += 1e-9
+    assert series_key(s, horizon=7) != series_key(changed, horizon=7)
+    shifted = pd.Series(s.values, index=s.index + pd.Timedelta(days=1))
+    assert series_key(s, horizon=7) != series_key(shifted, horizon=7)
+
+
+def test_result_cache_evicts_by_size():
+    cache = ResultCache(max_bytes=10)
+    cache.put('a', b'12345')
+    cache.put('b', b'12345')
+    cache.put('c', b'12345')
+    assert cache.get('a') is None
+    assert cache.get('c') == b'12345'
+    assert cache.stats()['evictions'] == 1
+
+
+def test_result_cache_is_shared_through_disk(tmp_path):
+    ResultCache(directory=tmp_path).put('k', b'{"x":1}')
+    other = ResultCache(directory=tmp_path)
+    assert other.get('k') == b'{"x":1}'
+    assert other.stats()['disk_hits'] == 1
+
+
+def test_disk_size_is_tracked_without_rescanning_on_every_write(tmp_path, monkeypatch):
+    cache = ResultCache(directory=tmp_path, disk_max_bytes=1000)
+    scans = []
+    real_prune = cache._prune_disk
+    monkeypatch.setattr(cache, '_prune_disk', lambda: scans.append(1) or real_prune())
+    for i in range(9):
+        cache.put(f'k{i}', b'x' * 100)
+    cache.put('k0', b'x' * 100)  # overwriting a file does not grow the directory
+    assert len(scans) == 1  # only the initial scan
+    assert cache.stats()['disk_bytes'] == 900
+
+    cache.put('k9', b'x' * 100)
+    cache.put('k10', b'x' * 100)
+    assert len(scans) == 2
+    total = sum(p.stat().st_size for p in tmp_path.glob('*.json'))
+    assert total <= 1000 and cache.stats()['disk_bytes'] == total
+
+
+def test_upload_memoizes_and_revalidates(monkeypatch):
+    monkeypatch.setattr(main, '_result_cache', ResultCache())
+    calls = []
+    real = main.evaluate_methods
+    monkeypatch.setattr(main, 'evaluate_methods', lambda *a, **k: calls.append(1) or real(*a, **k))
+    s = _series()
+    csv = pd.DataFrame({'date': s.index, 'price': s.values}).to_csv(index=False).encode()
+    client = TestClient(main.app)
+
+    def post(headers=None):
+        return client.post('/api/upload?horizon=5', files={'file': ('p.csv', io.BytesIO(csv), 'text/csv')}, headers=headers)
+
+    r1 = post()
+    r2 = post()
+    assert r1.status_code == r2.status_code == 200
+    assert r1.content == r2.content
+    assert len(calls) == 1
+    etag = r1.headers['etag']
+    assert r2.headers['etag'] == etag
+
+    r3 = post({'If-None-Match': etag})
+    assert r3.status_code == 304
+    assert r3.content == b''
+    assert len(calls) == 1
@@ -0,0 +1,103 @@
+import sys
+import pathlib
+
+# ensure project root is on sys.path so `backend` package can be imported when running pytest
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+
+import io
+
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from backend import formats, main
+from backend.ingest import read_upload
+from backend.memo import ResultCache
+
+
+def _long_csv(n_series=3, n=40, id_col='series_id', short=None):
+    rng = np.random.default_rng(7)
+    frames = []
+    for i in range(n_series):
+        m = 5 if short == i else n
+        frames.append(pd.DataFrame({
+            id_col: f'HUB{i}',
+            'date': pd.date_range('2024-01-01', periods=m).strftime('%Y-%m-%d'),
+            'price': 50 + rng.random(m).cumsum(),
+        }))
+    # interleave rows so grouping cannot rely on file order
+    return pd.concat(frames).sample(frac=1, random_state=1).to_csv(index=False).encode()
+
+
+def test_read_upload_keeps_ids_as_categorical():
+    df = read_upload(io.BytesIO(_long_csv(id_col='Symbol')), 'p.csv', 'text/csv', chunk_rows=16)
+    assert list(df.columns) == ['date', 'price', 'series_id']
+    assert isinstance(df['series_id'].dtype, pd.CategoricalDtype)
+    assert sorted(df['series_id'].cat.categories) == ['HUB0', 'HUB1', 'HUB2']
+    assert len(df) == 120
+
+
+def test_ids_that_stringify_alike_are_merged():
+    buf = io.BytesIO()
+    pd.DataFrame({
+        'series_id': [1, '1', 2, None, '2'],
+        'date': pd.date_range('2024-01-01', periods=5),
+        'price': [1.0, 2.0, 3.0, 4.0, 5.0],
+    }).to_excel(buf, index=False)
+    buf.seek(0)
+    df = read_upload(buf, 'p.xlsx', None)
+    assert sorted(df['series_id'].cat.categories) == ['1', '2']
+    assert df['series_id'].tolist() == ['1', '1', '2', '2']
+
+
+def test_ensure_series_builds_sorted_panel_matching_single_series():
+    df = read_upload(io.BytesIO(_long_csv()), 'p.csv', 'text/csv')
+    s = main._ensure_series(df)
+    assert s.index.names == ['series_id', 'date']
+    ids, bounds = main._panel_groups(s)
+    assert list(ids) == ['HUB0', 'HUB1', 'HUB2']
+    assert bounds.tolist() == [0, 40, 80, 120]
+
+    one = df[df['series_id'] == 'HUB1'][['date', 'price']].reset_index(drop=True)
+    single = main._ensure_series(one)
+    panel_part = s.loc['HUB1']
+    assert panel_part.index.equals(single.index)
+    np.testing.assert_array_equal(panel_part.to_numpy(), single.to_numpy())
+
+
+def test_upload_long_format_returns_one_result_per_series(monkeypatch):
+    monkeypatch.setattr(main, '_result_cache', ResultCache())
+    client = TestClient(main.app)
+    csv = _long_csv(short=2)
+    r = client.post('/api/upload?horizon=4', files={'file': ('p.csv', io.BytesIO(csv), 'text/csv')})
+    assert r.status_code == 200
+    results = r.json()['results']
+    assert list(results) == ['HUB0', 'HUB1', 'HUB2']
+    assert results['HUB2']['error']['status'] == 400
+
+    df = read_upload(io.BytesIO(csv), 'p.csv', 'text/csv')
+    alone = df[df['series_id'] == 'HUB0'][['date', 'price']].to_csv(index=False).encode()
+    single = client.post('/api/upload?horizon=4', files={'file': ('a.csv', io.BytesIO(alone), 'text/csv')}).json()
+    assert results['HUB0'] == single
+
+    col = client.post('/api/upload?horizon=4&format=columnar',
+                      files={'file': ('p.csv', io.BytesIO(csv), 'text/csv')}).json()
+    assert col['results']['HUB1']['series']['forecast'] == [row['forecast'] for row in results['HUB1']['series']]
+
+
+def test_binary_formats_are_refused_for_panels(monkeypatch):
+    monkeypatch.setattr(formats, '_optional', lambda name: object())
+    client = TestClient(main.app)
+    r = client.post('/api/upload?format=msgpack', files={'file': ('p.csv', io.BytesIO(_long_csv()), 'text/csv')})
+    assert r.status_code == 406
+
+
+def test_many_series_are_split_across_the_pool(monkeypatch):
+    n_series = 300
+    ids = np.repeat([f'S{i:04d}' for i in range(n_series)], 20)
+    dates = np.tile(pd.date_range('2024-01-01', periods=20).to_numpy(), n_series)
+    values = np.tile(np.linspace(1, 2, 20), n_series)
+    s = main._ensure_series(pd.DataFrame({'series_id': ids, 'date': dates, 'price': values}))
+    results = main._evaluate_panel(s, horizon=2)
+    assert len(results) == n_series
+    assert all(len(res['series']) == 2 for res in results.values())
@@ -0,0 +1,110 @@
+import sys
+import pathlib
+
+# ensure project root is on sys.path so `backend` package can be imported when running pytest
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.cache import SeriesCache
+from backend.memo import ResultCache
+from backend.prewarm import PrewarmScheduler, Target, parse_targets
+
+
+class FakeTicker:
+    calls = 0
+
+    def __init__(self, sym):
+        self.sym = sym
+
+    def history(self, **kwargs):
+        FakeTicker.calls += 1
+        idx = pd.date_range('2025-01-01', periods=90, name='Date')
+        return pd.DataFrame({'Close': np.linspace(60, 70, 90)}, index=idx)
+
+
+def test_parse_targets():
+    assert parse_targets('yahoo:CL=F, eia:PET.RWTC.D:5y,') == [
+        Target('yahoo', 'CL=F', '1y'), Target('eia', 'PET.RWTC.D', '5y')]
+    with pytest.raises(ValueError):
+        parse_targets('CL=F')
+
+
+def test_run_once_caps_concurrency_and_records_status():
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def warm(target):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        if target.symbol == 'BAD':
+            raise ValueError('no data')
+
+    targets = [Target('yahoo', sym) for sym in ('A', 'B', 'C', 'D', 'BAD')]
+    sched = PrewarmScheduler(targets, warm, concurrency=2, clock=lambda: 1000.0)
+    sched.run_once()
+
+    assert peak[0] == 2
+    status = sched.status()
+    assert status['cycles'] == 1
+    assert status['series']['yahoo:A:1y']['last_refresh'] == 1000.0
+    assert status['series']['yahoo:A:1y']['refreshes'] == 1
+    bad = status['series']['yahoo:BAD:1y']
+    assert bad['last_refresh'] is None
+    assert bad['failures'] == 1
+    assert bad['error'] == 'no data'
+
+
+def test_prewarm_precomputes_online_results(monkeypatch):
+    monkeypatch.setattr(main.yf, 'Ticker', FakeTicker)
+    monkeypatch.setattr(main, '_series_cache', SeriesCache(ttl=300, max_entries=8))
+    monkeypatch.setattr(main, '_result_cache', ResultCache())
+    monkeypatch.setattr(main, '_prewarm_horizons', [7])
+
+    main._prewarm(Target('yahoo', 'CL=F', '3mo'))
+    calls = []
+    monkeypatch.setattr(main, 'evaluate_methods', lambda *a, **k: calls.append(1))
+
+    client = TestClient(main.app)
+    for query in ('', '&format=columnar'):
+        r = client.get(f'/api/online?source=yahoo&symbol=CL=F&period=3mo&horizon=7{query}')
+        assert r.status_code == 200
+    assert calls == []
+    assert main._result_cache.stats()['hits'] == 2
+
+
+def test_scheduler_starts_with_app_and_reports_refreshes(monkeypatch):
+    monkeypatch.setattr(main.yf, 'Ticker', FakeTicker)
+    monkeypatch.setattr(main, '_series_cache', SeriesCache(ttl=300, max_entries=8))
+    monkeypatch.setattr(main, '_result_cache', ResultCache())
+    monkeypatch.setattr(main, '_prewarm_scheduler', None)
+    monkeypatch.setattr(main, '_prewarm_horizons', [7])
+    monkeypatch.setenv('PREWARM_SERIES', 'yahoo:CL=F:3mo,xm:XOM:3mo')
+    monkeypatch.setenv('PREWARM_INTERVAL', '0.05')
+    monkeypatch.setenv('PREWARM_JITTER', '0')
+
+    with TestClient(main.app) as client:
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and client.get('/api/prewarm').json()['cycles'] < 2:
+            time.sleep(0.02)
+        status = client.get('/api/prewarm').json()
+    assert status['running'] is True
+    assert status['cycles'] >= 2
+    assert status['horizons'] == [7]
+    for key in ('yahoo:CL=F:3mo', 'xm:XOM:3mo'):
+        assert status['series'][key]['last_refresh'] is not None
+        assert status['series'][key]['error'] is None
+    # later cycles refresh incrementally instead of missing the cache
+    assert main._series_cache.stats()['refreshes'] >= 2
+    assert not main._prewarm_scheduler.running
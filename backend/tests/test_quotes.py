@@ -0,0 +1,127 @@
+import sys
+import pathlib
+
+# ensure project root is on sys.path so `backend` package can be imported when running pytest
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.quotes import QuoteCache, last_closes, parse_symbols
+
+
+def _download_frame(symbols, n=5):
+    """Imita `yf.download(..., group_by='column')`: columnas `(campo, ticker)`."""
+    idx = pd.date_range('2025-03-03', periods=n, name='Date')
+    cols = pd.MultiIndex.from_product([['Close', 'Open'], symbols], names=['Price', 'Ticker'])
+    values = np.arange(n * len(cols), dtype=float).reshape(n, len(cols))
+    return pd.DataFrame(values, index=idx, columns=cols)
+
+
+def test_parse_symbols_dedupes_and_uppercases():
+    assert parse_symbols(' cl=f, XOM,,xom ,bz=f') == ['CL=F', 'XOM', 'BZ=F']
+
+
+def test_last_closes_skips_trailing_gaps_and_unknown_symbols():
+    frame = _download_frame(['CL=F', 'XOM'])
+    frame.loc[frame.index[-1], ('Close', 'XOM')] = np.nan
+    out = last_closes(frame, ['CL=F', 'XOM', 'NOPE'])
+    assert out['CL=F'] == {'close': frame[('Close', 'CL=F')].iloc[-1], 'date': '2025-03-07'}
+    assert out['XOM'] == {'close': frame[('Close', 'XOM')].iloc[-2], 'date': '2025-03-06'}
+    assert out['NOPE'] is None
+    flat = pd.DataFrame({'Close': [1.0, 2.0]}, index=pd.date_range('2025-01-01', periods=2))
+    assert last_closes(flat, ['AAPL'])['AAPL']['close'] == 2.0
+    assert last_closes(pd.DataFrame(), ['AAPL']) == {'AAPL': None}
+
+
+def test_cache_serves_fresh_quotes_and_refetches_after_ttl():
+    calls = []
+
+    def fetch(symbols, period):
+        calls.append(list(symbols))
+        return {sym: {'close': 1.0, 'date': '2025-01-01'} for sym in symbols if sym != 'BAD'}
+
+    clock = [0.0]
+    cache = QuoteCache(fetch, ttl=5, clock=lambda: clock[0])
+    first = cache.get_many(['A', 'B', 'BAD'])
+    assert first['BAD'] is None and first['A']['close'] == 1.0
+    assert list(first) == ['A', 'B', 'BAD']
+    cache.get_many(['B', 'C', 'BAD'])
+    assert calls == [['A', 'B', 'BAD'], ['C']]
+    clock[0] = 6.0
+    cache.get_many(['A', 'C'])
+    assert calls[-1] == ['A', 'C']
+    assert cache.stats()['hits'] == 2
+
+
+def test_overlapping_requests_share_one_download():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetch(symbols, period):
+        calls.append(list(symbols))
+        if symbols[0] == 'A':
+            started.set()
+            release.wait(5)
+        return {sym: {'close': float(len(calls)), 'date': '2025-01-01'} for sym in symbols}
+
+    cache = QuoteCache(fetch, ttl=5)
+    results = {}
+    first = threading.Thread(target=lambda: results.setdefault('first', cache.get_many(['A', 'B'])))
+    first.start()
+    assert started.wait(5)
+    second = threading.Thread(target=lambda: results.setdefault('second', cache.get_many(['B', 'C'])))
+    second.start()
+    time.sleep(0.05)
+    release.set()
+    first.join(5)
+    second.join(5)
+
+    assert calls == [['A', 'B'], ['C']]
+    assert results['second']['B'] == results['first']['B']
+    assert cache.stats()['coalesced'] == 1
+
+
+def test_failed_download_reaches_waiters_and_is_not_cached():
+    def fetch(symbols, period):
+        raise RuntimeError('rate limited')
+
+    cache = QuoteCache(fetch)
+    with pytest.raises(RuntimeError):
+        cache.get_many(['A'])
+    assert cache.stats()['entries'] == 0 and cache.stats()['inflight'] == 0
+
+
+def test_quotes_endpoint_uses_one_batched_download(monkeypatch):
+    downloads = []
+
+    def fake_download(tickers, **kwargs):
+        downloads.append((list(tickers), kwargs['period']))
+        return _download_frame([t for t in tickers if t != 'ZZZ'])
+
+    monkeypatch.setattr(main.yf, 'download', fake_download)
+    monkeypatch.setattr(main, '_quotes', QuoteCache(main._download_closes, ttl=30))
+    client = TestClient(main.app)
+
+    r = client.get('/api/quotes?tickers=cl=f,BZ=F,XOM,zzz')
+    assert r.status_code == 200
+    body = r.json()['quotes']
+    assert list(body) == ['CL=F', 'BZ=F', 'XOM', 'ZZZ']
+    assert body['XOM']['date'] == '2025-03-07'
+    assert body['ZZZ'] == {'error': {'status': 404, 'detail': 'No data for ticker'}}
+    assert downloads == [(['CL=F', 'BZ=F', 'XOM', 'ZZZ'], '5d')]
+
+    # /api/price reads the same cache
+    assert client.get('/api/price?ticker=xom').json() == {'ticker': 'XOM', 'close': body['XOM']['close']}
+    assert client.get('/api/price?ticker=zzz').status_code == 404
+    assert len(downloads) == 1
+    assert client.get('/api/quotes?tickers=,').status_code == 400
+    monkeypatch.setenv('QUOTES_MAX_SYMBOLS', '2')
+    assert client.get('/api/quotes?tickers=A,B,C').status_code == 400
@@ -0,0 +1,197 @@
+import sys
+import pathlib
+
+# ensure project root is on sys.path so `backend` package can be imported when running pytest
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+
+import json
+import os
+import subprocess
+import textwrap
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import data_sources, main
+from backend.cache import SeriesCache
+from backend.memo import ResultCache
+from backend.shared import Budget, BudgetExceeded, MemoryBackend, SQLiteBackend, dumps_series, loads_series
+
+
+def _spawn(code, **env):
+    """Lanza un intérprete aparte (otro "worker") con `code`; su salida es una línea JSON."""
+    return subprocess.Popen([sys.executable, '-c', textwrap.dedent(code)], cwd=ROOT,
+                            env={**os.environ, **env}, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+
+def _result(proc):
+    out, err = proc.communicate(timeout=60)
+    assert proc.returncode == 0, err
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def test_series_roundtrip_keeps_index_and_timezone():
+    idx = pd.date_range('2024-03-01', periods=5, tz='America/New_York', name='date')
+    s = pd.Series(np.linspace(1, 2, 5), index=idx)
+    stamp, back = loads_series(dumps_series(s, 123.5))
+    assert stamp == 123.5
+    pd.testing.assert_series_equal(back, s, check_freq=False)
+
+
+def test_budget_window_and_wait():
+    clock = [0.0]
+    slept = []
+    backend = MemoryBackend(clock=lambda: clock[0])
+    budget = Budget(backend, 'eia', limit=2, window=60)
+    budget.acquire()
+    budget.acquire()
+    with pytest.raises(BudgetExceeded) as exc:
+        budget.acquire()
+    assert exc.value.retry_after == 60
+    assert budget.status()['remaining'] == 0
+
+    def sleep(seconds):
+        slept.append(seconds)
+        clock[0] += seconds
+
+    clock[0] = 45.0
+    Budget(backend, 'eia', limit=2, window=60, wait=20, sleep=sleep).acquire()
+    assert slept == [15.0]
+    assert Budget(backend, 'other', limit=0).status() == {'name': 'other', 'limit': None}
+
+
+def test_sqlite_backend_expires_and_prunes(tmp_path):
+    clock = [1000.0]
+    backend = SQLiteBackend(tmp_path / 'state.db', max_entries=3, clock=lambda: clock[0])
+    backend.put('forecast', 'a', b'1', ttl=10)
+    assert backend.get('forecast', 'a') == b'1'
+    clock[0] += 11
+    assert backend.get('forecast', 'a') is None
+    for i in range(300):
+        clock[0] += 1
+        backend.put('forecast', f'k{i}', b'x')
+    assert backend.stats()['entries'] < 100
+    assert backend.get('forecast', 'k0') is None
+    assert backend.get('forecast', 'k299') == b'x'
+
+
+def test_budget_is_shared_across_processes(tmp_path):
+    db = str(tmp_path / 'state.db')
+    code = f'''
+        import json
+        from backend.shared import Budget, BudgetExceeded, SQLiteBackend
+        budget = Budget(SQLiteBackend({db!r}), 'eia', limit=25, window=600)
+        granted = 0
+        for _ in range(10):
+            try:
+                budget.acquire()
+                granted += 1
+            except BudgetExceeded:
+                pass
+        print(json.dumps({{'granted': granted}}))
+    '''
+    procs = [_spawn(code) for _ in range(4)]
+    granted = [_result(p)['granted'] for p in procs]
+    assert sum(granted) == 25
+    assert Budget(SQLiteBackend(db), 'eia', limit=25, window=600).status()['used'] == 25
+
+
+def test_series_cache_is_warm_in_another_process(tmp_path):
+    db = str(tmp_path / 'state.db')
+    code = f'''
+        import json, sys
+        import pandas as pd
+        from backend.cache import SeriesCache
+        from backend.shared import SQLiteBackend
+
+        def fetch_full():
+            if sys.argv[-1] == 'reader':
+                raise RuntimeError('second worker should not download')
+            return pd.Series([1.0, 2.0, 3.0], index=pd.date_range('2024-01-01', periods=3, name='date'))
+
+        cache = SeriesCache(ttl=300, shared=SQLiteBackend({db!r}))
+        s = cache.get_or_fetch(('yahoo', 'CL=F', '1y'), fetch_full, lambda last: pd.Series(dtype=float))
+        print(json.dumps({{'values': s.tolist(), **cache.stats()}}))
+    '''
+    first = _result(_spawn(code))
+    assert first['misses'] == 1
+    proc = subprocess.Popen([sys.executable, '-c', textwrap.dedent(code), 'reader'], cwd=ROOT,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    second = _result(proc)
+    assert second['values'] == [1.0, 2.0, 3.0]
+    assert second['shared_hits'] == 1 and second['misses'] == 0
+
+
+def test_stale_shared_copy_is_refreshed_incrementally(tmp_path):
+    backend = SQLiteBackend(tmp_path / 'state.db')
+    base = pd.Series([1.0, 2.0], index=pd.date_range('2024-01-01', periods=2, name='date'))
+    backend.put('series', 'yahoo\x1fX\x1f1y', dumps_series(base, 0.0))  # published long ago
+    cache = SeriesCache(ttl=300, shared=backend)
+    since = []
+
+    def fetch_since(last):
+        since.append(last)
+        return pd.Series([3.0], index=pd.DatetimeIndex(['2024-01-03'], name='date'))
+
+    s = cache.get_or_fetch(('yahoo', 'X', '1y'), lambda: pytest.fail('full download'), fetch_since)
+    assert s.tolist() == [1.0, 2.0, 3.0]
+    assert since == [pd.Timestamp('2024-01-02')]
+    assert cache.stats()['refreshes'] == 1
+    _, published = loads_series(backend.get('series', 'yahoo\x1fX\x1f1y'))
+    assert published.tolist() == [1.0, 2.0, 3.0]
+
+
+def test_workers_share_forecast_results(tmp_path):
+    code = '''
+        import io, json, sys
+        from fastapi.testclient import TestClient
+        from backend import main
+
+        if sys.argv[-1] == 'reader':
+            def fail(*args, **kwargs):
+                raise RuntimeError('result should come from the shared cache')
+            main.evaluate_methods = fail
+        csv = b'date,price\\n' + b''.join(b'2024-01-%02d,%d\\n' % (d, 50 + d) for d in range(1, 29))
+        r = TestClient(main.app).post('/api/upload?horizon=3', files={'file': ('a.csv', io.BytesIO(csv), 'text/csv')})
+        print(json.dumps({'status': r.status_code, 'etag': r.headers.get('etag'),
+                          'forecast': main._result_cache.stats()}))
+    '''
+    env = {'STATE_BACKEND': 'sqlite', 'STATE_SQLITE_PATH': str(tmp_path / 'state.db'), 'PREWARM_ENABLED': '0'}
+    first = _result(_spawn(code, **env))
+    proc = subprocess.Popen([sys.executable, '-c', textwrap.dedent(code), 'reader'], cwd=ROOT,
+                            env={**os.environ, **env}, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    second = _result(proc)
+    assert first['status'] == second['status'] == 200
+    assert second['etag'] == first['etag']
+    assert second['forecast']['shared_hits'] == 1
+
+
+def test_eia_budget_returns_429(monkeypatch):
+    class Resp:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {'response': {'total': '30', 'data': [
+                {'period': f'2024-01-{d:02d}', 'value': str(70 + d)} for d in range(1, 31)]}}
+
+    class Client:
+        def get(self, url, params=None):
+            return Resp()
+
+    monkeypatch.setenv('EIA_API_KEY', 'TESTKEY')
+    monkeypatch.setattr(data_sources, 'EIA_DEFAULT_TOKEN', 'TESTKEY')
+    monkeypatch.setattr(data_sources, '_http', Client())
+    monkeypatch.setattr(data_sources, '_budget', Budget(MemoryBackend(), 'eia', limit=1, window=120))
+    monkeypatch.setattr(main, '_series_cache', SeriesCache(ttl=300))
+    monkeypatch.setattr(main, '_result_cache', ResultCache())
+    client = TestClient(main.app)
+
+    assert client.get('/api/online?source=eia&symbol=PET.RWTC.D&horizon=1').status_code == 200
+    r = client.get('/api/online?source=eia&symbol=PET.RBRTE.D&horizon=1')
+    assert r.status_code == 429
+    assert r.headers['retry-after'] == '120'
+    assert client.get('/api/eia_status').json()['budget']['remaining'] == 0
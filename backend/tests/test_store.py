@@ -0,0 +1,100 @@
+import sys
+import pathlib
+
+# ensure project root is on sys.path so `backend` package can be imported when running pytest
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+
+import subprocess
+import textwrap
+
+import numpy as np
+import pandas as pd
+
+from backend.store import SeriesStore
+
+
+def _is_memory_mapped(arr):
+    while arr is not None:
+        if isinstance(arr, np.memmap):
+            return True
+        arr = getattr(arr, 'base', None)
+    return False
+
+
+def test_store_roundtrip_is_memory_mapped(tmp_path):
+    store = SeriesStore(tmp_path)
+    idx = pd.date_range('2025-01-01', periods=10)
+    s = pd.Series(np.arange(10, dtype=float), index=idx)
+    assert store.append(('eia', 'PET.RWTC.D', '1y'), s) == 10
+
+    out = store.read(('eia', 'PET.RWTC.D', '1y'))
+    assert _is_memory_mapped(out.to_numpy())
+    assert out.index.equals(idx)
+    assert np.array_equal(out.to_numpy(), s.to_numpy())
+
+
+def test_store_refetched_rows_replace_stored_ones(tmp_path):
+    store = SeriesStore(tmp_path)
+    key = ('yahoo', 'CL=F', '1y')
+    store.append(key, pd.Series([1.0, 2.0, 69.0], index=pd.date_range('2025-01-01', periods=3)))
+    reader = store.read(key)  # a memmap taken before the rewrite keeps working
+    written = store.append(key, pd.Series([99.0, 4.0, 5.0], index=pd.date_range('2025-01-03', periods=3)))
+    assert written == 3
+    out = store.read(key)
+    assert list(out.to_numpy()) == [1.0, 2.0, 99.0, 4.0, 5.0]
+    assert out.index.equals(pd.date_range('2025-01-01', periods=5))
+    assert reader.iloc[-1] == 99.0
+
+    # a shorter re-fetch drops the stored rows after it
+    store.append(key, pd.Series([4.5], index=pd.DatetimeIndex(['2025-01-04'])))
+    assert list(store.read(key).to_numpy()) == [1.0, 2.0, 99.0, 4.5]
+
+
+def test_store_preserves_timezone(tmp_path):
+    store = SeriesStore(tmp_path)
+    idx = pd.date_range('2025-01-01', periods=3, tz='America/New_York')
+    store.append('k', pd.Series([1.0, 2.0, 3.0], index=idx))
+    assert store.read('k').index.equals(idx)
+
+
+def test_stored_fetchers_serve_cold_start_from_disk(tmp_path):
+    store = SeriesStore(tmp_path)
+    key = ('yahoo', 'CL=F', 'max')
+    store.append(key, pd.Series([1.0, 2.0], index=pd.date_range('2025-01-01', periods=2)))
+    since_calls = []
+
+    def fetch_full():
+        raise AssertionError('full download should not happen when the series is on disk')
+
+    def fetch_since(last):
+        since_calls.append(last)
+        return pd.Series([2.5, 3.0], index=[last, last + pd.Timedelta(days=1)])
+
+    full, _ = store.stored_fetchers(key, fetch_full, fetch_since)
+    out = full()
+    assert since_calls == [pd.Timestamp('2025-01-02')]
+    assert list(out.to_numpy()) == [1.0, 2.5, 3.0]
+
+
+def test_concurrent_appends_from_several_processes_stay_aligned(tmp_path):
+    # every worker appends growing prefixes of the same series; value i belongs to day i
+    code = textwrap.dedent(f'''
+        import numpy as np, pandas as pd
+        from backend.store import SeriesStore
+        store = SeriesStore({str(tmp_path)!r})
+        s = pd.Series(np.arange(3000, dtype=float), index=pd.date_range('2000-01-01', periods=3000))
+        for end in range(10, 3001, 10):
+            store.append(('yahoo', 'CL=F', '1y'), s.iloc[:end])
+    ''')
+    procs = [subprocess.Popen([sys.executable, '-c', code], cwd=ROOT, stderr=subprocess.PIPE, text=True)
+             for _ in range(4)]
+    for p in procs:
+        _, err = p.communicate(timeout=120)
+        assert p.returncode == 0, err
+
+    stored = SeriesStore(tmp_path).read(('yahoo', 'CL=F', '1y'))
+    assert len(stored) == 3000
+    days = (stored.index - pd.Timestamp('2000-01-01')).days.to_numpy()
+    np.testing.assert_array_equal(days, np.arange(3000))
+    np.testing.assert_array_equal(stored.to_numpy(), days.astype(float))
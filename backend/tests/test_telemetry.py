@@ -0,0 +1,113 @@
+import sys
+import pathlib
+
+# ensure project root is on sys.path so `backend` package can be imported when running pytest
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+
+import io
+import time
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from backend import main, telemetry
+from backend.cache import SeriesCache
+from backend.memo import ResultCache
+
+
+class FakeTicker:
+    def __init__(self, sym):
+        self.sym = sym
+
+    def history(self, **kwargs):
+        idx = pd.date_range('2025-01-01', periods=30, name='Date')
+        return pd.DataFrame({'Close': [60.0 + i % 4 for i in range(30)]}, index=idx)
+
+
+def test_histogram_render_is_cumulative():
+    h = telemetry.Histogram('x_seconds', 'help', ('stage',), buckets=(0.1, 1.0))
+    h.observe(0.05, stage='a')
+    h.observe(0.5, stage='a')
+    lines = h.render()
+    assert 'x_seconds_bucket{stage="a",le="0.1"} 1' in lines
+    assert 'x_seconds_bucket{stage="a",le="1.0"} 2' in lines
+    assert 'x_seconds_bucket{stage="a",le="+Inf"} 2' in lines
+    assert 'x_seconds_count{stage="a"} 2' in lines
+
+
+def test_online_stages_are_exported(monkeypatch):
+    telemetry.clear()
+    monkeypatch.setattr(main.yf, 'Ticker', FakeTicker)
+    monkeypatch.setattr(main, '_series_cache', SeriesCache())
+    monkeypatch.setattr(main, '_result_cache', ResultCache())
+    client = TestClient(main.app)
+    r = client.get('/api/online?source=yahoo&symbol=CL=F&method=ewm', headers={'X-Server-Timing': '1'})
+    assert r.status_code == 200
+    timing = r.headers['server-timing']
+    for stage in ('fetch', 'normalize', 'evaluate', 'build_series', 'serialize', 'total'):
+        assert f'{stage};dur=' in timing
+
+    text = client.get('/api/metrics').text
+    assert '# TYPE forecast_stage_seconds histogram' in text
+    assert 'forecast_stage_seconds_count{endpoint="/api/online",stage="fetch",source="yahoo",method="ewm"} 1' in text
+    assert 'forecast_stage_seconds_count{endpoint="/api/online",stage="evaluate",source="yahoo",method="ewm"} 1' in text
+    assert 'forecast_request_seconds_count{endpoint="/api/online",status="200"} 1' in text
+
+
+def test_nested_spans_record_self_time():
+    telemetry.clear()
+    with telemetry.request_scope('/x') as timings:
+        with telemetry.span('fetch'):
+            time.sleep(0.01)
+            with telemetry.span('normalize'):
+                time.sleep(0.1)
+        with telemetry.span('evaluate'):
+            pass
+    # without subtracting the child, fetch would include normalize's 0.1 s
+    assert 0.01 <= timings.spans['fetch'] < timings.spans['normalize']
+    assert timings.spans['normalize'] >= 0.1
+    sums = {key[1]: total for key, (_, total, _) in telemetry.STAGE_SECONDS.snapshot().items()}
+    assert sums['fetch'] == timings.spans['fetch'] and sums['normalize'] == timings.spans['normalize']
+
+
+def test_server_timing_is_opt_in(monkeypatch):
+    monkeypatch.delenv('SERVER_TIMING', raising=False)
+    client = TestClient(main.app)
+    assert 'server-timing' not in client.get('/api/eia_status').headers
+    monkeypatch.setenv('SERVER_TIMING', '1')
+    assert 'total;dur=' in client.get('/api/eia_status').headers['server-timing']
+
+
+def test_upload_stages_are_recorded(monkeypatch):
+    telemetry.clear()
+    monkeypatch.setattr(main, '_result_cache', ResultCache())
+    csv = pd.DataFrame({'date': pd.date_range('2024-01-01', periods=20), 'price': range(20)}).to_csv(index=False)
+    client = TestClient(main.app)
+    r = client.post('/api/upload', files={'file': ('p.csv', io.BytesIO(csv.encode()), 'text/csv')},
+                    headers={'X-Server-Timing': '1'})
+    assert r.status_code == 200
+    assert 'parse;dur=' in r.headers['server-timing']
+    assert 'stage="parse",source="upload",method="auto"' in client.get('/api/metrics').text
+
+
+def test_label_values_do_not_come_from_user_input(monkeypatch):
+    telemetry.clear()
+    monkeypatch.setattr(main.yf, 'Ticker', FakeTicker)
+    monkeypatch.setattr(main, '_series_cache', SeriesCache())
+    monkeypatch.setattr(main, '_result_cache', ResultCache())
+    client = TestClient(main.app)
+    for i in range(3):
+        client.get(f'/api/online?source=yahoo&symbol=CL=F&method=bogus{i}')
+        client.get(f'/no/such/path/{i}')
+    text = client.get('/api/metrics').text
+    assert 'bogus' not in text and '/no/such' not in text
+    assert 'forecast_stage_seconds_count{endpoint="/api/online",stage="fetch",source="yahoo",method="other"} 3' in text
+    assert 'forecast_request_seconds_count{endpoint="unmatched",status="404"} 3' in text
+
+
+def test_histogram_caps_label_combinations():
+    h = telemetry.Histogram('x_seconds', 'help', ('stage',), buckets=(1.0,), max_series=2)
+    for stage in ('a', 'b', 'c', 'd'):
+        h.observe(0.5, stage=stage)
+    assert set(h.snapshot()) == {('a',), ('b',), ('other',)}
+    assert h.snapshot()[('other',)][2] == 2
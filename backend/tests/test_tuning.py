@@ -0,0 +1,55 @@
+import sys
+import pathlib
+
+# ensure project root is on sys.path so `backend` package can be imported when running pytest
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend import engine
+from backend.main import _forecast_ewm, _forecast_ma, _mape, _rmse, _split_train_test, evaluate_methods
+
+
+def _series(n=200, seed=3):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n)
+    return pd.Series(50 + 5 * np.sin(t / 9) + rng.normal(0, 0.5, n), index=pd.date_range('2023-01-01', periods=n))
+
+
+def test_tune_reports_best_grid_pair():
+    s = _series()
+    res = evaluate_methods(s, horizon=5, tune=True)
+    tuning = res['tuning']
+    assert tuning['windows_searched'] == len(engine.WINDOW_GRID)
+    assert tuning['alphas_searched'] == len(engine.ALPHA_GRID)
+
+    train, test = _split_train_test(s, test_size=min(14, len(s) // 4))
+    best_w = min(engine.WINDOW_GRID, key=lambda w: _mape(test, _forecast_ma(train, len(test), window=int(w))))
+    best_a = min(engine.ALPHA_GRID, key=lambda a: _mape(test, _forecast_ewm(train, len(test), alpha=float(a))))
+    assert tuning['window'] == best_w
+    assert tuning['alpha'] == pytest.approx(best_a)
+
+
+def test_tuned_metrics_never_worse_than_defaults():
+    s = _series(seed=7)
+    default = evaluate_methods(s, horizon=5)
+    tuned = evaluate_methods(s, horizon=5, tune=True)
+    assert tuned['mape'] <= default['mape']
+
+
+def test_explicit_window_and_alpha():
+    s = _series()
+    train, test = _split_train_test(s, test_size=min(14, len(s) // 4))
+    res = evaluate_methods(s, horizon=3, method='ewm', alpha=0.5)
+    assert res['mape'] == round(_mape(test, _forecast_ewm(train, len(test), alpha=0.5)), 4)
+    res = evaluate_methods(s, horizon=3, method='moving_average', window=20)
+    assert res['rmse'] == round(_rmse(test, _forecast_ma(train, len(test), window=20)), 4)
+    assert 'tuning' not in res
+
+
+def test_tune_with_rolling_backtest():
+    res = evaluate_methods(_series(400), horizon=5, tune=True, backtest='rolling', folds=50)
+    assert len(res['backtest']['folds']) == 50
+    assert 1 <= res['tuning']['window'] <= 60
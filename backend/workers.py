@@ -0,0 +1,120 @@
+"""Pools de ejecución compartidos para trabajo concurrente del backend.
+
+- `fetch_pool()`: hilos para descargas (E/S) concurrentes, acotado por
+  `BATCH_FETCH_WORKERS` (8 por defecto).
+- `process_pool()`: procesos para `evaluate_methods` (CPU), acotado por
+  `FORECAST_PROCESS_WORKERS` (por defecto el número de CPUs). Con `0` la
+  evaluación se hace en el propio hilo, útil en entornos sin `fork`.
+
+Las tareas enviadas a procesos nunca lanzan excepciones: devuelven el resultado
+o un diccionario `{'error': {'status': ..., 'detail': ...}}` serializable.
+
+`evaluate_panel` reparte las series de un upload multi-serie en bloques
+contiguos (unos pocos por proceso) para no pagar una tarea por serie.
+"""
+
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+
+_lock = threading.Lock()
+_fetch_pool: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def fetch_pool() -> ThreadPoolExecutor:
+    """Pool de hilos compartido para descargas concurrentes."""
+    global _fetch_pool
+    with _lock:
+        if _fetch_pool is None:
+            workers = max(1, int(os.getenv('BATCH_FETCH_WORKERS', '8')))
+            _fetch_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='fetch')
+        return _fetch_pool
+
+
+def process_pool() -> Optional[ProcessPoolExecutor]:
+    """Pool de procesos compartido para evaluación, o `None` si está desactivado."""
+    global _process_pool
+    with _lock:
+        if _process_pool is None:
+            workers = int(os.getenv('FORECAST_PROCESS_WORKERS', str(os.cpu_count() or 1)))
+            if workers <= 0:
+                return None
+            _process_pool = ProcessPoolExecutor(max_workers=workers)
+        return _process_pool
+
+
+def error_payload(exc: BaseException) -> Dict:
+    """Convierte una excepción en el diccionario de error por elemento."""
+    if isinstance(exc, HTTPException):
+        return {'error': {'status': exc.status_code, 'detail': exc.detail}}
+    return {'error': {'status': 500, 'detail': str(exc)}}
+
+
+def evaluate_task(s: pd.Series, **kwargs) -> Dict:
+    """Ejecuta `evaluate_methods(s, **kwargs)` capturando errores (apto para procesos)."""
+    from .main import evaluate_methods
+
+    try:
+        return evaluate_methods(s, **kwargs)
+    except Exception as e:
+        return error_payload(e)
+
+
+def submit_evaluation(s: pd.Series, **kwargs) -> Future:
+    """Envía una evaluación al pool de procesos (o la ejecuta en línea si no hay pool)."""
+    pool: Optional[Executor] = process_pool()
+    if pool is not None:
+        return pool.submit(evaluate_task, s, **kwargs)
+    fut: Future = Future()
+    fut.set_result(evaluate_task(s, **kwargs))
+    return fut
+
+
+def evaluate_panel_task(ids: Sequence[str], bounds: np.ndarray, dates: pd.DatetimeIndex,
+                        values: np.ndarray, **kwargs) -> Dict[str, Dict]:
+    """Evalúa las series `ids[i]` = `values[bounds[i]:bounds[i+1]]` (apto para procesos)."""
+    return {
+        sid: evaluate_task(pd.Series(values[a:b], index=dates[a:b]), **kwargs)
+        for sid, a, b in zip(ids, bounds[:-1], bounds[1:])
+    }
+
+
+def evaluate_panel(ids: List[str], bounds: np.ndarray, dates: pd.DatetimeIndex,
+                   values: np.ndarray, **kwargs) -> Dict[str, Dict]:
+    """Evalúa todas las series de un panel repartidas en bloques por el pool de procesos.
+
+    Cada bloque recibe solo su tramo contiguo de `dates`/`values`. Devuelve
+    `{series_id: resultado o error}` en el orden de `ids`.
+    """
+    pool: Optional[Executor] = process_pool()
+    if pool is None or len(ids) <= 1:
+        return evaluate_panel_task(ids, bounds, dates, values, **kwargs)
+    # a few chunks per process keeps the pool busy when series sizes differ
+    chunks = np.array_split(np.arange(len(ids)), min(len(ids), 4 * pool._max_workers))
+    futures = []
+    for chunk in chunks:
+        lo, hi = chunk[0], chunk[-1] + 1
+        a, b = bounds[lo], bounds[hi]
+        futures.append(pool.submit(evaluate_panel_task, ids[lo:hi], bounds[lo:hi + 1] - a,
+                                   dates[a:b], values[a:b], **kwargs))
+    results: Dict[str, Dict] = {}
+    for fut in futures:
+        results.update(fut.result())
+    return results
+
+
+def shutdown() -> None:
+    """Cierra los pools compartidos (se recrean bajo demanda)."""
+    global _fetch_pool, _process_pool
+    with _lock:
+        if _fetch_pool is not None:
+            _fetch_pool.shutdown(wait=False)
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+        _fetch_pool = _process_pool = None
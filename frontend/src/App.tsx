@@ -45,8 +45,8 @@ export default function App() {
               <tr><th>Date</th><th>Forecast</th></tr>
             </thead>
             <tbody>
-              {series.map((r: any, i: number) => (
-                <tr key={i}><td>{r.date}</td><td>{typeof r.forecast === 'number' ? r.forecast.toFixed(4) : r.forecast}</td></tr>
+              {series.index.map((i) => (
+                <tr key={i}><td>{series.dateAt(i)}</td><td>{typeof series.forecast[i] === 'number' ? series.forecast[i].toFixed(4) : series.forecast[i]}</td></tr>
               ))}
             </tbody>
           </table>
@@ -1,21 +1,23 @@
 import React from 'react'
 import { LineChart, Line, XAxis, YAxis, Tooltip, CartesianGrid, ResponsiveContainer } from 'recharts'
+import type { ForecastData } from '../hooks/useForecastData'
 
 /**
- * `ForecastChart` renderiza la serie preparada (`date`, `forecast`) usando
- * Recharts. El componente es responsable únicamente de la visualización.
+ * `ForecastChart` renderiza la serie preparada por `useForecastData` usando
+ * Recharts: cada punto es una posición y la fecha y el valor se leen de las
+ * columnas. El componente es responsable únicamente de la visualización.
  */
-export default function ForecastChart({ data }: { data: Array<{ date: string; forecast: number }> }) {
+export default function ForecastChart({ data }: { data: ForecastData }) {
   if (!data || data.length === 0) return <div>No chart data</div>
   return (
     <div style={{ width: '100%', height: 300 }}>
       <ResponsiveContainer>
-        <LineChart data={data}>
+        <LineChart data={data.index}>
           <CartesianGrid strokeDasharray="3 3" />
-          <XAxis dataKey="date" />
+          <XAxis dataKey={(i: number) => i} tickFormatter={data.dateAt} />
           <YAxis />
-          <Tooltip />
-          <Line type="monotone" dataKey="forecast" stroke="#8884d8" dot={{ r: 2 }} />
+          <Tooltip labelFormatter={(i: number) => data.dateAt(i)} />
+          <Line type="monotone" name="forecast" dataKey={(i: number) => data.forecast[i]} stroke="#8884d8" dot={{ r: 2 }} />
         </LineChart>
       </ResponsiveContainer>
     </div>
@@ -46,6 +46,8 @@ export default function OnlineDataForm({ onResult }: { onResult: (r: Result) =>
     } else if (symbol) params.set('symbol', symbol)
     if (method !== 'auto') params.set('method', method)
     params.set('horizon', String(horizon))
+    // compact series layout: useForecastData reads it without per-point objects
+    params.set('format', 'columnar')
     const res = await fetch(`/api/online?${params.toString()}`)
     const data = await res.json()
     if (!res.ok) {
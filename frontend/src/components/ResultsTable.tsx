@@ -1,13 +1,16 @@
 import React from 'react'
+import { useForecastData } from '../hooks/useForecastData'
 
 /**
  * `ResultsTable` presenta de forma legible los resultados del forecast.
  * - Si `result.error` o `result.detail` está presente muestra un mensaje
  *   de error.
  * - Muestra una tabla resumen con `best_method`, `mape` y `rmse` y otra tabla
- *   con la serie de pronóstico (`date`, `value`).
+ *   con la serie de pronóstico (`date`, `value`), en cualquiera de las formas
+ *   que acepta `useForecastData`.
  */
 export default function ResultsTable({ result }: { result: any }) {
+  const forecast = useForecastData(result)
   if (!result) return <div>No result yet</div>
   if (result.error || result.detail) {
     return (
@@ -17,12 +20,7 @@ export default function ResultsTable({ result }: { result: any }) {
     )
   }
 
-  const { best_method, mape, rmse, series } = result
-
-  const valueOf = (row: any) => {
-    if (row == null) return ''
-    return row.forecast ?? row.price ?? row.value ?? row[1] ?? ''
-  }
+  const { best_method, mape, rmse } = result
 
   return (
     <div className="results-container">
@@ -41,9 +39,9 @@ export default function ResultsTable({ result }: { result: any }) {
             <tr><th>Date</th><th>Value</th></tr>
           </thead>
           <tbody>
-            {Array.isArray(series) && series.length > 0 ? (
-              series.map((row: any, i: number) => (
-                <tr key={i}><td>{row.date ?? row[0]}</td><td>{typeof valueOf(row) === 'number' ? (valueOf(row) as number).toFixed(4) : valueOf(row)}</td></tr>
+            {forecast.length > 0 ? (
+              forecast.index.map((i) => (
+                <tr key={i}><td>{forecast.dateAt(i)}</td><td>{typeof forecast.forecast[i] === 'number' ? forecast.forecast[i].toFixed(4) : forecast.forecast[i]}</td></tr>
               ))
             ) : (
               <tr><td colSpan={2}>No series data</td></tr>
@@ -25,7 +25,7 @@ export default function UploadData({ onResult }: { onResult: (r: Result) => void
     fd.append('horizon', String(horizon))
     if (method !== 'auto') fd.append('method', method)
     try {
-      const res = await fetch('/api/upload', { method: 'POST', body: fd })
+      const res = await fetch('/api/upload?format=columnar', { method: 'POST', body: fd })
       const data = await res.json()
       if (!res.ok) {
         onResult({ error: data?.detail ?? data?.error ?? JSON.stringify(data) })
@@ -1,12 +1,51 @@
 import { useMemo } from 'react'
 
+/**
+ * Serie de pronóstico en forma de columnas, lista para Recharts y tablas.
+ * - `index`: posiciones `0..length-1` (el `data` de Recharts).
+ * - `forecast`: valores por posición.
+ * - `dateAt(i)`: fecha `YYYY-MM-DD` de la posición `i`, calculada al vuelo.
+ */
+export interface ForecastData {
+  length: number
+  index: number[]
+  forecast: ArrayLike<number>
+  dateAt: (i: number) => string
+}
+
+const EMPTY: ForecastData = { length: 0, index: [], forecast: [], dateAt: () => '' }
+
+const STEP_DAYS: Record<string, number> = { D: 1, W: 7 }
+
+/** Fechas de una serie columnar `{start, freq}` sin materializar la lista completa. */
+function columnarDates(start: string, freq: string): (i: number) => string {
+  const t0 = Date.parse(`${start}T00:00:00Z`)
+  const step = (STEP_DAYS[freq] ?? 1) * 86400000
+  return (i: number) => new Date(t0 + i * step).toISOString().slice(0, 10)
+}
+
 /**
  * Hook `useForecastData` prepara la serie devuelta por el backend para ser
- * consumida por Recharts: lista de objetos `{ date, forecast }`.
+ * consumida por Recharts. Acepta las dos formas de `series`:
+ * - lista de objetos `{ date, forecast }` (respuesta JSON por defecto);
+ * - columnar `{ start, freq, forecast: number[] }` (`format=columnar`), que se
+ *   usa tal cual sin crear un objeto por punto.
  */
-export function useForecastData(result: any) {
+export function useForecastData(result: any): ForecastData {
   return useMemo(() => {
-    if (!result || !result.series) return []
-    return result.series.map((r: any) => ({ date: r.date, forecast: r.forecast }))
+    const series = result?.series
+    if (!series) return EMPTY
+    if (Array.isArray(series)) {
+      const dates: string[] = series.map((r: any) => r.date)
+      const forecast: number[] = series.map((r: any) => r.forecast)
+      return { length: series.length, index: dates.map((_, i) => i), forecast, dateAt: (i: number) => dates[i] }
+    }
+    const forecast: ArrayLike<number> = series.forecast ?? []
+    return {
+      length: forecast.length,
+      index: Array.from({ length: forecast.length }, (_, i) => i),
+      forecast,
+      dateAt: columnarDates(series.start, series.freq),
+    }
   }, [result])
 }
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Comprueba el coste de importar `backend.main` (arranque en frío).
+
+Uso: `python scripts/check_import_time.py [--budget-ms 1000] [--runs 3]` desde
+la raíz del repositorio. Ejecuta `python -X importtime -c "import backend.main"`
+en un proceso limpio, toma el mejor de `--runs` intentos y falla (código 1) si:
+- el tiempo acumulado de `backend.main` supera el presupuesto, o
+- se importa al arrancar alguna dependencia que debe cargarse en diferido
+  (`yfinance`, `openpyxl`, `requests`).
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+LAZY_MODULES = ('yfinance', 'openpyxl', 'requests')
+
+
+def measure(module: str = 'backend.main'):
+    """Devuelve `(microsegundos acumulados de module, conjunto de módulos importados)`."""
+    env = {**os.environ, 'PYTHONPATH': str(ROOT)}
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    cumulative = None
+    imported = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        parts = [p.strip() for p in line[len('import time:'):].split('|')]
+        if not parts[1].isdigit():
+            continue  # header line
+        name = parts[2]
+        imported.add(name)
+        if name == module:
+            cumulative = int(parts[1])
+    return cumulative, imported
+
+
+def check(budget_ms: float, runs: int = 3):
+    """Devuelve `(mejor tiempo en ms, módulos diferidos importados)`."""
+    best, eager = None, set()
+    for _ in range(max(1, runs)):
+        us, imported = measure()
+        best = us if best is None else min(best, us)
+        eager |= {m for m in imported if m.split('.')[0] in LAZY_MODULES}
+    return best / 1000, sorted({m.split('.')[0] for m in eager})
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Import-time budget check for backend.main')
+    parser.add_argument('--budget-ms', type=float, default=float(os.getenv('IMPORT_BUDGET_MS', '1000')))
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+    ms, eager = check(args.budget_ms, args.runs)
+    print(f'backend.main import: {ms:.1f} ms (budget {args.budget_ms:.0f} ms)')
+    ok = ms <= args.budget_ms and not eager
+    if eager:
+        print('ERROR: imported at startup but should be lazy:', ', '.join(eager))
+    if ms > args.budget_ms:
+        print('ERROR: import time over budget')
+    sys.exit(0 if ok else 1)